@@ -0,0 +1,149 @@
+""" monte carlo battle simulator for tuning the balance of the game
+
+plays millions of battles with the rules of the BattleCore, vectorized with NumPy over a batch of battles:
+the sides take turns (the trainer first), each turn the current pokemon uses one of its four moves at random
+(the trainer's moves have a power between TRAINER_MIN_DAMAGE and TRAINER_MAX_DAMAGE as in TrainerPokemon, the
+challenger's between CHAL_MIN_DAMAGE and CHAL_MAX_DAMAGE as in OtherPokemon), a pokemon at 0 hp faints and the
+next of its lineup is sent out. The trainer has POKEMON_COUNT pokemon and every challenger between 1 and
+MAX_CHAL_COUNT. A run is the trainer battling every challenger of the hometown one after the other, the hp of
+their pokemon carries over from battle to battle like in the game.
+
+Every setting can be given a few values, every combination of them is simulated and the combinations are
+split across the cores with a process pool. Prints the chance of winning the run, the turns per battle and
+the hp the trainer has left after winning.
+
+NumPy is only needed for this tool, not by the game. Run from the project folder:
+    python -m benchmarks.balance_sim --battles 1000000 --trainer-damage 50-80 40-70 --chal-damage 30-60 40-70
+"""
+import os
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import argparse
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from config.config import Config
+
+CHALLENGERS = 4 # challengers in the hometown
+CHUNK = 200000  # battles simulated at once by a worker
+MOVES = 4       # moves of each pokemon
+
+
+def simulate(settings: dict, runs: int, seed: int) -> dict:
+    """ play runs of the game with the settings, returns per run whether the trainer won, the turns of every
+    battle played and the hp the trainer had left after winning"""
+    rng = np.random.default_rng(seed)
+    trainer_min, trainer_max = settings['trainer_damage']
+    chal_min, chal_max = settings['chal_damage']
+    count, hp = settings['pokemon_count'], settings['pokemon_hp']
+
+    # the trainer's lineup, the current pokemon is the first with hp left
+    trainer_hp = np.full((runs, count), hp, dtype=np.int32)
+    trainer_moves = rng.integers(trainer_min, trainer_max + 1, size=(runs, count, MOVES), dtype=np.int32)
+    trainer_current = np.zeros(runs, dtype=np.int32)
+    alive = np.ones(runs, dtype=bool) # runs the trainer has not lost yet
+    turns = []
+    rows = np.arange(runs)
+
+    for _ in range(settings['challengers']):
+        # a new challenger for every run still going
+        chal_size = settings['max_chal_count']
+        chal_count = rng.integers(1, chal_size + 1, size=runs, dtype=np.int32)
+        chal_hp = np.full((runs, chal_size), hp, dtype=np.int32)
+        chal_moves = rng.integers(chal_min, chal_max + 1, size=(runs, chal_size, MOVES), dtype=np.int32)
+        chal_current = np.zeros(runs, dtype=np.int32)
+
+        fighting = alive.copy()
+        battle_turns = np.zeros(runs, dtype=np.int32)
+        trainer_turn = True # every battle starts with the trainer, then the sides take turns
+        while fighting.any():
+            fighters = rows[fighting]
+            move = rng.integers(0, MOVES, size=fighters.size)
+            if trainer_turn:
+                power = trainer_moves[fighters, trainer_current[fighters], move]
+                chal_hp[fighters, chal_current[fighters]] -= power
+                fainted = fighters[chal_hp[fighters, chal_current[fighters]] <= 0]
+                chal_current[fainted] += 1
+                # the trainer wins when the challenger has no pokemon left
+                fighting[fainted[chal_current[fainted] >= chal_count[fainted]]] = False
+            else:
+                power = chal_moves[fighters, chal_current[fighters], move]
+                trainer_hp[fighters, trainer_current[fighters]] -= power
+                fainted = fighters[trainer_hp[fighters, trainer_current[fighters]] <= 0]
+                trainer_current[fainted] += 1
+                lost = fainted[trainer_current[fainted] >= count]
+                fighting[lost] = False
+                alive[lost] = False
+            battle_turns[fighters] += 1
+            trainer_turn = not trainer_turn
+
+            # the current index of a lineup with no pokemon left is kept in range, its battle is over
+            np.minimum(trainer_current, count - 1, out=trainer_current)
+            np.minimum(chal_current, chal_size - 1, out=chal_current)
+
+        turns.append(battle_turns[battle_turns > 0])
+
+    hp_left = np.clip(trainer_hp, 0, None).sum(axis=1)
+    return {'won': alive, 'turns': np.concatenate(turns), 'hp_left': hp_left[alive]}
+
+
+def grid(args) -> list:
+    """ every combination of the settings"""
+    names = ['trainer_damage', 'chal_damage', 'pokemon_hp', 'pokemon_count', 'max_chal_count', 'challengers']
+    values = [args.trainer_damage, args.chal_damage, args.pokemon_hp, args.pokemon_count, args.max_chal_count, args.challengers]
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+
+def damage(text: str) -> tuple:
+    low, high = (int(value) for value in text.split('-'))
+    return low, high
+
+
+def percentiles(values) -> str:
+    if not len(values):
+        return '       -'
+    p10, p50, p90 = np.percentile(values, [10, 50, 90])
+    return f'{p10:5.0f} {p50:5.0f} {p90:5.0f}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='simulate battles to tune the balance of the game')
+    parser.add_argument('--battles', type=int, default=1000000, help='runs simulated for each combination of settings')
+    parser.add_argument('--trainer-damage', type=damage, nargs='+', default=[(Config.TRAINER_MIN_DAMAGE, Config.TRAINER_MAX_DAMAGE)])
+    parser.add_argument('--chal-damage', type=damage, nargs='+', default=[(Config.CHAL_MIN_DAMAGE, Config.CHAL_MAX_DAMAGE)])
+    parser.add_argument('--pokemon-hp', type=int, nargs='+', default=[Config.POKEMON_HP])
+    parser.add_argument('--pokemon-count', type=int, nargs='+', default=[Config.POKEMON_COUNT])
+    parser.add_argument('--max-chal-count', type=int, nargs='+', default=[Config.MAX_CHAL_COUNT])
+    parser.add_argument('--challengers', type=int, nargs='+', default=[CHALLENGERS])
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    # every combination is split into chunks, the chunks of all combinations are shared by the workers
+    settings = grid(args)
+    chunks = [(index, min(CHUNK, args.battles - start)) for index in range(len(settings)) for start in range(0, args.battles, CHUNK)]
+    seeds = np.random.SeedSequence(args.seed).generate_state(len(chunks))
+
+    start = time.perf_counter()
+    results = [[] for _ in settings]
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(simulate, settings[index], runs, int(seed)) for (index, runs), seed in zip(chunks, seeds)]
+        for (index, _), future in zip(chunks, futures):
+            results[index].append(future.result())
+    elapsed = time.perf_counter() - start
+
+    print(f'  {"trainer dmg":>11} {"chal dmg":>9} {"hp":>4} {"count":>5} {"chal max":>8} {"chals":>5} {"run win":>8}   turns p10 p50 p90   hp left p10 p50 p90')
+    for combination, chunk_results in zip(settings, results):
+        won = np.concatenate([result['won'] for result in chunk_results])
+        turns = np.concatenate([result['turns'] for result in chunk_results])
+        hp_left = np.concatenate([result['hp_left'] for result in chunk_results])
+        print(f'  {"%d-%d" % combination["trainer_damage"]:>11} {"%d-%d" % combination["chal_damage"]:>9} {combination["pokemon_hp"]:>4} '
+              f'{combination["pokemon_count"]:>5} {combination["max_chal_count"]:>8} {combination["challengers"]:>5} {won.mean():8.1%}'
+              f'   {percentiles(turns)}         {percentiles(hp_left)}')
+
+    battles = len(settings) * args.battles * max(args.challengers)
+    print(f'  {len(settings)} combinations of {args.battles} runs in {elapsed:.1f} s on {args.workers} workers (up to {battles / elapsed:,.0f} battles per second)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+""" cost of animating the map tiles
+
+ticks the animation clock every frame for a streamed world (baked chunks, only the animated cells are
+drawn again) and for the whole map loaded as tile sprites (GameMapTSX, the tiles follow their flyweight).
+Both are drawn with the camera. Prints the number of animated gids and cells and the mean frame time.
+
+run from the project folder:
+    python -m benchmarks.bench_animated_tiles [path/to/map.tmx]
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import sys
+import time
+import pygame
+from config.config import Config
+from gameplay.camera import ExploreCamera
+from gameplay.environments import Layer, YSortLayer, GameMapTSX, AnimationClock, AnimatedFlyweightTile
+from gameplay.streaming import ChunkedWorld
+
+FRAMES = 600
+FRAME_MS = 1000 // Config.FRAMERATE
+
+
+class Focus(pygame.sprite.Sprite):
+    def __init__(self):
+        super().__init__()
+        self.rect = pygame.Rect(Config.SCREEN_WIDTH // 2, Config.SCREEN_HEIGHT // 2, 1, 1)
+
+
+def run(name, environment, screen, update):
+    camera = ExploreCamera()
+    camera.add_group(environment.create_env(layers=['base', 'grass'], layer_group=Layer()),
+                     environment.create_env(layers=['houses', 'extra'], layer_group=YSortLayer()))
+    camera.set_bounds(*environment.size)
+    focus = Focus()
+    update(focus)
+
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        AnimationClock.tick(frame * FRAME_MS)
+        update(focus)
+        camera.custom_focus(screen, focus)
+    print(f'  {name:<22}{(time.perf_counter() - start) / FRAMES * 1000:>8.3f} ms per frame')
+
+
+def main():
+    screen = pygame.display.set_mode((Config.SCREEN_WIDTH, Config.SCREEN_HEIGHT))
+    filename = sys.argv[1] if len(sys.argv) > 1 else r'./assets/hometown/hometown.tmx'
+
+    world = ChunkedWorld(filename)
+    run('chunks (baked)', world, screen, lambda focus: world.update(focus.rect))
+    animated = sum(len(chunk.animated) for chunk in world.loaded.values())
+    gids = sum(isinstance(flyweight, AnimatedFlyweightTile) for flyweight in world.flyweight_factory._tiles.values())
+    print(f'  {gids} animated gids, {animated} animated cells in {len(world.loaded)} loaded chunks')
+
+    tiles = GameMapTSX(filename)
+    run('tile sprites', tiles, screen, lambda focus: None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+""" headless battles
+
+plays random battles out on the battle core alone (no sprites, surfaces or timers), the trainer's
+lineup against a challenger's with random moves like the game generates, both sides picking random
+moves, and prints the battles per second and how often the trainer wins.
+
+run from the project folder:
+    python -m benchmarks.bench_battle_core [battles]
+"""
+import os
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import sys
+import time
+import random
+from config.config import Config
+from gameplay.battle_core import BattleCore, Fighter
+
+
+def lineup(size, min_damage, max_damage, rng):
+    return [Fighter(f'pokemon {index}', Config.POKEMON_HP,
+                    [(f'move {move}', rng.randint(min_damage, max_damage)) for move in range(4)])
+            for index in range(size)]
+
+
+def play(rng):
+    """ plays a battle out, returns the winner and the number of turns"""
+    core = BattleCore(lineup(Config.MAX_CHAL_COUNT, Config.TRAINER_MIN_DAMAGE, Config.TRAINER_MAX_DAMAGE, rng),
+                      lineup(rng.randint(1, Config.MAX_CHAL_COUNT), Config.CHAL_MIN_DAMAGE, Config.CHAL_MAX_DAMAGE, rng))
+    turns = 0
+    while not core.over:
+        core.step(rng.choice(core.actions()))
+        turns += 1
+    return core.winner, turns
+
+
+def main():
+    battles = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rng = random.Random(1)
+
+    start = time.perf_counter()
+    results = [play(rng) for _ in range(battles)]
+    elapsed = time.perf_counter() - start
+
+    wins = sum(winner == BattleCore.TRAINER for winner, _ in results)
+    turns = sum(turns for _, turns in results)
+    print(f'  {battles / elapsed:10.0f} battles per second ({turns / battles:.1f} turns per battle), trainer won {wins / battles:.1%}')
+
+
+if __name__ == '__main__':
+    main()
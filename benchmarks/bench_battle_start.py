@@ -0,0 +1,88 @@
+""" time to start a battle
+
+back to back battles of the trainer's lineup against challengers, timing BattleLevelCreator.create and
+the initialization of every fighter. Compares a new level with new pokemon gui elements for every battle
+(what the game did) with the pooled level, which is set up again for the next challenger.
+
+run from the project folder:
+    python -m benchmarks.bench_battle_start [battles]
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import sys
+import time
+import pygame
+from config.config import Config
+
+POKEMON_IMAGE = r'./assets/images/poke-icon.png'
+
+
+def poke_info(name):
+    return {'name': name, 'moves': [{'move': {'name': f'move {index}'}} for index in range(4)],
+            'front': POKEMON_IMAGE, 'back': POKEMON_IMAGE}
+
+
+class Challenger:
+    """ stands in for a challenger whose pokemon have been generated"""
+    def __init__(self, lineup):
+        self.pokemon = lineup
+        self.defeated = False
+
+
+def battle(gamestate, challenger, pooled):
+    """ milliseconds to start a battle with the challenger, including initializing every fighter"""
+    from gameplay.levels import BattleLevelCreator, LevelStore
+    from gameplay.jobs import JobScheduler
+    # every challenger's pokemon are new to battles
+    fresh = [*challenger.pokemon]
+    if not pooled:
+        BattleLevelCreator._pool.clear()
+        fresh += [*LevelStore.trainer_mediator.notify_pokemon('get_all')]
+    for pokemon in fresh:
+        pokemon.gui_elements.clear()
+
+    LevelStore.trainer_mediator.notify('get').is_challenged = challenger
+    start = time.perf_counter()
+    level = BattleLevelCreator.create(gamestate.screen, gamestate)
+    JobScheduler.finish(level)
+    elapsed = (time.perf_counter() - start) * 1000
+    level.finished = True # the battle is over
+    return elapsed
+
+
+def main():
+    pygame.init()
+    pygame.mixer.init()
+    battles = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    screen = pygame.display.set_mode((Config.SCREEN_WIDTH, Config.SCREEN_HEIGHT))
+
+    from config.gamestate import GameState
+    from gameplay.levels import LevelStore
+    from gameplay.battle import Lineup, BattleMediator
+    from gameplay.jobs import JobScheduler
+    from gui_builders.gui import GUIBuilder, GUIDirector
+    from sprites.pokemon import OtherPokemon
+    gamestate = GameState()
+    gamestate.screen = screen
+    LevelStore.trainer_mediator.notify_set(LevelStore)
+    lineup = LevelStore.trainer_mediator.notify_pokemon('get_all')
+    for index in range(Config.MAX_CHAL_COUNT):
+        LevelStore.trainer_mediator.notify_pokemon('add_pokemon', poke_info(f'trainer {index}'))
+    JobScheduler.finish(lineup)
+
+    bd = GUIDirector(GUIBuilder())
+    challengers = []
+    for _ in range(battles):
+        challenger = Challenger(Lineup([OtherPokemon(poke_info(f'other {index}')) for index in range(Config.MAX_CHAL_COUNT)]))
+        challenger.pokemon.mediator = BattleMediator(lineup, challenger.pokemon, bd)
+        challengers.append(challenger)
+
+    for name, pooled in (('new level', False), ('pooled level', True)):
+        times = [battle(gamestate, challenger, pooled) for challenger in challengers]
+        print(f'  {name:<14}{sum(times) / len(times):7.2f} ms per battle start (first {times[0]:.2f} ms, frame {1000 / Config.FRAMERATE:.2f} ms)')
+
+
+if __name__ == '__main__':
+    main()
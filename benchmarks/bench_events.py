@@ -0,0 +1,66 @@
+""" per event cost of walking the handler chain and of the dispatch table
+
+floods the handlers with mouse motion (as a fast mouse does) with some key presses mixed in, on the
+choose and explore states. The chain is walked for every state for every event like the main loop did
+before, the dispatcher coalesces the motion and only calls the handlers of the current state.
+
+run from the project folder:
+    python -m benchmarks.bench_events [events per frame]
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import sys
+import time
+import pygame
+from config.config import Config
+
+FRAMES = 200
+
+
+def flood(count):
+    events = []
+    for index in range(count):
+        if index % 50 == 49:
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_z))
+        else:
+            events.append(pygame.event.Event(pygame.MOUSEMOTION, pos=(index % Config.SCREEN_WIDTH, 10), rel=(1, 0), buttons=(0, 0, 0)))
+    return events
+
+
+def main():
+    pygame.display.set_mode((Config.SCREEN_WIDTH, Config.SCREEN_HEIGHT))
+    from config.gamestate import GameState, GamePlayer
+    from gameplay.levels import HandlerCreator
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    gamestate = GameState()
+    dispatcher = HandlerCreator.create_handlers(gamestate, GamePlayer(gamestate))
+    # the first handler of the chain the dispatcher was made from
+    chain = dispatcher._table[('welcome', pygame.KEYDOWN)][0].__self__
+    events = flood(count)
+
+    for state in ('choose', 'explore_hometown'):
+        gamestate.current_state = state
+
+        start = time.perf_counter()
+        for _ in range(FRAMES):
+            for event in events:
+                for handler_state in gamestate._states:
+                    chain.handle(handler_state, event)
+        chain_us = (time.perf_counter() - start) / (FRAMES * count) * 1e6
+
+        start = time.perf_counter()
+        dispatched = 0
+        for _ in range(FRAMES):
+            for event in dispatcher.coalesce(events):
+                dispatcher.dispatch(event)
+                dispatched += 1
+        table_us = (time.perf_counter() - start) / (FRAMES * count) * 1e6
+
+        print(f'  {state:<18} chain {chain_us:7.2f} us per event, dispatcher {table_us:7.2f} us per event '
+              f'({dispatched // FRAMES} of {count} events dispatched per frame)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+""" background tasks under Clock.tick and under the FramePacer
+
+runs a game loop that renders for a few milliseconds per frame while fake fetches (a chain of
+network waits like the pokemon pages) run as tasks. With Clock.tick the thread sleeps for the rest of
+every frame and the fetches only progress at the single sleep(0) per frame, with the pacer they run in
+the idle part of the frame. Prints how long the fetches took and the pacer's frame report.
+
+run from the project folder:
+    python -m benchmarks.bench_frame_pacing [fetches] [render ms]
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import sys
+import time
+import asyncio
+import pygame
+from config.config import Config
+from gameplay.pacer import FramePacer
+
+REQUESTS_PER_FETCH = 10 # sequential requests of a fetch
+LATENCY = 0.003 # seconds of a request
+
+
+async def fetch():
+    for _ in range(REQUESTS_PER_FETCH):
+        await asyncio.sleep(LATENCY)
+
+
+def render(ms):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+async def run(name, fetches, render_ms, wait):
+    tasks = [asyncio.create_task(fetch()) for _ in range(fetches)]
+    start = time.perf_counter()
+    frames = 0
+    while not all(task.done() for task in tasks):
+        render(render_ms)
+        await wait()
+        frames += 1
+    print(f'  {name:<12}{fetches} fetches done in {time.perf_counter() - start:.3f} s, {frames} frames')
+
+
+async def main():
+    pygame.init()
+    fetches = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    render_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    clock = pygame.time.Clock()
+
+    async def tick():
+        clock.tick(Config.FRAMERATE)
+        await asyncio.sleep(0)
+
+    await run('Clock.tick', fetches, render_ms, tick)
+    pacer = FramePacer(Config.FRAMERATE)
+    await run('FramePacer', fetches, render_ms, pacer.wait)
+    print(f'  pacer report (ms per frame) {pacer.report()}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+""" hit testing the pokemon tiles of the choose screen
+
+compares testing the rect of every tile (twice, once to find out if any tile is hovered and once to
+find it, like the choose handler did for every mouse event) with the arithmetic lookup of the grid
+layout, for mouse positions all over the screen.
+
+run from the project folder:
+    python -m benchmarks.bench_hover
+"""
+import os
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import time
+import random
+import pygame
+from config.config import Config
+from gui_builders.layout import GridLayout
+
+POSITIONS = 100000
+
+
+def scan(rects, pos):
+    if all(not rect.collidepoint(pos) for rect in rects):
+        return None
+    for index, rect in enumerate(rects):
+        if rect.collidepoint(pos):
+            return index
+
+
+def main():
+    random.seed(1)
+    layout = GridLayout.for_tiles(cols=4, rows=4)
+    rects = [layout.rect(index) for index in range(layout.cols * layout.rows)]
+    positions = [(random.randrange(Config.SCREEN_WIDTH), random.randrange(Config.SCREEN_HEIGHT)) for _ in range(POSITIONS)]
+
+    for name, find in (('rect scan', lambda pos: scan(rects, pos)), ('grid lookup', layout.cell_at)):
+        start = time.perf_counter()
+        hits = sum(find(pos) is not None for pos in positions)
+        print(f'  {name:<12}{(time.perf_counter() - start) / POSITIONS * 1e6:6.2f} us per lookup ({hits} on a tile)')
+
+
+if __name__ == '__main__':
+    main()
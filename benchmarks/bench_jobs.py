@@ -0,0 +1,67 @@
+""" frame hitches of heavy level work done at once and in the job scheduler
+
+builds surfaces like the choose level's pokemon tiles (scaling a sprite and drawing it on a tile), all
+in one frame and as a job stepped in the time left over of 60 fps frames that already spend some time
+rendering. Prints the slowest frame and how many frames the work took.
+
+run from the project folder:
+    python -m benchmarks.bench_jobs [tiles] [render ms]
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import sys
+import time
+import pygame
+from config.config import Config
+from gameplay.jobs import JobScheduler
+
+SPRITE = 475 # size of the pokemon sprites that are scaled down
+
+
+def build_tile(sprite):
+    tile = pygame.Surface((Config.SCREEN_WIDTH // 4, Config.SCREEN_HEIGHT // 4))
+    image = pygame.transform.smoothscale(sprite, (tile.get_height(), tile.get_height()))
+    tile.blit(image, image.get_rect(center=tile.get_rect().center))
+    return tile
+
+
+def build_tiles(sprite, count):
+    tiles = []
+    for _ in range(count):
+        tiles.append(build_tile(sprite))
+        yield
+    return tiles
+
+
+def render(ms):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+def main():
+    pygame.display.set_mode((1, 1))
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    render_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 8
+    sprite = pygame.Surface((SPRITE, SPRITE))
+    frame = 1 / Config.FRAMERATE
+
+    start = time.perf_counter()
+    render(render_ms)
+    tiles = [build_tile(sprite) for _ in range(count)]
+    print(f'  at once      {len(tiles)} tiles, 1 frame of {(time.perf_counter() - start) * 1000:.2f} ms')
+
+    future = JobScheduler.submit(build_tiles(sprite, count), JobScheduler.URGENT)
+    frames = []
+    while not future.done():
+        start = time.perf_counter()
+        render(render_ms)
+        JobScheduler.run(start + frame - time.perf_counter() - Config.JOB_MARGIN_MS / 1000)
+        frames.append((time.perf_counter() - start) * 1000)
+    print(f'  job          {len(future.result())} tiles, {len(frames)} frames, slowest {max(frames):.2f} ms '
+          f'(frame budget {frame * 1000:.2f} ms)')
+
+
+if __name__ == '__main__':
+    main()
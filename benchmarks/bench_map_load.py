@@ -0,0 +1,62 @@
+""" level entry time of the explore map for the tmx and compiled map paths
+
+measures what HomeTownRenderer.render_environment does with the map: loading it and creating
+the tiles of the base and y sorted layers. The compiled map is (re)built next to the tmx file first.
+
+run from the project folder:
+    python -m benchmarks.bench_map_load [path/to/map.tmx]
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import sys
+import time
+import pygame
+from gameplay import mapformat
+from gameplay.environments import GameMapTSX, Layer, YSortLayer
+
+RUNS = 10
+
+
+def enter_level(filename):
+    """ the map work done when entering the explore level"""
+    tsx = GameMapTSX(filename)
+    tsx.create_env(layers=['base', 'grass'], layer_group=Layer())
+    tsx.create_env(layers=['houses', 'extra'], layer_group=YSortLayer())
+
+
+def timed(filename, prepare, run=enter_level):
+    total = 0
+    for _ in range(RUNS):
+        prepare()
+        start = time.perf_counter()
+        run(filename)
+        total += time.perf_counter() - start
+    return total / RUNS * 1000
+
+
+def main():
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+
+    filename = sys.argv[1] if len(sys.argv) > 1 else r'./assets/hometown/hometown.tmx'
+    baked = mapformat.compile_map(filename)
+
+    def cold_tmx():
+        # make the tmx file newer than the compiled map to force the fallback
+        mapformat._MAPS.clear()
+        os.utime(baked, (0, 0))
+
+    def cold_baked():
+        mapformat._MAPS.clear()
+        os.utime(baked, None)
+
+    print(f'{"ms, mean of " + str(RUNS):<28}{"map load":>10}{"level entry":>14}')
+    for name, prepare in (('tmx, first entry', cold_tmx), ('compiled, first entry', cold_baked), ('restart (cached map)', lambda: None)):
+        load = timed(filename, prepare, mapformat.load_map)
+        entry = timed(filename, prepare)
+        print(f'  {name:<26}{load:>10.2f}{entry:>14.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+""" microbenchmark for ExploreSprite.create_mask
+
+compares rebuilding the mask and outline values on every call (the previous behaviour)
+against the per frame cache, for a sprite cycling through 3 animation frames while it walks around the world
+
+run from the project folder:
+    python -m benchmarks.bench_masks
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import timeit
+import pygame
+from sprites.sprites import ExploreSprite
+
+CALLS = 20000
+
+
+def make_frames():
+    """ three trainer sized frames with a roughly person shaped outline"""
+    frames = []
+    for step in range(3):
+        frame = pygame.Surface((42, 48))
+        frame.set_colorkey((255, 255, 255))
+        frame.fill((255, 255, 255))
+        pygame.draw.ellipse(frame, (200, 40, 40), (8, 0, 26, 20))
+        pygame.draw.rect(frame, (40, 40, 200), (10 + step, 18, 22, 22))
+        pygame.draw.rect(frame, (20, 20, 20), (12 - step, 40, 18, 8))
+        frames.append(frame)
+    return frames
+
+
+def uncached_create_mask(sprite):
+    """ the create_mask implementation before frame caching"""
+    sprite.mask = pygame.mask.from_surface(sprite.image)
+    outline = sprite.mask.outline()
+    if outline:
+        new_outline = [(x + sprite.rect.x, y + sprite.rect.y) for x, y in sprite.mask.outline()]
+        sorty = sorted(new_outline, key=lambda x: x[1])
+        sortx = sorted(new_outline, key=lambda x: x[0])
+        sprite.right, sprite.bottom = sortx[-1][0], sorty[-1][1]
+        sprite.left, sprite.top = sortx[0][0], sorty[0][1]
+        sprite.centery = (sprite.top + sprite.bottom) / 2
+        sprite.centerx = (sprite.left + sprite.right) / 2
+
+
+def run(create_mask, frames, moving):
+    sprite = ExploreSprite()
+    sprite.rect = frames[0].get_rect(topleft=(0, 100))
+    counter = [0]
+
+    def step():
+        counter[0] += 1
+        sprite.image = frames[counter[0] // 10 % len(frames)]
+        if moving:
+            sprite.rect.topleft = (counter[0] % 300, 100)
+        create_mask(sprite)
+
+    return timeit.timeit(step, number=CALLS) / CALLS * 1e6
+
+
+def main():
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    frames = make_frames()
+
+    print(f'{"case":<30}{"uncached us/call":>18}{"cached us/call":>18}')
+    for name, moving in (('standing still', False), ('walking (position changes)', True)):
+        before = run(uncached_create_mask, frames, moving)
+        after = run(ExploreSprite.create_mask, frames, moving)
+        print(f'{name:<30}{before:>18.2f}{after:>18.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+""" cost of the minimap per frame
+
+prints the time to make the cached base once and the per frame cost of drawing the minimap when the
+markers stand still and when the trainer moves every frame.
+
+run from the project folder:
+    python -m benchmarks.bench_minimap [path/to/map.tmx] [challengers]
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import sys
+import time
+import random
+import pygame
+from config.config import Config
+from gameplay.mapformat import load_map
+from gameplay.minimap import Minimap
+
+FRAMES = 2000
+
+
+class Marker(pygame.sprite.Sprite):
+    def __init__(self, pos):
+        super().__init__()
+        self.rect = pygame.Rect(pos, (Config.TILE_WIDTH, Config.TILE_HEIGHT))
+
+
+def main():
+    screen = pygame.display.set_mode((Config.SCREEN_WIDTH, Config.SCREEN_HEIGHT))
+    filename = sys.argv[1] if len(sys.argv) > 1 else r'./assets/hometown/hometown.tmx'
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    random.seed(1)
+
+    tmx = load_map(filename)
+    width, height = tmx.width * Config.TILE_X_SPACING, tmx.height * Config.TILE_Y_SPACING
+    challengers = [Marker((random.randrange(width), random.randrange(height))) for _ in range(count)]
+    items = [Marker((random.randrange(width), random.randrange(height))) for _ in range(2)]
+    trainer = Marker((0, 0))
+
+    minimap = Minimap(filename)
+    start = time.perf_counter()
+    minimap.base
+    print(f'map {tmx.width}x{tmx.height}, base made in {(time.perf_counter() - start) * 1000:.1f} ms, {count} challengers')
+
+    for name, speed in (('standing still', 0), ('walking', 4)):
+        start = time.perf_counter()
+        for frame in range(FRAMES):
+            trainer.rect.topleft = (frame * speed % width, frame * speed % height)
+            minimap.draw(screen, trainer, challengers, items)
+        print(f'  {name:<16}{(time.perf_counter() - start) / FRAMES * 1000:.3f} ms per frame')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+""" frame cost of a world with many challengers, scheduled by distance versus all active
+
+500 challengers are spread over the map and the trainer walks diagonally across it. The baseline keeps
+every challenger in the y sort layer and steps it every frame (what the explore level did before the
+npc scheduler), the scheduled run uses NPCScheduler. Each frame does what the explore level does
+with the layer: stream the map, draw it with the camera and check the trainer's collisions.
+
+run from the project folder:
+    python -m benchmarks.bench_npcs [path/to/map.tmx] [challengers]
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import sys
+import time
+import random
+import pygame
+from config.config import Config
+from gameplay.camera import ExploreCamera
+from gameplay.environments import Layer, YSortLayer
+from gameplay.streaming import ChunkedWorld
+from gameplay.npc_scheduler import NPCScheduler
+from sprites.challenger import Challenger
+
+SPEED = 4 # pixels per frame
+
+
+class Walker(pygame.sprite.Sprite):
+    def __init__(self):
+        super().__init__()
+        self.image = pygame.Surface((Config.TILE_WIDTH, Config.TILE_HEIGHT))
+        self.rect = self.image.get_rect()
+
+
+def run(filename, count, scheduled):
+    screen = pygame.display.get_surface()
+    random.seed(1)
+
+    world = ChunkedWorld(filename)
+    ysort = YSortLayer()
+    camera = ExploreCamera()
+    camera.add_group(world.create_env(layers=['base', 'grass'], layer_group=Layer()), world.create_env(layers=['houses', 'extra'], layer_group=ysort))
+    camera.set_bounds(*world.size)
+    width, height = world.size
+
+    start = time.perf_counter()
+    challengers = [Challenger(random.choice(('up', 'down', 'left', 'right')), (random.randint(1, width - 1), random.randint(1, height - 1))) for _ in range(count)]
+    ysort.add(*challengers)
+    scheduler = NPCScheduler(ysort)
+    if scheduled:
+        for challenger in challengers:
+            scheduler.register(challenger)
+    else:
+        for challenger in challengers:
+            challenger.wake()
+    setup = (time.perf_counter() - start) * 1000
+
+    walker = Walker()
+    steps = min(width, height) // SPEED - 1
+    frames, stepped = [], 0
+    for step in range(steps):
+        start = time.perf_counter()
+        walker.rect.topleft = (step * SPEED, step * SPEED)
+        world.update(walker.rect)
+        if scheduled:
+            stepped += scheduler.update(walker.rect, camera.view)
+        else:
+            for challenger in challengers:
+                challenger.step(walker)
+            stepped += len(challengers)
+        camera.custom_focus(screen, walker)
+        pygame.sprite.spritecollide(walker, ysort, False)
+        frames.append((time.perf_counter() - start) * 1000)
+
+    frames.sort()
+    name = 'scheduled' if scheduled else 'all active'
+    print(f'  {name:<12}{setup:>10.1f}{sum(frames) / len(frames):>10.2f}{frames[int(len(frames) * 0.99)]:>10.2f}{stepped / len(frames):>14.1f}')
+    if scheduled:
+        print(f'  {scheduler.report()}')
+
+
+def main():
+    pygame.display.set_mode((Config.SCREEN_WIDTH, Config.SCREEN_HEIGHT))
+    filename = sys.argv[1] if len(sys.argv) > 1 else r'./assets/hometown/hometown.tmx'
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    print(f'{count} challengers')
+    print(f'  {"":<12}{"setup ms":>10}{"mean ms":>10}{"p99 ms":>10}{"steps/frame":>14}')
+    run(filename, count, scheduled=False)
+    run(filename, count, scheduled=True)
+
+
+if __name__ == '__main__':
+    main()
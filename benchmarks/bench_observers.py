@@ -0,0 +1,71 @@
+""" observer notifications per frame
+
+replays a busy frame of the choose and explore levels (the hovered tile changing a few times, a pokemon
+being chosen, the battle timer being set again and an item picked up) on the level data observables
+with observers like the levels and handlers. Prints the notifications sent per frame with every
+observer notified of every change, with per field subscriptions, and with the frame batched as well.
+
+run from the project folder:
+    python -m benchmarks.bench_observers
+"""
+from contextlib import ExitStack
+from gameplay.dataobservers import ChooseLevelData, ExploreLevelData
+
+FRAMES = 1000
+HOVER_CHANGES = 6 # hovered tile changes in a frame of fast mouse movement
+
+
+class Observer:
+    def __init__(self):
+        self.updates = 0
+
+    def observe_update(self, field, data):
+        self.updates += 1
+
+
+def frame(choose, explore):
+    for tile in range(HOVER_CHANGES):
+        choose.set_field('hover', tile, unique=True)
+    choose.reset_field('hover')
+    choose.set_field('chosen', {'tile': 'pokemon'})
+    choose.unset_field('chosen', 'tile')
+
+    explore.set_field('timer', 'timer', unique=True)
+    explore.set_field('items', 'item')
+    explore.unset_field('items', 'item')
+
+
+def run(name, subscriptions, batched):
+    choose, explore = ChooseLevelData(), ExploreLevelData()
+    choose.detachall()
+    explore.detachall()
+    observers = [] # the observables only hold their observers weakly
+    for observable, subscribed in ((choose, subscriptions['choose']), (explore, subscriptions['explore'])):
+        for fields in subscribed:
+            observers.append(Observer())
+            observable.attach(observers[-1], fields=fields)
+
+    for _ in range(FRAMES):
+        with ExitStack() as stack:
+            if batched:
+                stack.enter_context(choose.batch())
+                stack.enter_context(explore.batch())
+            frame(choose, explore)
+
+    notifications = choose.notifications + explore.notifications
+    print(f'  {name:<28}{notifications / FRAMES:6.1f} notifications per frame')
+
+
+def main():
+    # the observers of the levels and handlers, with the fields they read
+    every_field = {'choose': [None, None], 'explore': [None, None]}
+    read_fields = {'choose': [['chosen', 'hover'], ['chosen']],
+                   'explore': [['items', 'timer', 'minimap'], ['items', 'timer', 'minimap']]}
+
+    run('every field, every change', every_field, batched=False)
+    run('subscribed fields', read_fields, batched=False)
+    run('subscribed fields, batched', read_fields, batched=True)
+
+
+if __name__ == '__main__':
+    main()
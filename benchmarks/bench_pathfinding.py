@@ -0,0 +1,105 @@
+""" path requests from many npcs served within the per frame budget
+
+compiles the navigation grid of a map, queues path requests between random walkable cells and
+processes them frame by frame like the explore level does. Prints the grid compile time, how many
+frames the requests took, the slowest frame and the cache hit rate when the same requests are repeated.
+Then challengers patrol routes between random walkable cells for a while of simulated time, asking the
+pathfinder for the paths between the points of their routes, and the points they reached are printed.
+
+run from the project folder:
+    python -m benchmarks.bench_pathfinding [path/to/map.tmx] [requests] [max distance in cells]
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import sys
+import time
+import random
+import pygame
+from config.config import Config
+from gameplay.navigation import NavGrid, Pathfinder
+from gameplay.clock import GameClock
+from sprites.challenger import Challenger
+
+PATROLLERS = 20 # challengers patrolling
+PATROL_SECONDS = 20 # simulated seconds of patrolling
+
+
+def random_cell(grid, near=None, distance=None):
+    while True:
+        if near:
+            cell = near[0] + random.randint(-distance, distance), near[1] + random.randint(-distance, distance)
+        else:
+            cell = random.randrange(grid.width), random.randrange(grid.height)
+        if grid.walkable(cell):
+            return cell
+
+
+def serve(pathfinder, requests):
+    found = []
+    for start, goal in requests:
+        pathfinder.request(start, goal, found.append)
+
+    frames = []
+    while pathfinder.pending:
+        start = time.perf_counter()
+        pathfinder.process()
+        frames.append((time.perf_counter() - start) * 1000)
+    return found, frames
+
+
+def patrol(grid, distance):
+    """ challengers patrolling routes of 3 points, stepped once per simulation step like the npc scheduler
+    does for the challengers on screen. Returns the frame times and the points of the routes reached"""
+    pathfinder = Pathfinder(grid)
+    challengers = []
+    for _ in range(PATROLLERS):
+        start = random_cell(grid)
+        challenger = Challenger('down', grid.center_of(start))
+        challenger.route = [start, random_cell(grid, start, distance), random_cell(grid, start, distance)]
+        challenger.pathfinder = pathfinder
+        challengers.append(challenger)
+
+    frames, reached = [], 0
+    for _ in range(int(PATROL_SECONDS / GameClock.STEP)):
+        start = time.perf_counter()
+        for challenger in challengers:
+            index = challenger._route_index
+            challenger.step(trainer=None)
+            reached += challenger._route_index != index
+        pathfinder.process()
+        frames.append((time.perf_counter() - start) * 1000)
+    return frames, reached
+
+
+def main():
+    pygame.display.set_mode((1, 1))
+    filename = sys.argv[1] if len(sys.argv) > 1 else r'./assets/hometown/hometown.tmx'
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    distance = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    random.seed(1)
+
+    start = time.perf_counter()
+    grid = NavGrid.compile(filename, ['houses', 'extra'])
+    print(f'grid {grid.width}x{grid.height} compiled in {(time.perf_counter() - start) * 1000:.1f} ms')
+
+    pathfinder = Pathfinder(grid)
+    requests = []
+    for _ in range(count):
+        begin = random_cell(grid)
+        requests.append((begin, random_cell(grid, begin, distance)))
+
+    for name in ('first', 'repeated'):
+        found, frames = serve(pathfinder, requests)
+        paths = [path for path in found if path]
+        print(f'  {name:<10} {len(found)} answered ({len(paths)} with a path) in {len(frames)} frames, '
+              f'slowest frame {max(frames, default=0):.2f} ms (budget {Config.PATH_BUDGET_MS} ms), '
+              f'hits {pathfinder.hits} misses {pathfinder.misses}')
+
+    frames, reached = patrol(grid, distance)
+    print(f'  patrols    {PATROLLERS} challengers reached {reached} points of their routes in {PATROL_SECONDS} s, '
+          f'slowest frame {max(frames):.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
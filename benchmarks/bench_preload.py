@@ -0,0 +1,64 @@
+""" hitch of the transition from the choose level to the hometown
+
+times the frame that changes the state to the hometown when the level is created then and there,
+and when it was built in the background by the preloader while the choose level was on screen
+(the longest slice of the build is printed too, it runs in the time left over at the end of a frame).
+
+run from the project folder:
+    python -m benchmarks.bench_preload
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import time
+import pygame
+from config.config import Config
+
+
+def transition(gamestate):
+    """ milliseconds the change to the hometown takes"""
+    start = time.perf_counter()
+    gamestate.change_state('explore_hometown')
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    pygame.init()
+    pygame.mixer.init()
+    screen = pygame.display.set_mode((Config.SCREEN_WIDTH, Config.SCREEN_HEIGHT))
+
+    from config.gamestate import GameState
+    from gameplay.levels import LevelStore
+    from gameplay.jobs import JobScheduler
+    gamestate = GameState()
+    gamestate.screen = screen
+    gameplayer = gamestate.gameplayer
+
+    # the first game loads the assets, which are kept by the next ones
+    gameplayer.reset()
+    gamestate.change_state('choose')
+    transition(gamestate)
+
+    # created in the frame of the transition
+    gameplayer.reset()
+    gamestate.current_state = 'welcome'
+    gamestate.change_state('choose')
+    print(f'  created on transition   {transition(gamestate):8.2f} ms')
+
+    # built in slices at the end of the frames of the choose level
+    gameplayer.reset()
+    gamestate.current_state = 'welcome'
+    gamestate.change_state('choose')
+    # the choose level starts the preload once the fetcher has a page of pokemon, started here instead
+    gamestate.preload('explore_hometown')
+    longest = 0
+    while LevelStore.preloader.pending('explore_hometown'):
+        start = time.perf_counter()
+        JobScheduler.run(0)
+        longest = max(longest, (time.perf_counter() - start) * 1000)
+    print(f'  preloaded               {transition(gamestate):8.2f} ms (longest slice of the build {longest:.2f} ms)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+""" restart to playable latency
+
+times making the levels of a run (welcome, choose and the hometown, the levels a player goes through
+before exploring) on a cold start and again after GamePlayer.reset, which keeps the loaded assets
+(Resources, maps, fonts) and only resets the state of the run.
+
+run from the project folder:
+    python -m benchmarks.bench_restart [restarts]
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import sys
+import time
+import pygame
+from config.config import Config
+
+STATES = ['welcome', 'choose', 'explore_hometown']
+
+
+def play_run(gamestate, gameplayer):
+    """ make the levels of a run, returns the milliseconds it took"""
+    start = time.perf_counter()
+    for state in STATES:
+        gamestate.current_state = state
+        gameplayer.render_level()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    pygame.init()
+    pygame.mixer.init()
+    restarts = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    screen = pygame.display.set_mode((Config.SCREEN_WIDTH, Config.SCREEN_HEIGHT))
+
+    start = time.perf_counter()
+    from config.gamestate import GameState, GamePlayer
+    from config.resources import Resources
+    from gameplay.levels import LevelStore
+    gamestate = GameState()
+    gamestate.screen = screen
+    gameplayer = GamePlayer(gamestate)
+    LevelStore.trainer_mediator.notify_set(LevelStore)
+    setup = (time.perf_counter() - start) * 1000
+
+    cold = play_run(gamestate, gameplayer)
+    print(f'  cold start     {setup + cold:8.2f} ms (imports and trainer {setup:.2f} ms, levels {cold:.2f} ms)')
+
+    warm = []
+    for _ in range(restarts):
+        start = time.perf_counter()
+        gameplayer.reset()
+        reset = (time.perf_counter() - start) * 1000
+        warm.append(reset + play_run(gamestate, gameplayer))
+    print(f'  warm restart   {sum(warm) / len(warm):8.2f} ms on average over {restarts} restarts, {Resources.report()}')
+
+
+if __name__ == '__main__':
+    main()
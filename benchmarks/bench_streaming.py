@@ -0,0 +1,66 @@
+""" frame cost and memory of the streamed world while walking across a map
+
+the trainer walks diagonally across the map, every frame the world is updated around it and the
+camera draws the loaded layers. Prints the slowest frames and the loaded chunks / baked bytes,
+which should stay flat however large the map is. Use a compiled map for large maps
+(python -m gameplay.mapformat map.tmx).
+
+run from the project folder:
+    python -m benchmarks.bench_streaming [path/to/map.tmx] [steps]
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import sys
+import time
+import pygame
+from config.config import Config
+from gameplay.camera import ExploreCamera
+from gameplay.environments import Layer, YSortLayer
+from gameplay.streaming import ChunkedWorld
+
+SPEED = 4 # pixels per frame, about the bike speed
+
+
+class Walker(pygame.sprite.Sprite):
+    def __init__(self):
+        super().__init__()
+        self.image = pygame.Surface((Config.TILE_WIDTH, Config.TILE_HEIGHT))
+        self.rect = self.image.get_rect()
+
+
+def main():
+    screen = pygame.display.set_mode((Config.SCREEN_WIDTH, Config.SCREEN_HEIGHT))
+    filename = sys.argv[1] if len(sys.argv) > 1 else r'./assets/hometown/hometown.tmx'
+
+    world = ChunkedWorld(filename)
+    base, ysort = world.create_env(layers=['base', 'grass'], layer_group=Layer()), world.create_env(layers=['houses', 'extra'], layer_group=YSortLayer())
+    camera = ExploreCamera()
+    camera.add_group(base, ysort)
+    camera.set_bounds(*world.size)
+
+    width, height = world.size
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else min(width, height) // SPEED - 1
+    walker = Walker()
+
+    frames, peak_memory, peak_loaded = [], 0, 0
+    for step in range(steps):
+        start = time.perf_counter()
+        walker.rect.topleft = (step * SPEED, step * SPEED)
+        world.update(walker.rect)
+        camera.custom_focus(screen, walker)
+        frames.append((time.perf_counter() - start) * 1000)
+
+        report = world.report()
+        peak_memory = max(peak_memory, report['memory'])
+        peak_loaded = max(peak_loaded, report['loaded'])
+
+    frames.sort()
+    print(f'map {world.map.width}x{world.map.height} tiles, {steps} frames')
+    print(f'  frame ms   mean {sum(frames) / len(frames):.2f}  p99 {frames[int(len(frames) * 0.99)]:.2f}  max {frames[-1]:.2f}')
+    print(f'  chunks     peak loaded {peak_loaded}, at end {world.report()}')
+    print(f'  baked      peak {peak_memory / 2 ** 20:.1f} MiB (budget {Config.CHUNK_MEMORY_BUDGET / 2 ** 20:.0f} MiB)')
+
+
+if __name__ == '__main__':
+    main()
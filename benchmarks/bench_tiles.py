@@ -0,0 +1,40 @@
+""" surfaces shared by the tile flyweights of a map
+
+prints the number of unique tile surfaces against the number of tiles, the bytes held by the
+unique surfaces and the bytes saved compared to every tile owning a scaled copy of its image.
+
+run from the project folder:
+    python -m benchmarks.bench_tiles [path/to/map.tmx]
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import sys
+import time
+import pygame
+from gameplay.environments import GameMapTSX, Layer, YSortLayer
+
+
+def main():
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+
+    filename = sys.argv[1] if len(sys.argv) > 1 else r'./assets/hometown/hometown.tmx'
+    tsx = GameMapTSX(filename)
+
+    start = time.perf_counter()
+    tsx.create_env(layers=['base', 'grass'], layer_group=Layer())
+    tsx.create_env(layers=['houses', 'extra'], layer_group=YSortLayer())
+    elapsed = (time.perf_counter() - start) * 1000
+
+    report = tsx.flyweight_factory.report()
+    print(f'map                {filename}')
+    print(f'tiles              {report["total_tiles"]}')
+    print(f'unique surfaces    {report["unique_surfaces"]}')
+    print(f'unique bytes       {report["unique_bytes"]:,}')
+    print(f'bytes saved        {report["bytes_saved"]:,}')
+    print(f'tile creation      {elapsed:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
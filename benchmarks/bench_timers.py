@@ -0,0 +1,58 @@
+""" cost of many concurrent timers
+
+compares counting down every timer every frame (what each owner did with wait before) with the
+heap of the TimerScheduler, which only looks at the timers that are due. Prints the time per frame
+for a number of timers with random durations.
+
+run from the project folder:
+    python -m benchmarks.bench_timers [timers]
+"""
+import os
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import sys
+import time
+import random
+from config.config import Config
+from gameplay.clock import GameClock
+from gameplay.timers import TimerScheduler
+
+FRAMES = 600
+
+
+class CountdownTimer:
+    """ the timers before the scheduler, counted down by their owner every frame"""
+    def __init__(self, time):
+        self.time = time
+
+    def wait(self):
+        if self.time > 0:
+            self.time = max(self.time - GameClock.frame_time, 0)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    random.seed(1)
+    durations = [random.uniform(0.5, 20) for _ in range(count)]
+    frame = 1 / Config.FRAMERATE
+
+    timers = [CountdownTimer(duration) for duration in durations]
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        GameClock.advance(frame)
+        for timer in timers:
+            timer.wait()
+    print(f'  countdown every frame {(time.perf_counter() - start) / FRAMES * 1e6:>8.1f} us per frame ({count} timers)')
+
+    fired = []
+    for duration in durations:
+        TimerScheduler.schedule(duration, lambda: fired.append(1))
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        GameClock.advance(frame)
+        TimerScheduler.tick()
+    print(f'  scheduler heap        {(time.perf_counter() - start) / FRAMES * 1e6:>8.1f} us per frame '
+          f'({len(fired)} fired, {TimerScheduler.pending()} pending)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+""" battles in turbo mode
+
+plays the same battles (the same random seed, the trainer choosing moves from its own seeded random)
+at normal speed, in turbo and with animations skipped, frame by frame at 60 frames per second of real
+time. Prints the frames and real seconds the battles took and checks that every mode gave exactly the
+same battles (the moves, damage and winners of the battle cores).
+
+run from the project folder:
+    python -m benchmarks.bench_turbo [battles]
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import sys
+import random
+import pygame
+from config.config import Config
+from benchmarks.bench_battle_start import poke_info, Challenger
+
+FRAME = 1 / 60
+MODES = [('normal', 1, False), ('turbo x10', 10, False), ('skip animations', 1, True), ('both', 10, True)]
+
+
+def recorded(step, played):
+    """ the step of a battle core, recording the events it returns"""
+    def step_and_record(action):
+        events = step(action)
+        played.extend(events)
+        return events
+    return step_and_record
+
+
+def play(screen, gamestate, battles, turbo, skip):
+    """ returns the frames the battles took and the events of their cores"""
+    from gameplay.levels import LevelStore, BattleLevelCreator
+    from gameplay.battle import Lineup, BattleMediator
+    from gameplay.jobs import JobScheduler
+    from gameplay.clock import GameClock
+    from gameplay.timers import TimerScheduler
+    from gui_builders.gui import GUIBuilder, GUIDirector
+    from sprites.pokemon import OtherPokemon
+
+    GameClock.turbo, GameClock.skip_animations = turbo, skip
+    random.seed(1)
+    trainer_choices = random.Random(2)
+
+    LevelStore.trainer_mediator.notify_set(LevelStore)
+    trainer_mediator = LevelStore.trainer_mediator
+    lineup = trainer_mediator.notify_pokemon('get_all')
+    for index in range(Config.MAX_CHAL_COUNT):
+        trainer_mediator.notify_pokemon('add_pokemon', poke_info(f'trainer {index}'))
+    JobScheduler.finish(lineup)
+
+    frames, events = 0, []
+    for _ in range(battles):
+        challenger = Challenger(Lineup([OtherPokemon(poke_info(f'other {index}')) for index in range(2)]))
+        challenger.pokemon.mediator = BattleMediator(lineup, challenger.pokemon, GUIDirector(GUIBuilder()))
+        trainer_mediator.notify('get').is_challenged = challenger
+        level = BattleLevelCreator.create(screen, gamestate)
+        JobScheduler.finish(level)
+
+        mediator, result = level.mediator, None
+        core, played = mediator.core, []
+        core.step = recorded(core.step, played)
+        while result is None:
+            GameClock.advance(FRAME)
+            TimerScheduler.tick()
+            result = mediator.current_fight(screen)
+            if mediator.can_attack('trainer'):
+                pokemon = trainer_mediator.notify_pokemon('get_single')
+                pokemon.attack(mediator, trainer_choices.randint(1, 4))
+            frames += 1
+        level.finish()
+        events.append((core.winner, played))
+        if not len(lineup):
+            break
+    return frames, events
+
+
+def main():
+    pygame.init()
+    pygame.mixer.init()
+    battles = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    screen = pygame.display.set_mode((Config.SCREEN_WIDTH, Config.SCREEN_HEIGHT))
+    from config.gamestate import GameState
+    gamestate = GameState()
+    gamestate.screen = screen
+
+    reference = None
+    for name, turbo, skip in MODES:
+        frames, events = play(screen, gamestate, battles, turbo, skip)
+        reference = reference or events
+        same = 'same battles' if events == reference else 'DIFFERENT battles'
+        print(f'  {name:<16}{frames:6} frames {frames * FRAME:7.1f} s  {same} (winners {[winner for winner, _ in events]})')
+
+
+if __name__ == '__main__':
+    main()
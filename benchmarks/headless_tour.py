@@ -0,0 +1,58 @@
+""" plays every level of the game headless
+
+sets the game up in headless mode with an uncapped frame rate (no window, no sound, no frame pacing)
+and plays each level for a number of frames through the main loop, a battle included, then prints the
+frames per second of each level. Meant for build servers: profiling, soak tests and checking that every
+level still runs without a display.
+
+run from the project folder:
+    python -m benchmarks.headless_tour [frames per level]
+"""
+import os
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import sys
+import time
+from config.config import Config
+from benchmarks.bench_battle_start import poke_info, Challenger
+
+STATES = ['welcome', 'choose', 'explore_hometown', 'controls', 'loading', 'battle']
+
+
+def challenge(trainer_mediator):
+    """ a challenger challenging the trainer, like one that has noticed them in the hometown"""
+    from gameplay.battle import Lineup, BattleMediator
+    from gameplay.jobs import JobScheduler
+    from gui_builders.gui import GUIBuilder, GUIDirector
+    from sprites.pokemon import OtherPokemon
+
+    lineup = trainer_mediator.notify_pokemon('get_all')
+    if not len(lineup):
+        for index in range(Config.MAX_CHAL_COUNT):
+            trainer_mediator.notify_pokemon('add_pokemon', poke_info(f'trainer {index}'))
+        JobScheduler.finish(lineup)
+    challenger = Challenger(Lineup([OtherPokemon(poke_info(f'other {index}')) for index in range(Config.MAX_CHAL_COUNT)]))
+    challenger.pokemon.mediator = BattleMediator(lineup, challenger.pokemon, GUIDirector(GUIBuilder()))
+    trainer_mediator.notify('get').is_challenged = challenger
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    Config.HEADLESS = Config.UNCAPPED = True
+    import main as game
+    from gameplay.levels import LevelStore
+    loop = game.MainGameLoop
+    loop.setup()
+
+    for state in STATES:
+        if state == 'battle':
+            challenge(LevelStore.trainer_mediator)
+        loop._GAME_STATE.change_state(state)
+
+        start = time.perf_counter()
+        played = loop.run(frames, until=lambda: loop._GAME_STATE.current_state != state)
+        elapsed = time.perf_counter() - start
+        print(f'  {state:<18}{played:5} frames {played / elapsed:8.0f} fps  (now in {loop._GAME_STATE.current_state})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+""" soak test of the level data observers over many restarts
+
+every cycle makes a level that attaches itself to the choose and explore data (like ChooseLevel and
+HomeTownLevel do) and holds a map sized surface and a reference cycle, plays a few frames of
+notifications, then is dropped the way a restart drops it (the game player forgets its levels and the
+levels are detached from the observables). Prints the live observers and the traced memory, which
+should stay flat, and the report of the observers that are alive at the end.
+
+run from the project folder:
+    python -m benchmarks.soak_restart [cycles]
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+import gc
+import sys
+import tracemalloc
+import pygame
+from config.config import Config
+from gameplay.dataobservers import ChooseLevelData, ExploreLevelData
+from gameplay.play_level import Level
+
+
+class SoakLevel(Level):
+    def __init__(self, choose, explore):
+        self.surface = pygame.Surface((Config.MAP_W, Config.MAP_H)) # stands in for the baked map
+        self.cycle = self # levels keep reference cycles through their sprites and callbacks
+        choose.attach(self, fields=['chosen', 'hover'])
+        explore.attach(self, fields=['items', 'timer', 'minimap'])
+
+    async def play_level(self):
+        pass
+
+    def observe_update(self, field, data):
+        self._fields[field] = data
+
+    @property
+    def fields(self):
+        return self._fields
+
+    @fields.setter
+    def fields(self, new_fields):
+        self._fields = new_fields
+
+
+class Handler:
+    """ lives as long as the game, like the event handlers"""
+    def observe_update(self, field, data):
+        pass
+
+
+def live(observables):
+    return sum(len(observable._observers) for observable in observables)
+
+
+def main():
+    pygame.display.set_mode((1, 1))
+    cycles = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    choose, explore = ChooseLevelData(), ExploreLevelData()
+    observables = [choose, explore]
+    handler = Handler()
+    for observable in observables:
+        observable.attach(handler)
+
+    tracemalloc.start()
+    levels = {} # the game player's levels
+    for cycle in range(1, cycles + 1):
+        levels['choose'] = SoakLevel(choose, explore)
+        for tile in range(10):
+            with choose.batch(), explore.batch():
+                choose.set_field('hover', tile, unique=True)
+                explore.set_field('timer', tile, unique=True)
+
+        # restart
+        levels.clear()
+        for observable in observables:
+            observable.detachall(Level)
+        gc.collect()
+
+        if cycle in (1, cycles // 2, cycles):
+            current, _ = tracemalloc.get_traced_memory()
+            print(f'  cycle {cycle:>4}  live observers {live(observables)}  traced memory {current / 1024:8.1f} KiB')
+
+    for observable in observables:
+        print(f'  {type(observable).__name__:<18}{observable.report()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import pygame
+import os
 import sys
 import math
 from typing import Tuple
@@ -46,6 +47,28 @@ class Config:
     # reduce by 10 to avoid walk overflow
     MAP_RECT = pygame.Rect(0, 0, MAP_W-10, MAP_H-10) # walkable area
 
+    TRIGGER_CELL_SIZE = TILE_WIDTH * 4 # size of the cells used to look up challenger sight triggers
+
+    # WORLD STREAMING (large maps are split into chunks of tiles that are loaded around the trainer)
+    CHUNK_TILES = 8 # width and height of a chunk in tiles
+    CHUNK_LOAD_RADIUS = 3 # chunks within this many chunks of the trainer are kept loaded
+    CHUNK_UNLOAD_RADIUS = 4 # chunks further than this are unloaded
+    CHUNK_MEMORY_BUDGET = 24 * 1024 * 1024 # max bytes of baked chunk surfaces
+    CHUNK_BAKE_BUDGET_MS = 2 # time per frame that may be spent baking chunks
+
+    # NPC SCHEDULING (npcs are updated less often the further they are from the trainer)
+    NPC_CELL_SIZE = CHUNK_TILES * TILE_WIDTH # size of the cells npcs are grouped in
+    NPC_WAKE_RADIUS = 2 # npcs within this many cells of the trainer are awake, the rest sleep
+    NPC_NEAR_INTERVAL = 4 # awake npcs that are off screen are updated every this many frames
+    NPC_SPEED = 120 # pixels per second an npc walks
+    PATH_BUDGET_MS = 1 # time per frame that may be spent finding paths for npcs
+
+    # MINIMAP
+    MINIMAP_SIZE = (150, 100) # size of the minimap in pixels
+    MINIMAP_TRAINER = (255, 0, 0) # marker colours
+    MINIMAP_CHALLENGER = (0, 0, 255)
+    MINIMAP_ITEM = (255, 255, 0)
+
     # COLOR CODES
     WHITE = (255, 255, 255)
     BLACK = (0, 0, 0)
@@ -67,12 +90,33 @@ class Config:
     CHAL_MAX_DAMAGE = 60
     
     FRAMERATE =  60 # default frame rate
+    SHOW_FRAME_STATS = False # draw the time per frame spent rendering, on background tasks and idle
+    # headless runs (profiling, soak tests, build servers), also set by the POKEBATTLE_HEADLESS and POKEBATTLE_UNCAPPED environment variables
+    HEADLESS = os.environ.get('POKEBATTLE_HEADLESS', '') not in ('', '0') # no window or sound (SDL dummy drivers) and no display updates
+    UNCAPPED = os.environ.get('POKEBATTLE_UNCAPPED', '') not in ('', '0') # frames are not paced, each counts as 1 / FRAMERATE of game time
+    JOB_MARGIN_MS = 2 # time at the end of a frame kept free of jobs (for updating the display and the event loop)
+
+    # SIMULATION (speeds are in pixels per second and times in seconds, see gameplay/clock.py)
+    SIMULATION_RATE = 60 # fixed number of simulation steps per second
+    MAX_STEPS_PER_FRAME = 5 # most steps simulated in one frame, after a stall the game slows down instead of jumping
+    # turbo mode for scripted runs and demo loops, also set by the POKEBATTLE_TURBO and POKEBATTLE_SKIP_ANIMATIONS environment variables
+    TURBO = float(os.environ.get('POKEBATTLE_TURBO', 1)) # simulated seconds per real second, the same steps are simulated, just more per frame
+    SKIP_ANIMATIONS = os.environ.get('POKEBATTLE_SKIP_ANIMATIONS', '') not in ('', '0') # delays and animations jump to their end
+    WALK_SPEED = 60 # trainer speeds
+    RUN_SPEED = 120
+    BIKE_SPEED = 180
+    POKEMON_FLOAT_IN_SPEED = 300 # speed of pokemon floating into a battle
+    POKEMON_FLOAT_OUT_SPEED = 600 # speed of fainted pokemon floating out
+    HP_DRAIN_RATE = 60 # health points the health bar drops per second when a pokemon is attacked
+
+    _FONTS = {} # font type -> fonts, loaded once per process
 
     @staticmethod
     def make_fonts(font_type='default'):
         """ this funciton is used to initialize fonts. 
         This can only be done in the file where pygame is initialized
-        so this function just maintains a dict of some fonts to be used throughout the game"""
+        so this function just maintains a dict of some fonts to be used throughout the game.
+        The fonts are loaded on the first call and shared after that"""
 
 
         fonts = {
@@ -102,11 +146,15 @@ class Config:
         if font_type not in fonts:
             font_type = 'default'
 
+        if font_type in Config._FONTS:
+            return Config._FONTS[font_type]
+
         font = fonts[font_type]
         font_file = font['file']
         sizes = font["sizes"]
 
         output_fonts = {size: pygame.font.Font(font_file, value) for size, value in sizes.items()}
+        Config._FONTS[font_type] = output_fonts
         return output_fonts
     
 
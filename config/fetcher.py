@@ -328,7 +328,8 @@ class FetchControls(Fetcher):
             'E': 'Pickup Item',
             'R': 'Toggle Bag',
             'Shift + Move': 'Run [ running shoes ]',
-            'F': 'Toggle Bike [ bike ]'
+            'F': 'Toggle Bike [ bike ]',
+            'M': 'Toggle Minimap'
         }
     },
     {
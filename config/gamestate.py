@@ -1,4 +1,5 @@
 from gameplay.levels import LevelFactory, LevelStore
+from gameplay.jobs import JobScheduler
 
 class GameState:
     """Singleton Class that manages the stages and state of the overall game"""
@@ -62,6 +63,11 @@ class GameState:
             # use should_not_rerender
             should_not_rerender = self.previous_state == 'controls'
             self.gameplayer.render_level(should_not_rerender)
+
+    def preload(self, state: str) -> None:
+        """Build the level of a state the game is likely to change to next in the background"""
+        if state in self._states:
+            self.gameplayer.preload_level(state)
     
 
 class GamePlayer:
@@ -90,6 +96,7 @@ class GamePlayer:
         """ reset all the levels and necessary variables when the player has lost"""
         
         self.__levels.clear() # clear the storage of the levels 
+        JobScheduler.cancel() # drop the work of the old levels
         LevelStore.reset()  # execute reset on level factory class
 
 
@@ -102,9 +109,34 @@ class GamePlayer:
         # rerender levels from scrath each time it is called when necessary
 
         if self.gamestate.current_state not in self.__levels or (self.gamestate._states[self.gamestate.current_state] and not should_not_rerender):
-            self.__levels[self.gamestate.current_state] = LevelFactory.create_level(level_type=self.gamestate.current_state, screen=self.gamestate.screen, gamestate=self.gamestate)
+            self.__levels[self.gamestate.current_state] = self._create_level(self.gamestate.current_state)
         return self.__levels[self.gamestate.current_state]
+
+    def preload_level(self, state):
+        """Build the level of the state in the background, unless it has been rendered and is not rerendered"""
+        if state not in self.__levels or self.gamestate._states[state]:
+            build = LevelFactory.preload_level(level_type=state, screen=self.gamestate.screen, gamestate=self.gamestate)
+            LevelStore.preloader.request(state, build)
+
+    def replace_level(self, state):
+        """Replace the level of the state, used by the loading level once the level it stands in for is built"""
+        self.__levels[state] = self._create_level(state)
+
+    def _create_level(self, state):
+        # a level built in the background is swapped in, and while it is still being built
+        # the loading level is shown in its place. Otherwise the level is created now
+        if LevelStore.preloader.pending(state):
+            return LevelFactory.create_level(level_type='loading', screen=self.gamestate.screen, gamestate=self.gamestate)
+        return LevelStore.preloader.take(state) or LevelFactory.create_level(level_type=state, screen=self.gamestate.screen, gamestate=self.gamestate)
     
+    def update_level(self):
+        """one fixed simulation step of the current level"""
+        try:
+            self.__levels[self.gamestate.current_state].update()
+        except KeyError:
+            # the level is rendered by play_level when the game is restarted
+            pass
+
     async def play_level(self):
         """handle the actual game play, key events, displaying, etc."""
         try:
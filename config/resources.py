@@ -0,0 +1,52 @@
+import pygame
+from sprites.spritesheets import SpriteSheet
+
+
+class Resources:
+    """ per process cache of the assets that never change: images, sprite sheets and sounds.
+
+    The game is split into per run state, which GamePlayer.reset throws away (the levels, the trainer,
+    the level data), and per process resources, which are loaded once and survive restarts. Besides
+    this cache the per process resources are the parsed maps (mapformat.load_map), tile flyweights
+    (FlyweightTileFactory.for_map), navigation grids, minimap bases, fonts (Config.make_fonts) and the
+    fetched pokemon data (LevelStore.fetcher).
+
+    Everything returned is shared, so it must be treated as read only (copy a surface before drawing on it)"""
+
+    _images = {} # (path, alpha) -> surface
+    _sheets = {} # (image file, json file) -> SpriteSheet
+    _sounds = {} # path -> Sound
+
+    @classmethod
+    def image(cls, path: str, alpha: bool = True) -> pygame.Surface:
+        """ image loaded from path, converted for the display"""
+        key = (path, alpha)
+        if key not in cls._images:
+            image = pygame.image.load(path)
+            cls._images[key] = image.convert_alpha() if alpha else image
+        return cls._images[key]
+
+    @classmethod
+    def sheet(cls, image_file: str, json_file: str) -> SpriteSheet:
+        key = (image_file, json_file)
+        if key not in cls._sheets:
+            cls._sheets[key] = SpriteSheet(image_file=image_file, json_file=json_file)
+        return cls._sheets[key]
+
+    @classmethod
+    def sound(cls, path: str) -> pygame.mixer.Sound:
+        if path not in cls._sounds:
+            cls._sounds[path] = pygame.mixer.Sound(path)
+        return cls._sounds[path]
+
+    @classmethod
+    def report(cls) -> dict:
+        """ number of cached resources of each kind"""
+        return {'images': len(cls._images), 'sheets': len(cls._sheets), 'sounds': len(cls._sounds)}
+
+    @classmethod
+    def clear(cls):
+        """ drop every cached resource (a cold start)"""
+        cls._images.clear()
+        cls._sheets.clear()
+        cls._sounds.clear()
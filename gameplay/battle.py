@@ -1,6 +1,9 @@
 from config.config import Config
 from gameplay.timers import Timers, Timer
+from gameplay.clock import GameClock
 from abc import ABC, abstractmethod
+from collections import deque
+from gameplay.battle_core import BattleCore
 
 
 class PokemonIterator:
@@ -100,7 +103,11 @@ class Lineup(AbstractLineup):
 
 class BattleMediator:
 
-    """ Mediator pattern for battle between the lineup of the trainer and challenger"""
+    """ Mediator pattern for battle between the lineup of the trainer and challenger.
+
+    The rules of the battle are played out by a BattleCore, the mediator turns the trainer's keys and
+    the challenger's choices into steps of the core and animates the events they return, one after
+    the other (floating pokemon in and out, draining health bars, the narrator's messages)"""
 
     def __init__(self, trainer_lineup, challenger_lineup, bd):
 
@@ -111,46 +118,45 @@ class BattleMediator:
 
         # group of timers to delay pieces of code
         self.timers = Timers()
-        self.timers.add(Timer('delay_choose', Config.FRAMERATE))        # delays the opponent choose message
-        self.timers.add(Timer('delay_outcome', Config.FRAMERATE * 2))   # displays the outcome for a given amount of time
-        self.timers.add(Timer('delay_switch_turn', Config.FRAMERATE/2)) # delays the challenger attack
+        self.timers.add(Timer('delay_choose', 1))        # delays the opponent choose message
+        self.timers.add(Timer('delay_outcome', 2))   # displays the outcome for a given amount of time
+        self.timers.add(Timer('delay_switch_turn', 0.5)) # delays the challenger attack
+
+        # the rules of the battle, set up when it starts, and the events of the core still to be animated
+        self.core = None
+        self.events = deque()
+        self.event = None # the event being animated
+        self._target_hp = None # hp a pokemon is drained to by the damage being animated
      
         #  possible states of the battle
         self.battle_states = {
-            'turn':'trainer',       # manages turns, can be trainer or challenger
             'end': False,           # checks if the battle is over and messgae has played
-            'allow_attacks':False,  # checks if attacks are permitted at the time, avoids spamming attacks
         }
 
         # build director to create and display gui elements
         self.bd = bd  
 
+    def start(self):
+        """ set up the core of the battle with the pokemon of the lineups as they are now"""
+        self.core = BattleCore.from_lineups(self.trainer_lineup, self.challenger_lineup)
+        self.events.clear()
+        self.event = None
+        self.message = ''
+        self.battle_states['end'] = False
+
     def current_fight(self, screen):
         """ handle the current fight between trainer and challenger"""
+        if self.core is None:
+            self.start()
 
-        if self._check_challenger_win():
-            # check if the challenger has won and handle it accordingly
-            self._handle_battle_end(screen, 'challenger')
-            if self.battle_states['end']:
-                return False
-            
-        elif self._check_trainer_win():
-            # check if the trainer has won and handle it according
-            self._handle_battle_end(screen, 'trainer')
+        # the events are animated one after the other, the battle only ends once they have all played
+        if self.core.over and self.event is None and not self.events:
+            self._handle_battle_end(screen, self.core.winner)
             if self.battle_states['end']:
-                return True
+                return self.core.winner == BattleCore.TRAINER
         else:
-            # if neither has won, continue the battle
             self._handle_battle(screen)
 
-    def _check_challenger_win(self):
-        # if the trainer has no pokemon left, the challenger has won
-        return len(self.trainer_lineup) == 0
-    
-    def _check_trainer_win(self):
-        # if the challenger has no pokemon left, the trainer has won
-        return len(self.challenger_lineup) == 0
-
     def _handle_battle_end(self, screen, winner):
         """ handles the end of the battle, accepts trainer or challenger as the winner"""
 
@@ -172,43 +178,51 @@ class BattleMediator:
       
    
     def _handle_battle(self, screen):
-        """ handles the moves and switching turn of the battle"""
+        """ animate the events of the battle and let the challenger attack on its turn"""
 
-        # always create the narrator with an updated message
-        self.narrator = self.bd.create_battle_narrator(self.message)
+        # start animating the next event once the last one is done
+        if self.event is None and self.events:
+            self.event = self.events.popleft()
+            self._begin_event(self.event)
 
-        # define the current pokemon for each lineup
+        # show the pokemon battling, the challenger's pokemon comes in after a delay
         trainer_pokemon = self.trainer_lineup.get_current()
         challenger_pokemon = self.challenger_lineup.get_current()
-
-        # attacks are allowed if both pokemon are in the ready position and neither of them are attacjing
-        self.battle_states['allow_attacks'] = (
-            challenger_pokemon.states['ready'] and trainer_pokemon.states['ready'] 
-            ) and (not challenger_pokemon.states['attack'] and not trainer_pokemon.states['attack'])
-
-        # handle the trainers turn
-        self._handle_turn(screen, trainer_pokemon, challenger_pokemon, by='trainer')
-
-        # add a delay when switching turns
+        self._show(screen, trainer_pokemon, 'trainer')
         self.timers['delay_choose'].wait()
         if self.timers['delay_choose'].is_finished():
-                
-            # once the delay is complete, handle the challenger's turn
-            self._handle_turn(screen, challenger_pokemon, trainer_pokemon, by='challenger')
-            
+            self._show(screen, challenger_pokemon, 'challenger')
 
-            # if neither of them has won already and it is the challengers turn, an automatic attack is allowed from
-            # the challanger, which is then sent to the mediator to be handled all over again
-            if not self._check_challenger_win() and not self._check_trainer_win():
+        if self.event is not None and self._animate_event(self.event):
+            self.event = None
 
-                self.timers['delay_switch_turn'].wait()
-                if self.battle_states['turn'] == 'challenger' and self.timers['delay_switch_turn'].is_finished():
-                    
-                    self.challenger_lineup.get_current().attack(self)
+        # the challenger attacks with a random move after a delay on its turn
+        if self.can_attack('challenger'):
+            self.timers['delay_switch_turn'].wait()
+            if self.timers['delay_switch_turn'].is_finished():
+                challenger_pokemon.attack(self)
 
-        # display the updated message in the narrator   
+        # always create the narrator with an updated message, and display it
+        self.narrator = self.bd.create_battle_narrator(self.message)
         self.narrator.display(screen, (0, Config.SCREEN_HEIGHT - self.narrator.surface.get_height()))
 
+    def _show(self, screen, pokemon, side):
+        """ display the pokemon and its gui elements, the pokemon floats in until it is ready
+        and floats out when it has fainted"""
+        if pokemon is None:
+            return
+
+        in_direction, out_direction, name = self._turn_variables(side)
+        fainting = self.event is not None and self.event.kind == 'faint' and self.event.side == side
+        if fainting:
+            pokemon.show_elements(screen, out_direction, self.bd, out=True)
+        else:
+            pokemon.show_elements(screen, in_direction, self.bd)
+
+            # a pokemon floating in for the first time is being chosen by the trainer/challenger
+            if not pokemon.states['ready']:
+                self.message = f'{name} chose {pokemon.name}'
+
     def _turn_variables(self, by):
         """ configure the variables for the trainer and challenger's turns respectively """
 
@@ -216,119 +230,91 @@ class BattleMediator:
             in_direction = 'right'
             out_direction = 'left'
             name = 'Trainer'
-            current_lineup = self.trainer_lineup
         
         elif by == 'challenger':
             in_direction = 'left'
             out_direction = 'right'
             name = 'Opp'
-            current_lineup = self.challenger_lineup
-
-        return in_direction, out_direction, name, current_lineup
-
-    def _handle_current_alive(self, screen, in_direction, name, current_turn, oppose_turn, by):
-        """ handle the turn if the pokemon is alive"""
 
-        # the gui elements are displayed
-        current_turn.show_elements(screen, in_direction, self.bd)
+        return in_direction, out_direction, name
+
+    def _pokemon(self, side):
+        lineup = self.trainer_lineup if side == 'trainer' else self.challenger_lineup
+        return lineup.get_current()
+
+    def _begin_event(self, event):
+        """ set up the animation of an event of the core"""
+
+        if event.kind == 'attack':
+            # the attacking pokemon is in its attack state until the damage has been drained
+            self._pokemon(event.side).states['attack'] = True
+            self.message = f'{event.name} used {event.value}'
+
+        elif event.kind == 'damage':
+            # the hp of the pokemon is reduced by the damage in a linear manner, to give the effect
+            # that the health bar is gradually going down 
+            pokemon = self._pokemon(event.side)
+            pokemon.states['reduce_health'] = event.value
+            self._target_hp = pokemon.hp - event.value
+
+        elif event.kind == 'faint':
+            self.message = f'{event.name} has fainted'
+
+        elif event.kind == 'turn' and event.side == 'challenger':
+            # the delay is made on each of the challenger's turns
+            self.timers['delay_switch_turn'].reset()
+
+    def _animate_event(self, event) -> bool:
+        """ animate the event for a frame, returns true when it is done"""
+
+        if event.kind == 'damage':
+            pokemon = self._pokemon(event.side)
+            if pokemon.states['reduce_health'] > 0 and pokemon.hp > 0:
+                # hp is reduced at HP_DRAIN_RATE per second
+                drain = min(pokemon.states['reduce_health'], Config.HP_DRAIN_RATE * GameClock.frame_time)
+                if GameClock.skip_animations:
+                    drain = pokemon.states['reduce_health']
+                pokemon.hp -= drain
+                pokemon.states['reduce_health'] -= drain
+                return False
 
-        # if the pokemon is not yet in the 'ready' position, this means that a pokemon is floating in
-        # for the first time to battle so the message is updated to notify that
-        # the trainer/challenger is choosing a new pokemon
-        if not current_turn.states['ready']:
-            self.message = f'{name} chose {current_turn.name}'
-        
-        # if neither player is attacking, no message is displayed
-        elif not oppose_turn.states['attack'] and not current_turn.states['attack']:
+            # the health bar ends on the hp the core gave the pokemon, and the attacker is done attacking
+            pokemon.hp = self._target_hp
+            pokemon.states['reduce_health'] = -1
+            self._pokemon(self.core.other(event.side)).states['attack'] = False
             self.message = ''
+            return True
 
-        # pokemon have a reduce health state, if this is positive their health is reduced by that amount
-        # but in a linear manner to give the effect that the health bar is gradually going down 
-        if current_turn.states['reduce_health'] >= 0:
-
-            if current_turn.states['reduce_health']  > 0:
-                current_turn.hp -= 1 # hp is reduced the same amount as the reduce health
-                current_turn.states['reduce_health'] -= 1
-
-            # once the reduce health hits 0, some updates are made
-            elif current_turn.states['reduce_health'] == 0:
-                
-                oppose_turn.states['attack'] = False # it is certain that the opponent is not attacking, so their attack status is set to fales
-                self.battle_states['turn'] = by # the turn is switched back to the current player
-                
-                # the reduce health status is reset to -1 so that this section of the code is not executed until the reduce health is positive again
-                current_turn.states['reduce_health'] = -1 
-
-                # if this was the challengers turn, the delay switch timer is reset so that the delay is made on each turn
-                if by == 'challenger':
-                    self.timers['delay_switch_turn'].reset()
-
-    
-    def _handle_current_faint(self, screen, current_turn, out_direction, current_lineup, oppose_turn, by):
-            """ handle the current turn if the pokemon haas fainted"""
-
-            # notify the narrator that a poskemon has fainted
-            self.message = f'{current_turn.name} has fainted'
-
-            # show the elements but now floating to the out position
-            current_turn.show_elements(screen, out_direction, self.bd, out=True)
-
-            # once the pokemon arrives at its offscreen position, its fainted state will be set to true, hence
-            # we wait for the pokemon to be fainted
-            if current_turn.states['fainted']:
-                current_lineup.remove() # remove it from the lineup
-
-
-                # if  a pokemn has fainted, this means its turn was missed, 
-                # so here we keep the turn as whoevers pokemon fainted to allow them to attack
-                # if they have another pokemon
-                self.battle_states['turn'] = by 
-
-                # turn off the attacking state of the opponent to allow new attacks
-                oppose_turn.states['attack'] = False
-
-    
-    def _handle_turn(self, screen, current_turn, oppose_turn, by):
-        """ create turn variables and execute turns"""
-        
-        in_direction, out_direction, name, current_lineup = self._turn_variables(by)
-                    
-        # if the current attacker is still alive
-        if current_turn.hp > 0:
-            self._handle_current_alive(screen, in_direction, name, current_turn, oppose_turn, by)
-       
-        # if the pokemon has no more health we handle fainting
-        else: 
-            self._handle_current_faint(screen, current_turn, out_direction, current_lineup, oppose_turn, by)
-
-    def _handle_attack(self, sender_pokemon, receiver_pokemon, attack): 
-        """ takes a sender pokemon, receiver pokemon and attack, this way the sender pokemon
-        always executes its attack on the receiver pokemon"""
-
-        # if the battle state conditions for allowing attacks (defined above) have been met
-        if self.battle_states['allow_attacks']:
-
-            # turn on the sending pokemons attack state
-            sender_pokemon.states['attack'] = True
-
-            # update the message in the narrator is updated to notify that an attack is being executed
-            self.message = f'{sender_pokemon.name} used {attack.name}'   
-
-            # the receiver pokemon reduced health state is set to the attack power of the sender
-            receiver_pokemon.states['reduce_health'] = attack.power
-            
-
-    def send_attack(self, sender, attack):
-        """ this function is called by the pokemon to send their attack notifications to the mediator"""
-        
-        # get the current pokeomn for each lineup
+        elif event.kind == 'faint':
+            # once the pokemon arrives at its offscreen position it is fainted and is removed from the lineup
+            pokemon = self._pokemon(event.side)
+            if not pokemon.states['fainted']:
+                return False
+            lineup = self.trainer_lineup if event.side == 'trainer' else self.challenger_lineup
+            lineup.remove()
+
+            # the opponent is no longer attacking, which allows new attacks
+            opponent = self._pokemon(self.core.other(event.side))
+            if opponent:
+                opponent.states['attack'] = False
+            return True
+
+        # the other events only change the state of the battle, which happens when they begin
+        return True
+
+    def can_attack(self, side) -> bool:
+        """ attacks are allowed on the side's turn, when all events have been animated and
+        both pokemon are in the ready position and neither is attacking"""
+        if self.core is None or self.core.over or self.core.turn != side or self.event is not None or self.events:
+            return False
         trainer_pokemon = self.trainer_lineup.get_current()
         challenger_pokemon = self.challenger_lineup.get_current()
+        return (trainer_pokemon.states['ready'] and challenger_pokemon.states['ready']
+                ) and (not trainer_pokemon.states['attack'] and not challenger_pokemon.states['attack'])
 
-        # check the sender and handle attacks accordingly
-        # ensures that the trainer can attack only on their turn
-        if sender == 'trainer' and self.battle_states['turn'] == 'trainer' and challenger_pokemon:
-            self._handle_attack(trainer_pokemon, challenger_pokemon, attack)
-
-        elif sender == 'challenger':
-            self._handle_attack(challenger_pokemon, trainer_pokemon, attack)
\ No newline at end of file
+    def send_attack(self, sender, attack):
+        """ this function is called by the pokemon to send their attack notifications to the mediator,
+        the attack is a step of the core on the sender's turn"""
+        if self.can_attack(sender):
+            pokemon = self._pokemon(sender)
+            self.events.extend(self.core.step(pokemon.moves.index(attack)))
@@ -0,0 +1,98 @@
+from typing import NamedTuple, List, Tuple
+
+
+class BattleEvent(NamedTuple):
+    """ something that happened in a battle, the battle mediator animates these"""
+    kind: str           # attack, damage, faint, send_out, turn or win
+    side: str           # trainer or challenger, the side the event happened to
+    name: str = None    # name of the pokemon
+    value: object = None # the name of the move of an attack, the hp lost to damage
+
+
+class Fighter:
+    """ compact battle stats of a pokemon, its name, hp and moves as (name, power)"""
+    __slots__ = ('name', 'hp', 'moves')
+
+    def __init__(self, name: str, hp: float, moves: List[Tuple[str, int]]):
+        self.name = name
+        self.hp = hp
+        self.moves = tuple(moves)
+
+    @classmethod
+    def from_pokemon(cls, pokemon) -> 'Fighter':
+        return cls(pokemon.name, pokemon.hp, [(move.name, move.power) for move in pokemon.moves])
+
+
+class BattleCore:
+    """ the rules of a battle between the trainer's and a challenger's lineup, without any drawing or timing.
+
+    The side whose turn it is picks one of its current pokemon's moves with step, which applies the whole
+    attack at once and returns the events it caused. The attacked pokemon loses the power of the move in hp,
+    at 0 hp it faints and the next pokemon of the lineup is sent out. The turn then goes to the attacked side
+    (whose pokemon fainted or took the hit). A side wins when the other has no pokemon left.
+
+    The battle mediator plays the events as animations, and since a battle is only data it can also be
+    played out headless (see benchmarks/bench_battle_core.py)"""
+
+    TRAINER = 'trainer'
+    CHALLENGER = 'challenger'
+
+    def __init__(self, trainer: List[Fighter], challenger: List[Fighter], turn: str = TRAINER):
+        self.lineups = {self.TRAINER: list(trainer), self.CHALLENGER: list(challenger)}
+        self.turn = turn
+        self.winner = None
+        for side, lineup in self.lineups.items():
+            if not lineup:
+                self.winner = self.other(side)
+
+    @classmethod
+    def from_lineups(cls, trainer_lineup, challenger_lineup) -> 'BattleCore':
+        """ core of a battle between lineups of pokemon sprites"""
+        return cls([Fighter.from_pokemon(pokemon) for pokemon in trainer_lineup],
+                   [Fighter.from_pokemon(pokemon) for pokemon in challenger_lineup])
+
+    @property
+    def over(self) -> bool:
+        return self.winner is not None
+
+    def other(self, side: str) -> str:
+        return self.CHALLENGER if side == self.TRAINER else self.TRAINER
+
+    def current(self, side: str) -> Fighter:
+        """ the pokemon of the side that is battling, None if the side has none left"""
+        lineup = self.lineups[side]
+        return lineup[0] if lineup else None
+
+    def actions(self) -> range:
+        """ the moves the side whose turn it is can use"""
+        return range(len(self.current(self.turn).moves)) if not self.over else range(0)
+
+    def step(self, action: int) -> List[BattleEvent]:
+        """ the current pokemon of the side whose turn it is uses the move with the index action"""
+        if self.over:
+            raise ValueError('the battle is over')
+        if action not in self.actions():
+            raise ValueError(f'{action} is not a move of {self.current(self.turn).name}')
+
+        side, target = self.turn, self.other(self.turn)
+        attacker, defender = self.current(side), self.current(target)
+        move, power = attacker.moves[action]
+
+        defender.hp -= power
+        events = [BattleEvent('attack', side, attacker.name, move),
+                  BattleEvent('damage', target, defender.name, power)]
+
+        if defender.hp <= 0:
+            events.append(BattleEvent('faint', target, defender.name))
+            lineup = self.lineups[target]
+            lineup.pop(0)
+            if not lineup:
+                self.winner = side
+                events.append(BattleEvent('win', side))
+                return events
+            events.append(BattleEvent('send_out', target, lineup[0].name))
+
+        # the attacked side goes next, if its pokemon fainted this is the turn it missed
+        self.turn = target
+        events.append(BattleEvent('turn', target))
+        return events
@@ -1,6 +1,7 @@
 import pygame
 from config.config import Config
 from gameplay.environments import YSortLayer
+from gameplay.clock import GameClock
 from abc import ABC, abstractmethod
 
 class Camera(ABC):
@@ -46,6 +47,9 @@ class ExploreCamera(Camera):
 
         self.camera_rect = pygame.Rect(l, t, w, h)
 
+        # size of the world the camera can move in
+        self.world_w, self.world_h = Config.MAP_W, Config.MAP_H
+
         # this groups is keeps track of the individual groups added to the camera group
         # in pygame, group.add adds the sprites only
         # since the sprites will be conditionally rendered (ysorted or not)
@@ -53,6 +57,15 @@ class ExploreCamera(Camera):
 
         self._groups = []
 
+    def set_bounds(self, width, height):
+        """ set the size of the world the camera can move in"""
+        self.world_w, self.world_h = width, height
+
+    @property
+    def view(self) -> pygame.Rect:
+        """ the part of the world that is on screen"""
+        return pygame.Rect(self._offset_x, self._offset_y, Config.SCREEN_WIDTH, Config.SCREEN_HEIGHT)
+
     def add_group(self, *groups):
         """ adds the pygame groups to the other group only list"""
         
@@ -61,23 +74,29 @@ class ExploreCamera(Camera):
 
     def _camera_target(self, target):
 
+        # follow the position the target is drawn at, not the one of its last simulation step
+        rect = target.rect
+        if getattr(target, 'previous', None) is not None:
+            x, y = GameClock.lerp(target.previous, rect.topleft)
+            rect = rect.move(round(x) - rect.x, round(y) - rect.y)
+
         # the the x and y offsets updated
         self._offset_x = self.camera_rect.left - self._inner_borders['left']
         self._offset_y = self.camera_rect.top - self._inner_borders['top']
 
         # these conditions check whether the target (in this game will always be the trainer)
         # is in the in the inner border or not. as the target
-        if target.rect.left < self.camera_rect.left and self.camera_rect.left > self._inner_borders['left']:
-            self.camera_rect.left = target.rect.left
+        if rect.left < self.camera_rect.left and self.camera_rect.left > self._inner_borders['left']:
+            self.camera_rect.left = rect.left
 
-        if target.rect.right > self.camera_rect.right and self.camera_rect.right < Config.MAP_W - self._inner_borders['right']:
-            self.camera_rect.right = target.rect.right
+        if rect.right > self.camera_rect.right and self.camera_rect.right < self.world_w - self._inner_borders['right']:
+            self.camera_rect.right = rect.right
 
-        if target.rect.bottom > self.camera_rect.bottom and self.camera_rect.bottom <  Config.MAP_H - self._inner_borders['bottom']:
-            self.camera_rect.bottom = target.rect.bottom
+        if rect.bottom > self.camera_rect.bottom and self.camera_rect.bottom <  self.world_h - self._inner_borders['bottom']:
+            self.camera_rect.bottom = rect.bottom
 
-        if target.rect.top < self.camera_rect.top and self.camera_rect.top > self._inner_borders['top']:
-            self.camera_rect.top = target.rect.top
+        if rect.top < self.camera_rect.top and self.camera_rect.top > self._inner_borders['top']:
+            self.camera_rect.top = rect.top
 
     def custom_focus(self, screen, focus):
         """ This function serves to render objects based on their position relative to the target (trainer) """
@@ -89,19 +108,30 @@ class ExploreCamera(Camera):
         #  for each group added, we check if the group layer is ysorted or not
         # if it is y sorted, we sort the sprites by their center y value otherwise, 
         # the sprties order remains the same
+        # only the sprites that are on screen are drawn, on large maps most of the world is off screen
+        view = self.view
+
         for group in self._groups:
 
-            my_sprites = sorted(group.sprites(), key=lambda s: s.rect.centery) if isinstance(group, YSortLayer)  else group.sprites()
+            my_sprites = [sprite for sprite in group.sprites() if view.colliderect(sprite.rect)]
+            if isinstance(group, YSortLayer):
+                my_sprites.sort(key=lambda s: s.rect.centery)
             
             # for every sprite in the corresponding group we set it's position on the screen
             # to it's offset position, this way as the target moves, the surrounding sprites 
             # also move accoridngly. and the sprites are displayed. 
-            # It is important to set the sprites new offset position because if they are displayed
-            # in their new position but not actually updated, collisions will not work
+            # The offset is only used for drawing, collisions use the sprites' world positions
             for sprite in my_sprites:
+
+                # sprites that move in the simulation are drawn between their last two step positions
+                # so they move smoothly whatever the framerate
+                position = sprite.rect.topleft
+                if getattr(sprite, 'previous', None) is not None:
+                    x, y = GameClock.lerp(sprite.previous, position)
+                    position = round(x), round(y)
      
-                offset_pos = (sprite.rect.topleft[0] - self._offset_x,
-                                        sprite.rect.topleft[1] - self._offset_y 
+                offset_pos = (position[0] - self._offset_x,
+                                        position[1] - self._offset_y 
                                 )
         
                 screen.blit(sprite.image, offset_pos)
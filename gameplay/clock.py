@@ -0,0 +1,55 @@
+from config.config import Config
+
+
+class GameClock:
+    """ fixed timestep clock for the simulation.
+
+    Every frame the real time that has passed is added to an accumulator and the simulation is
+    stepped in fixed steps of STEP seconds until the accumulator is used up, so the game runs at the
+    same speed at 30, 60 or 144 frames per second. What is left in the accumulator (alpha) is used to
+    interpolate the positions of moving sprites when they are drawn.
+
+    Speeds are in pixels per second and times in seconds:
+        - code that runs once per simulation step uses delta (simulated seconds of a step)
+        - code that runs once per drawn frame (e.g. the battle) uses frame_time (simulated seconds of the frame)
+    time_scale slows down or speeds up the simulation (with longer or shorter steps).
+
+    Turbo mode runs the game faster without changing what happens in it: turbo simulates that many seconds
+    per real second with more steps per frame (each step is the same as without turbo), and with
+    skip_animations the timers and the battle animations (pokemon floating in and out, health bars draining)
+    jump to their end. Neither uses random numbers, so battles have exactly the same outcomes"""
+
+    STEP = 1 / Config.SIMULATION_RATE
+
+    time_scale = 1.0
+    turbo = Config.TURBO
+    skip_animations = Config.SKIP_ANIMATIONS
+    time = 0.0       # simulated seconds since the game started
+    delta = STEP     # simulated seconds of a step
+    frame_time = 0.0 # simulated seconds of the current frame
+    steps = 0        # number of steps in the current frame
+    alpha = 0.0      # how far the drawn frame is between the last two steps (0 to 1)
+    _accumulator = 0.0
+
+    @classmethod
+    def advance(cls, seconds: float) -> int:
+        """ add the real time of the last frame, returns the number of steps to simulate this frame"""
+
+        # after a long stall (e.g. the window was dragged) only catch up a few steps instead of
+        # simulating the whole pause at once
+        cls._accumulator += min(seconds * cls.turbo, cls.STEP * Config.MAX_STEPS_PER_FRAME * cls.turbo)
+
+        cls.steps = int(cls._accumulator / cls.STEP)
+        cls._accumulator -= cls.steps * cls.STEP
+        cls.alpha = cls._accumulator / cls.STEP
+
+        cls.delta = cls.STEP * cls.time_scale
+        cls.frame_time = cls.steps * cls.delta
+        cls.time += cls.frame_time
+        return cls.steps
+
+    @classmethod
+    def lerp(cls, previous, current) -> tuple:
+        """ position between the previous and current step positions for the drawn frame"""
+        return (previous[0] + (current[0] - previous[0]) * cls.alpha,
+                previous[1] + (current[1] - previous[1]) * cls.alpha)
@@ -1,4 +1,10 @@
+import gc
+import sys
+import types
+import weakref
+import pygame
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 
 class DataObservable(ABC):
     """ Abstract base class for a Data Observable, implements the mediator and observer pattern"""
@@ -34,10 +40,25 @@ class ConcreteLevelData(DataObservable):
 
     """ parent class for most Data Observables
         update allows for arrays and dictionaries to be updated so check type for the field
+
+        observers can subscribe to only the fields they read. Inside batch, the changed fields are
+        collected and each observer is notified once per changed field when the batch ends
+        (the main loop batches a whole frame). Observers share the _fields dict so they always read
+        the latest values, only the notifications are delayed
+
+        observers are held by weak references, a level that is no longer used is dropped from the
+        observers when it is collected instead of being kept alive (with its map and sprites) by
+        the observable
     """
+
+    def __init__(self):
+        self._batch_depth = 0
+        self._dirty = {}        # fields changed in the current batch, in order
+        self.notifications = 0  # observer notifications sent, for measuring
     
-    def attach(self, observer):
-        """ attach unique observers to list of observers/subscribers"""
+    def attach(self, observer, fields=None):
+        """ attach unique observers to list of observers/subscribers,
+        fields are the fields the observer is notified about (all fields if None)"""
         if observer not in self._observers:
 
             #  if the observer does not already have the _fields property
@@ -48,32 +69,65 @@ class ConcreteLevelData(DataObservable):
             else:
                 # otherwise their fields will be set to the current value of the observable's
                 #  _fields' values
-                for key, value in self._fields:
+                for key, value in self._fields.items():
                     observer.fields[key] = value
 
-            self._observers.append(observer)
+            self._observers[observer] = set(fields) if fields is not None else None
 
     def detach(self, observer):
         """ detach a single observer to list of observers/subscribers"""
 
-        if observer in self._observers:
-            self._observers.remove(observer)
+        self._observers.pop(observer, None)
 
-    def detachall(self):
-        """ detach all current observers"""
-        for observer in self._observers:
+    def detachall(self, kind=None):
+        """ detach all current observers, or only the ones that are instances of kind"""
+        if kind is None:
+            self._observers.clear()
+            return
+        for observer in [observer for observer in self._observers.keys() if isinstance(observer, kind)]:
             self.detach(observer)
 
+    def report(self) -> list:
+        """ debug report of the live observers and the bytes each one keeps alive, see retained_bytes"""
+        observers = list(self._observers.keys())
+        return [(type(observer).__name__, retained_bytes(observer, exclude=[self, *observers])) for observer in observers]
+
     def notify(self, field):
-        """ notify all observers of a change in the given field"""
-        for observer in self._observers:
-            observer.observe_update(field, self._fields[field])
+        """ notify the observers subscribed to the given field of a change, in a batch the field
+        is only marked as changed"""
+        if self._batch_depth:
+            self._dirty[field] = True
+            return
+
+        for observer, fields in list(self._observers.items()):
+            if fields is None or field in fields:
+                observer.observe_update(field, self._fields[field])
+                self.notifications += 1
+
+    @contextmanager
+    def batch(self):
+        """ collect the changes made inside and notify once per changed field at the end,
+        batches can be nested"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.flush()
+
+    def flush(self):
+        """ notify the observers of the fields changed in the batch"""
+        dirty, self._dirty = self._dirty, {}
+        for field in dirty:
+            self.notify(field)
     
     def set_field(self, field, data, unique=False):
         """ sets the value of a given field, unique determines if that field should be the only value
         once the field is updated, all observers receive the update in their _fields property"""
         if unique:
-            self.reset_field(field)
+            # the field is emptied without a notification, the observers are notified once below
+            self._empty(field)
 
         if type(self._fields[field]) == list:
             self._fields[field].append(data)
@@ -100,9 +154,18 @@ class ConcreteLevelData(DataObservable):
 
     def reset_field(self, field):
         """ set the field property back to an empty data structure"""
-        self._fields[field] = []
+        self._empty(field)
         self.notify(field)
 
+    def reset_fields(self):
+        """ empty every field, for a new game"""
+        for field in self._fields:
+            self.reset_field(field)
+
+    def _empty(self, field):
+        # fields keep their type, e.g. chosen is a dictionary
+        self._fields[field] = type(self._fields[field])()
+
 class ChooseLevelData(ConcreteLevelData):
     """ stores and updates data about the choose level"""
 
@@ -112,7 +175,7 @@ class ChooseLevelData(ConcreteLevelData):
         # "current_tiles":[]
     }
 
-    _observers = []
+    _observers = weakref.WeakKeyDictionary() # observer -> the fields it is subscribed to
 
 class ExploreLevelData(ConcreteLevelData):
     """ stores and updates data about the explore level"""
@@ -120,6 +183,25 @@ class ExploreLevelData(ConcreteLevelData):
 
     _fields = {
         'items':[],
-        'timer':[]
+        'timer':[],
+        'minimap':[] # holds True while the minimap is shown
     }
-    _observers = []
\ No newline at end of file
+    _observers = weakref.WeakKeyDictionary() # observer -> the fields it is subscribed to
+
+def retained_bytes(root, exclude=(), limit=100000) -> int:
+    """ rough size of what root keeps alive: the objects reachable from it (not through modules,
+    classes, functions or the excluded objects), with the pixels of surfaces counted. Only meant for debugging"""
+    skip = {id(obj) for obj in exclude if obj is not root}
+    seen = set()
+    stack = [root]
+    size = 0
+    while stack and len(seen) < limit:
+        obj = stack.pop()
+        if id(obj) in seen or id(obj) in skip or isinstance(obj, (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType)):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj, 0)
+        if isinstance(obj, pygame.Surface):
+            size += obj.get_width() * obj.get_height() * obj.get_bytesize()
+        stack.extend(gc.get_referents(obj))
+    return size
@@ -1,7 +1,8 @@
 import pygame
-from sprites.sprites import Tile
-from pytmx.util_pygame import load_pygame
+from sprites.sprites import Tile, FrameMask
+from gameplay.mapformat import load_map
 from config.config import Config
+from config.resources import Resources
 from abc import ABC, abstractmethod
 from typing import Tuple
 
@@ -9,11 +10,79 @@ class Layer(pygame.sprite.Group):
     """ base class for a concrete layer
         this will be used to distingush a from a layer on wich collisions can coccur
         this a safe layer is a layer where the player can walk freely without collisons
-        or without needing to y sort the elements on the screen"""
+        or without needing to y sort the elements on the screen
+        
+        sprites are also kept in buckets by their type, which are updated when sprites are added
+        or killed, so views filtered by type only touch the matching sprites"""
     
     def __init__(self):
+        # buckets must exist before the group adds any sprites
+        self._buckets = {}  # sprite type -> {sprite: None}
+        self._views = {}    # (check, exclude) -> LayerView, views are live so they are only created once
         super().__init__()
 
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self._buckets.setdefault(type(sprite), {})[sprite] = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        del self._buckets[type(sprite)][sprite]
+
+    def buckets(self, check, exclude=False) -> list:
+        """ the buckets of sprite types that are (or are not, if exclude is set) instances of check"""
+        return [bucket for sprite_type, bucket in self._buckets.items() if issubclass(sprite_type, check) != exclude]
+
+    def of_type(self, check) -> 'LayerView':
+        """ live view of the sprites that are instances of check"""
+        return self._view(check, False)
+
+    def excluding(self, check) -> 'LayerView':
+        """ live view of the sprites that are not instances of check"""
+        return self._view(check, True)
+
+    def _view(self, check, exclude):
+        if (check, exclude) not in self._views:
+            self._views[check, exclude] = LayerView(self, check, exclude)
+        return self._views[check, exclude]
+
+
+class LayerView:
+    """ live view of the sprites of a layer filtered by type.
+    It follows the layer's buckets, so it never needs to be rebuilt and iterating it is O(k)
+    for the k matching sprites. It can be used wherever pygame expects a group to iterate"""
+
+    def __init__(self, layer: Layer, check, exclude=False):
+        self.layer = layer
+        self.check = check
+        self.exclude = exclude
+        self._known_types = 0
+        self._buckets = []
+
+    def _matching(self):
+        # buckets are only created, never removed, so they only need to be looked up again
+        # when a new sprite type has been added to the layer
+        if self._known_types != len(self.layer._buckets):
+            self._known_types = len(self.layer._buckets)
+            self._buckets = self.layer.buckets(self.check, self.exclude)
+        return self._buckets
+
+    def __iter__(self):
+        for bucket in self._matching():
+            yield from bucket
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._matching())
+
+    def __bool__(self):
+        return any(self._matching())
+
+    def __contains__(self, sprite):
+        return any(sprite in bucket for bucket in self._matching())
+
+    def sprites(self) -> list:
+        return list(self)
+
 
 class YSortLayer(Layer):
     """
@@ -22,9 +91,6 @@ class YSortLayer(Layer):
     y coordinate first.
     """
 
-    def __init__(self):
-        super().__init__()
-
     # this function returns the sprites of the ysort group
     def get_sprites(self):
         return self.sprites()
@@ -43,8 +109,9 @@ class DecoratorNegativeFilter(LayerDecorator):
     def __init__(self, layer):
         self.layer = layer
 
-    def get_sprites(self, check):
-        return [sprite for sprite in self.layer.get_sprites() if not isinstance(sprite, check)]
+    def get_sprites(self, check) -> LayerView:
+        # the layer keeps its sprites by type, so this is a live view rather than a new list
+        return self.layer.excluding(check)
 
 
 class DecoratorPositiveFilter(LayerDecorator):
@@ -55,28 +122,134 @@ class DecoratorPositiveFilter(LayerDecorator):
     def __init__(self, layer):
         self.layer = layer
 
-    def get_sprites(self, check):
-        return [sprite for sprite in self.layer.get_sprites() if isinstance(sprite, check)]
+    def get_sprites(self, check) -> LayerView:
+        # the layer keeps its sprites by type, so this is a live view rather than a new list
+        return self.layer.of_type(check)
 
 
 class FlyweightTile:
-    """ Flyweight class to store unique images"""
+    """ Flyweight class to store unique images.
+    The image is stored display converted and scaled to the tile size, so the tiles
+    sharing it do not need their own surface"""
+
+    __slots__ = ('image', 'frame')
+
     def __init__(self, image):
-        self.image = image
+        image = image.convert_alpha()
+        self.image = pygame.transform.scale(image, (Config.TILE_WIDTH, Config.TILE_HEIGHT))
+        self.frame = FrameMask.of(self.image)
+
+
+class AnimatedFlyweightTile(FlyweightTile):
+    """ flyweight of an animated tile (e.g. water or flowers). Every frame is scaled once, image and frame
+    are set to the current frame by the animation clock, so all the tiles sharing it are animated together"""
+
+    __slots__ = ('frames', 'durations', 'length', 'index')
+
+    def __init__(self, frames):
+        # frames is a list of (flyweight, duration in ms)
+        self.frames = [flyweight for flyweight, _ in frames]
+        self.durations = [duration for _, duration in frames]
+        self.length = sum(self.durations) or 1
+        self.index = 0
+        self.image = self.frames[0].image
+        self.frame = self.frames[0].frame
+        AnimationClock.register(self)
+
+    def advance(self, now: int) -> bool:
+        """ set the frame for the time now (ms), returns true if the frame changed"""
+        time = now % self.length
+        index = 0
+        while time >= self.durations[index]:
+            time -= self.durations[index]
+            index += 1
+
+        if index == self.index:
+            return False
+        self.index = index
+        self.image = self.frames[index].image
+        self.frame = self.frames[index].frame
+        return True
+
+
+class AnimationClock:
+    """ global clock for the animated tiles, it is ticked once per frame and advances every
+    animated flyweight (not every tile)"""
+
+    _tiles = {} # animated flyweights -> None
+    changed = set() # flyweights whose frame changed on the last tick
+
+    @classmethod
+    def register(cls, flyweight: AnimatedFlyweightTile):
+        cls._tiles[flyweight] = None
+
+    @classmethod
+    def tick(cls, now: int = None) -> set:
+        """ advance the animated tiles to the time now (ms), returns the flyweights whose frame changed"""
+        now = pygame.time.get_ticks() if now is None else now
+        cls.changed = {flyweight for flyweight in cls._tiles if flyweight.advance(now)}
+        return cls.changed
+
         
 class FlyweightTileFactory:
     """ Fly weight factory returns fly weights if they already exist, other wise a new
     one is created"""
+
+    _maps = {} # map file -> factory
+
     def __init__(self):
         self._tiles = {}
+        self._frames = {} # gid -> static flyweight used as a frame of animated tiles
+        self.requests = 0 # number of tiles that have asked for a flyweight
+
+    @classmethod
+    def for_map(cls, filename: str) -> 'FlyweightTileFactory':
+        """ the factory of a map file, the scaled tile images of a map are shared by every level using it"""
+        if filename not in cls._maps:
+            cls._maps[filename] = cls()
+        return cls._maps[filename]
+
+    def get_fly_weight(self, gid, image):
+
+        # the id is the tile's gid in the map, every tile with the same gid shares the same image
+        self.requests += 1
+        if gid not in self._tiles:
+            self._tiles[gid] = FlyweightTile(image) 
+        return self._tiles[gid]
+
+    def from_map(self, tmx, gid):
+        """ the flyweight of a gid of a map, animated if the tile has animation frames in the map.
+        Returns None if the gid has no image"""
+        if gid in self._tiles:
+            self.requests += 1
+            return self._tiles[gid]
+
+        image = tmx.get_tile_image_by_gid(gid)
+        if image is None:
+            return None
 
-    def get_fly_weight(self, image):
+        frames = (tmx.get_tile_properties_by_gid(gid) or {}).get('frames')
+        if not frames:
+            return self.get_fly_weight(gid, image)
 
-        # the id is the image hash as explained GameMapTSX
-        id = image.__hash__()
-        if  id not in self._tiles:
-            self._tiles[id] = FlyweightTile(image) 
-        return self._tiles[id]
+        # the frames are scaled once and shared by every animated tile using them
+        for frame in frames:
+            if frame.gid not in self._frames:
+                self._frames[frame.gid] = FlyweightTile(tmx.get_tile_image_by_gid(frame.gid))
+
+        self.requests += 1
+        self._tiles[gid] = AnimatedFlyweightTile([(self._frames[frame.gid], frame.duration) for frame in frames])
+        return self._tiles[gid]
+
+    def report(self) -> dict:
+        """ unique versus total surfaces and the bytes saved by sharing them"""
+        tile_bytes = Config.TILE_WIDTH * Config.TILE_HEIGHT * 4
+        return {
+            'unique_surfaces': len(self._tiles),
+            'total_tiles': self.requests,
+            'unique_bytes': sum(t.image.get_pitch() * t.image.get_height() for t in self._tiles.values()),
+            'bytes_saved': (self.requests - len(self._tiles)) * tile_bytes
+        }
 
 class GameEnvironment(ABC):
 
@@ -89,15 +262,20 @@ class GameEnvironment(ABC):
     def create_env(self):
         pass
 
+    def update(self, focus: pygame.Rect):
+        """ called every frame with the rect the level is focused on (the trainer),
+        environments that are loaded in parts use this to load the parts around it"""
+        pass
+
 
 class GameMapTSX(GameEnvironment):
     """ laod environment files from a tmx file"""
 
     def __init__(self, filename):
         super().__init__(filename)
-        # we use pytmx to load the information about tiles in a tmx file
+        # we use pytmx (or the compiled map format) to load the information about tiles in a tmx file
         # definae a flyweught factory for generating tiles
-        self.flyweight_factory = FlyweightTileFactory()
+        self.flyweight_factory = FlyweightTileFactory.for_map(filename)
 
     def create_env(self, layers: list, layer_group: Layer) -> Layer:
         """ this function servers to create the necessaary tiles and objects required
@@ -106,7 +284,9 @@ class GameMapTSX(GameEnvironment):
         # In tiled, there are separate layers which can be visible or hidden. Depending on a level, layers can be hidden etc.
         # Here, to create a new level, the visible layers are iterated through to generate the map
 
-        self.map = load_pygame(self.filename)
+        # the map is only parsed once per process (from the compiled map if it is up to date),
+        # see mapformat.load_map
+        self.map = load_map(self.filename)
 
         for layer in self.map.visible_layers:
             
@@ -115,15 +295,17 @@ class GameMapTSX(GameEnvironment):
             if hasattr(layer, 'data') and layer.name in layers:
                
                 
-                # for each layer, get the tiles associated with that layer
-                for x, y, image in layer.tiles(): # tile is a tuple of x position, y position and the image on the tile
-                    
-                    # after some testing, I found that the tile's image are in fact hashable. 
-                    # hence the tile's image can be used as their shared state 
-                    # since tiles of the same image return the same hash, the image is thus used as the intrinsic state
-                    # and the x and y position is the extrinsic state
+                # for each layer, get the gid of each cell of that layer
+                for x, y, gid in layer.iter_data():
+                    if not gid:
+                        continue
 
-                    tile_image = self.flyweight_factory.get_fly_weight(image).image
+                    # tiles with the same gid have the same image, hence the gid is used to share 
+                    # the scaled image as the intrinsic state and the x and y position is the extrinsic state
+                    # (animated tiles share their frames, which are advanced by the AnimationClock)
+                    flyweight = self.flyweight_factory.from_map(self.map, gid)
+                    if flyweight is None:
+                        continue
 
 
                     # the x and y values are then used to create tile objects from the flyweight image created
@@ -132,9 +314,14 @@ class GameMapTSX(GameEnvironment):
                     pos = x * Config.TILE_X_SPACING, y * Config.TILE_Y_SPACING
 
                     # add the tile to it's respective group, this dependency is injected to decouple the tile from the layer
-                    layer_group.add(Tile(pos, tile_image))
+                    layer_group.add(Tile(pos, flyweight))
                
         return layer_group
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """ width and height of the map in pixels"""
+        return self.map.width * Config.TILE_X_SPACING, self.map.height * Config.TILE_Y_SPACING
         
 class GameMapBackDrop(GameEnvironment):
     def __init__(self, filename):
@@ -145,7 +332,7 @@ class GameMapBackDrop(GameEnvironment):
         """ this function servers to create the necessaary tiles and objects required
             for a Game environment *this version sets up thos environments using an image file"""
         
-        backdrop = pygame.image.load(self.filename).convert_alpha() # load the image
+        backdrop = Resources.image(self.filename) # load the image (once per process)
        
         # get its height and width
         backdrop_w = backdrop.get_width() 
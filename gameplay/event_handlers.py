@@ -5,6 +5,8 @@ from sprites.trainer import TrainerMediator
 from config.fetcher import Fetcher
 from config.config import Config
 from gameplay.dataobservers import DataObservable
+from gui_builders.layout import GridLayout
+from config.resources import Resources
 from abc import ABC, abstractmethod
 import asyncio
 # create singleton gamesate
@@ -39,6 +41,61 @@ class EventHandler(Handler):
             return self.next_handler.handle(state, event)
         return None
 
+    def register(self, dispatcher):
+        """ register the events the handler handles, and in which states, with the dispatcher
+        and pass the dispatcher on to the next handler"""
+        if self.next_handler:
+            self.next_handler.register(dispatcher)
+
+
+class EventDispatcher:
+    """ dispatch table for events, keyed by the current state and the event type.
+
+    The chain of handlers is walked once when the handlers register (see EventHandler.register),
+    after that an event only goes to the handlers registered for the current state and its type,
+    e.g. mouse motion on the explore level goes nowhere. Handlers registered without a state
+    get the events in every state, after the handlers of the state.
+    Mouse motion is coalesced, of consecutive motion events only the last is dispatched"""
+
+    def __init__(self, gamestate):
+        self.gamestate = gamestate
+        self._table = {}   # (state, event type) -> callbacks
+        self._global = {}  # event type -> callbacks for every state
+
+    def register(self, states, event_types, callback):
+        """ call callback with the events of the types in the given states (all states if states is None)"""
+        for event_type in event_types:
+            if states is None:
+                self._global.setdefault(event_type, []).append(callback)
+                continue
+            for state in states:
+                self._table.setdefault((state, event_type), []).append(callback)
+
+    @property
+    def event_types(self) -> set:
+        """ every event type a handler is registered for"""
+        return {event_type for _, event_type in self._table} | set(self._global)
+
+    def allow_events(self, *others):
+        """ only queue the event types that are handled (and the others given), pygame drops the rest"""
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([*self.event_types, *others])
+
+    @staticmethod
+    def coalesce(events):
+        """ drop mouse motion events followed by another motion event, the last one has the latest position"""
+        last = len(events) - 1
+        for index, event in enumerate(events):
+            if event.type == pygame.MOUSEMOTION and index < last and events[index + 1].type == pygame.MOUSEMOTION:
+                continue
+            yield event
+
+    def dispatch(self, event):
+        """ send the event to the handlers of the current state and type"""
+        callbacks = self._table.get((self.gamestate.current_state, event.type), ())
+        for callback in [*callbacks, *self._global.get(event.type, ())]:
+            callback(event)
+
 
 class WelcomeHandler(EventHandler):
     """ handles events in the welcome level"""
@@ -50,6 +107,16 @@ class WelcomeHandler(EventHandler):
 
     def handle(self, state, event):
         if state == 'welcome' and self.gamestate.current_state == state:
+            self.handle_keys(event)
+            return True
+            
+        return super().handle(state, event)
+
+    def register(self, dispatcher):
+        dispatcher.register(['welcome'], [pygame.KEYDOWN], self.handle_keys)
+        super().register(dispatcher)
+
+    def handle_keys(self, event):
             
             # if the space bar is pressed we update professor oak's state in the speech 
             # and if necessary, his sprite is updated
@@ -70,22 +137,20 @@ class WelcomeHandler(EventHandler):
 
                 elif isinstance(self.oak.current_state, OakWin) and event.key == pygame.K_t:
                     self.gamestate.change_state('explore_hometown')
-            return True
-            
-        return super().handle(state, event)
 
 class ChooseHandler(EventHandler):
     """handles events when picking pokemon to start a  new  game"""
 
-    def __init__(self, data_observable: DataObservable, fetcher: Fetcher, gamestate, trainer_mediator: TrainerMediator):
+    def __init__(self, data_observable: DataObservable, fetcher: Fetcher, gamestate, trainer_mediator: TrainerMediator, layout: GridLayout):
         super().__init__(gamestate)
 
         self.fetcher = fetcher
+        self.layout = layout # grid of the tiles, to find the clicked tile
 
         # set up data observable which now gives it access to its own _fields property
         self.choose_level_data = data_observable
         # attach the handler to the observable
-        self.choose_level_data.attach(self)
+        self.choose_level_data.attach(self, fields=['chosen'])
 
         # create the mediator used to access a trainer's properties
         self.trainer_mediator = trainer_mediator
@@ -132,52 +197,37 @@ class ChooseHandler(EventHandler):
                         
 
     def handle_mouse(self, event):
-        """ handle mouse events in the choose level"""
+        """ handle clicks in the choose level, the clicked tile is chosen or unchosen"""
 
         # if we are fetching data, we do not want to handle mouse events
-        if self.fetcher.IS_FETCHING:
+        if self.fetcher.IS_FETCHING or event.type != pygame.MOUSEBUTTONDOWN:
             return
-        
-        mouse_pos = pygame.mouse.get_pos()
 
-        # tiles = self._fields['current_tiles']
         local_pokemon = self.fetcher.fetch_local()
         
         if not local_pokemon or not all(p.get('tile') for p in local_pokemon):
             # make sure all tiles have been set up
             return
 
-        # check if any rect of the tiles collide with the mouse
-        if all(not pk_data['tile'].rect.collidepoint(mouse_pos) for pk_data in local_pokemon):
-            self.choose_level_data.reset_field('hover')
+        # the tiles are laid out in the grid, so the clicked tile is found from the position
+        cell = self.layout.cell_at(event.pos)
+        if cell is None or cell >= len(local_pokemon):
             return
+        pk_data = local_pokemon[cell]
 
-        # for tile in self.choose_level_data.current_pokemon_tiles:
-        for pk_data in local_pokemon:
-            # check the current pokemon tiles to find which is colliding with the mouse
-            if not pk_data['tile'].rect.collidepoint(mouse_pos):
-                continue
-
-            # chosen_tiles = [p.get('tile') for p in ]
-            # if a tile is not already chosen then set it to the hover tile
-            if pk_data['tile'] not in self._fields['chosen']:
-                self.choose_level_data.set_field('hover', pk_data['tile'], unique=True)
-
-                # if it is clicked on, remove it from being hovered
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    self.choose_level_data.reset_field('hover')
-
-                    # if the number of chosen pokemon is less than the predefined number of pokemon, we add it to the list of chosen pokemon
-                    if len(self._fields['chosen']) < Config.POKEMON_COUNT :
-                        pygame.mixer.Sound(r'./assets/sounds/poke-click.ogg').play() # play click sound
-                        self.choose_level_data.set_field('chosen', {pk_data['tile']: pk_data})
+        # if a tile is not already chosen, it is chosen and no longer hovered
+        if pk_data['tile'] not in self._fields['chosen']:
+            self.choose_level_data.reset_field('hover')
 
+            # if the number of chosen pokemon is less than the predefined number of pokemon, we add it to the list of chosen pokemon
+            if len(self._fields['chosen']) < Config.POKEMON_COUNT :
+                Resources.sound(r'./assets/sounds/poke-click.ogg').play() # play click sound
+                self.choose_level_data.set_field('chosen', {pk_data['tile']: pk_data})
 
-            # if the tile is already chosen
-            else:
-                # if we click on it again it should be removed from the chosen field
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    self.choose_level_data.unset_field('chosen', pk_data['tile'])
+        # if the tile is already chosen
+        else:
+            # if we click on it again it should be removed from the chosen field
+            self.choose_level_data.unset_field('chosen', pk_data['tile'])
 
 
     def observe_update(self, field, data):
@@ -193,6 +243,12 @@ class ChooseHandler(EventHandler):
             return True
         return super().handle(state, event)
 
+    def register(self, dispatcher):
+        dispatcher.register(['choose'], [pygame.KEYDOWN], self.handle_keys)
+        # hovering is worked out by the level once per frame, only clicks are handled here
+        dispatcher.register(['choose'], [pygame.MOUSEBUTTONDOWN], self.handle_mouse)
+        super().register(dispatcher)
+
 
 class ExploreHandler(EventHandler):
     
@@ -209,7 +265,7 @@ class ExploreHandler(EventHandler):
         # setup mediator and observable and _fields
         self.trainer_mediator = trainer_mediator
         self.explore_level_data = data_observable
-        self.explore_level_data.attach(self)
+        self.explore_level_data.attach(self, fields=['items', 'timer', 'minimap'])
 
     def observe_update(self, field, data):
         """ used to accept updates from the observable"""
@@ -228,6 +284,17 @@ class ExploreHandler(EventHandler):
 
     def handle(self, state, event):
         if 'explore' in state and state in self.gamestate.current_state:
+            self.handle_keys(event)
+            return True
+        
+        return super().handle(state, event)
+
+    def register(self, dispatcher):
+        explore_states = [state for state in self.gamestate._states if 'explore' in state]
+        dispatcher.register(explore_states, [pygame.KEYDOWN, pygame.KEYUP], self.handle_keys)
+        super().register(dispatcher)
+
+    def handle_keys(self, event):
             
             # handle the animation when the trainer stops moving
             if event.type == pygame.KEYUP:
@@ -251,7 +318,7 @@ class ExploreHandler(EventHandler):
                         if pygame.sprite.collide_rect(self.trainer_mediator.notify('get') , item):
 
                             # play the pick up sound and add the item to the bag
-                            pygame.mixer.Sound(r'./assets/sounds/found-item.ogg').play()
+                            Resources.sound(r'./assets/sounds/found-item.ogg').play()
                             self.trainer_mediator.notify_bag('add_item', item)
 
                 # toggle the bike when f is pressed
@@ -263,9 +330,12 @@ class ExploreHandler(EventHandler):
                 if event.key == pygame.K_r:
                     self.trainer_mediator.notify_bag('toggle_bag')
 
-            return True
-        
-        return super().handle(state, event)
+                # toggle the minimap when m is pressed
+                if event.key == pygame.K_m:
+                    if self._fields['minimap']:
+                        self.explore_level_data.reset_field('minimap')
+                    else:
+                        self.explore_level_data.set_field('minimap', True)
     
 
 class BattleHandler(EventHandler):
@@ -288,6 +358,15 @@ class BattleHandler(EventHandler):
     def handle(self, state, event):
         
         if state == 'battle' and self.gamestate.current_state == state:
+            self.handle_keys(event)
+            return True
+        return super().handle(state, event)
+
+    def register(self, dispatcher):
+        dispatcher.register(['battle'], [pygame.KEYDOWN], self.handle_keys)
+        super().register(dispatcher)
+
+    def handle_keys(self, event):
 
             # use keys and current mediator to attack
             if event.type == pygame.KEYDOWN and event.key in self.allowed_events:
@@ -295,9 +374,6 @@ class BattleHandler(EventHandler):
                 if self.trainer_mediator.notify_pokemon('get_all'):
                     att_pokemon = self.trainer_mediator.notify_pokemon('get_single') # get the current trainer pokemon
                     att_pokemon.attack(self.trainer_mediator.notify_pokemon('get_mediator'), self.allowed_events[event.key]) # attack using mediator
-
-            return True
-        return super().handle(state, event)
     
 class ControlHandler(EventHandler):
     """ handle key events in the controls state"""
@@ -309,6 +385,16 @@ class ControlHandler(EventHandler):
     def handle(self, state, event):
         # handles whether to display controls or not
         if state == 'controls':
+            self.handle_keys(event)
+            return True
+        return super().handle(state, event)
+
+    def register(self, dispatcher):
+        # the controls can be opened from every state
+        dispatcher.register(None, [pygame.KEYDOWN], self.handle_keys)
+        super().register(dispatcher)
+
+    def handle_keys(self, event):
             if event.type == pygame.KEYDOWN:
 
                 # if the c button is pressed and we are already on the controls page, it will switch back to the previous page
@@ -326,7 +412,4 @@ class ControlHandler(EventHandler):
                 else:
                     if event.key == pygame.K_c:
                         self.gamestate.change_state('controls')
-
-            return True
-        return super().handle(state, event)
     
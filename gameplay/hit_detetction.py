@@ -1,6 +1,7 @@
 import pygame
 from abc import ABC, abstractmethod
 from config.config import Config
+from config.resources import Resources
 
 class Hit(ABC):
     """ Abstract base class for a hit detection class
@@ -122,6 +123,6 @@ class HitDetection(Hit):
 
                     # play the collide noise only once until a new collision is detected
                     if self.__play_sound == 0:
-                        pygame.mixer.Sound(r'./assets/sounds/collide.ogg').play()
+                        Resources.sound(r'./assets/sounds/collide.ogg').play()
 
                         self.__play_sound += 1
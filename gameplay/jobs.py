@@ -0,0 +1,116 @@
+import heapq
+import itertools
+import time
+import types
+from concurrent.futures import Future, CancelledError
+
+
+class Job:
+    """ resumable work submitted to the JobScheduler"""
+    __slots__ = ('work', 'priority', 'owner', 'future', 'steps')
+
+    def __init__(self, work, priority, owner):
+        self.work = work         # generator or coroutine
+        self.priority = priority
+        self.owner = owner       # anything the jobs can be cancelled or finished by (usually a level)
+        self.future = Future()   # completed with what the work returns
+        self.steps = 0
+
+
+@types.coroutine
+def next_slice():
+    """ await in a coroutine job to give the rest of the frame back, the job continues in a later slice"""
+    yield
+
+
+class JobScheduler:
+    """ runs heavy work of the levels in the time left over at the end of each frame.
+
+    Work is a generator (each yield is a point it can be paused at) or a coroutine that awaits
+    next_slice(), so a job that builds 16 tiles can build a few per frame instead of all of them in one
+    hitch. Jobs run by priority (lower first) and in the order they were submitted, each job is stepped
+    until it is done or the frame's budget is used up. At least one step runs every frame so jobs always
+    finish, even when the game is slow.
+
+    submit returns a concurrent.futures.Future with what the work returns (or the exception it raised),
+    asyncio code can await it with asyncio.wrap_future"""
+
+    URGENT = 0     # needed on screen now (e.g. the tiles of the current page)
+    NORMAL = 1
+    BACKGROUND = 2 # needed later (e.g. preloading)
+
+    _queue = [] # heap of (priority, order, job)
+    _order = itertools.count()
+
+    @classmethod
+    def submit(cls, work, priority: int = NORMAL, owner=None) -> Future:
+        """ queue a generator or coroutine, returns the future of its result"""
+        job = Job(work, priority, owner)
+        heapq.heappush(cls._queue, (priority, next(cls._order), job))
+        return job.future
+
+    @classmethod
+    def pending(cls, owner=None) -> int:
+        """ number of jobs not yet done (of the owner if given)"""
+        return sum(1 for _, _, job in cls._queue if owner is None or job.owner is owner)
+
+    @classmethod
+    def run(cls, budget: float) -> int:
+        """ step the jobs for budget seconds, returns the number of steps"""
+        deadline = time.perf_counter() + budget
+        steps = 0
+        while cls._queue:
+            entry = cls._queue[0]
+            if cls._step(entry[2]):
+                if cls._queue[0] is entry:
+                    heapq.heappop(cls._queue)
+                else:
+                    # the job submitted jobs that come before it (e.g. a preloaded level's urgent jobs)
+                    cls._queue.remove(entry)
+                    heapq.heapify(cls._queue)
+            steps += 1
+            if time.perf_counter() >= deadline:
+                break
+        return steps
+
+    @classmethod
+    def finish(cls, owner) -> None:
+        """ run the jobs of the owner to the end now, for when their results are needed this frame"""
+        jobs = sorted(entry for entry in cls._queue if entry[2].owner is owner)
+        cls._remove(owner)
+        for _, _, job in jobs:
+            while not cls._step(job):
+                pass
+
+    @classmethod
+    def cancel(cls, owner=None) -> None:
+        """ drop the jobs of the owner (all jobs if no owner is given), their futures are cancelled"""
+        for _, _, job in cls._queue:
+            if owner is None or job.owner is owner:
+                job.work.close()
+                job.future.cancel()
+        cls._remove(owner)
+
+    @classmethod
+    def _remove(cls, owner):
+        cls._queue[:] = [entry for entry in cls._queue if owner is not None and entry[2].owner is not owner]
+        heapq.heapify(cls._queue)
+
+    @staticmethod
+    def _step(job: Job) -> bool:
+        """ resume the job once, returns true when it is done"""
+        job.steps += 1
+        try:
+            if job.work.send(None) is not None:
+                # the coroutine awaited something of the event loop, which the scheduler cannot wait on
+                job.work.throw(RuntimeError('jobs can only await next_slice(), use asyncio tasks for i/o'))
+        except StopIteration as done:
+            job.future.set_result(done.value)
+            return True
+        except CancelledError:
+            job.future.cancel()
+            return True
+        except Exception as error:
+            job.future.set_exception(error)
+            return True
+        return False
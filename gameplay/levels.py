@@ -1,3 +1,4 @@
+from contextlib import contextmanager, ExitStack
 from .environments import *
 from .camera import ExploreCamera
 from .hit_detetction import HitDetection
@@ -7,6 +8,14 @@ from gameplay.play_level import *
 from sprites.professor_oak import OakLose
 from gui_builders.pickup import ItemDirector, ItemBuilder
 from gameplay.dataobservers import ChooseLevelData,  ExploreLevelData
+from gameplay.triggers import SightTriggers
+from gameplay.streaming import ChunkedWorld
+from gameplay.npc_scheduler import NPCScheduler
+from gameplay.navigation import NavGrid, Pathfinder
+from gameplay.minimap import Minimap
+from gameplay.mapformat import load_map
+from gameplay.preloader import LevelPreloader
+from gui_builders.layout import GridLayout
 from gameplay.render_level import *
 from gameplay.event_handlers import *
 
@@ -19,19 +28,32 @@ class LevelStore:
     choose_observable = ChooseLevelData()
     explore_observable = ExploreLevelData()
     trainer_mediator = TrainerMediator()
+    preloader = LevelPreloader() # builds the next level in the background
+    choose_layout = GridLayout.for_tiles(cols=4, rows=4) # grid of the pokemon tiles on the choose level
     observables = [choose_observable, 
                    explore_observable
                    ]
 
+    @classmethod
+    @contextmanager
+    def batch_notifications(cls):
+        """ batch the notifications of every observable, observers are notified when the batch ends"""
+        with ExitStack() as stack:
+            for observable in cls.observables:
+                stack.enter_context(observable.batch())
+            yield
+
     @classmethod
     def reset(cls):
-        """ reset the trainer instance and data fields for each class to start a new game"""
+        """ reset the trainer instance and data fields for each class to start a new game.
+        Only the state of the run is reset, the loaded assets are kept (see Resources)"""
         cls.trainer_mediator.notify_set(cls)
+        cls.preloader.cancel() # the levels being built belong to the last game
         for observable in cls.observables:
-            for field in observable._fields:
-                observable._fields[field] = [] 
+            observable.reset_fields()
             
-            observable.detachall()
+            # the levels of the last game are detached, the handlers live as long as the game
+            observable.detachall(Level)
 
 class HandlerCreator:
     """ key board and mouse event handler creator"""
@@ -43,7 +65,8 @@ class HandlerCreator:
         welcome_handler = WelcomeHandler(gs, gp)
         _choose_handler = ChooseHandler(data_observable=LevelStore.choose_observable, 
                                         fetcher = LevelStore.fetcher, gamestate=gs, 
-                                        trainer_mediator=LevelStore.trainer_mediator)
+                                        trainer_mediator=LevelStore.trainer_mediator,
+                                        layout=LevelStore.choose_layout)
         
         _explore_handler = ExploreHandler(gs, LevelStore.trainer_mediator, data_observable=LevelStore.explore_observable)
         _battle_handler = BattleHandler(gs, trainer_mediator=LevelStore.trainer_mediator)
@@ -54,7 +77,10 @@ class HandlerCreator:
         _explore_handler.next_handler = _battle_handler
         _battle_handler.next_handler = _control_handler
 
-        return welcome_handler
+        # the chain registers the events each handler handles, in each state, with the dispatcher
+        dispatcher = EventDispatcher(gs)
+        welcome_handler.register(dispatcher)
+        return dispatcher
 
 
 class LevelFactory:
@@ -62,18 +88,28 @@ class LevelFactory:
 
     @staticmethod
     def create_level(level_type, screen, gamestate=None):
+        creator = LevelFactory.get_creator(level_type)
+        return creator.create(screen, gamestate) if creator else None
+
+    @staticmethod
+    def preload_level(level_type, screen, gamestate=None):
+        """ job that creates the level in slices, for the LevelPreloader"""
+        return LevelFactory.get_creator(level_type).preload(screen, gamestate)
+
+    @staticmethod
+    def get_creator(level_type):
         if 'hometown' in level_type:
-            return HometownLevelCreator.create(screen, gamestate)
+            return HometownLevelCreator
         elif level_type == 'choose':
-            return ChooseLevelCreator.create(screen, gamestate)
+            return ChooseLevelCreator
         elif level_type == 'welcome':
-            return WelcomeLevelCreator.create(screen, gamestate)
+            return WelcomeLevelCreator
         elif level_type == 'battle':
-            return BattleLevelCreator.create(screen, gamestate)
-        # elif level_type == 'loading':
-        #     return LoadingLevelCreator.create(screen, gamestate)
+            return BattleLevelCreator
+        elif level_type == 'loading':
+            return LoadingLevelCreator
         elif level_type == 'controls':
-            return ControlsLevelCreator.create(screen, gamestate)
+            return ControlsLevelCreator
         else:
             return None
         
@@ -84,16 +120,26 @@ class AbstractCreator():
     def create() -> Level:
         pass
 
+    @classmethod
+    def preload(cls, screen, gamestate):
+        """ generator job that creates the level (see LevelPreloader), creators split the loading
+        of the level into slices where they can"""
+        yield
+        return cls.create(screen, gamestate)
+
 class HometownLevelCreator(AbstractCreator):
+    MAP_FILE = r'./assets/hometown/hometown.tmx'
     
     @staticmethod
     def create(screen, gamestate):
+        map_file = HometownLevelCreator.MAP_FILE
+        ysortlayer = YSortLayer()
         renderer = HomeTownRenderer(
             camera=ExploreCamera(),
-            backdrop_renderer=GameMapTSX,
-            backdrop_file=r'./assets/hometown/hometown.tmx',
+            backdrop_renderer=ChunkedWorld,
+            backdrop_file=map_file,
             baselayer=Layer(),
-            ysortlayer=YSortLayer(),
+            ysortlayer=ysortlayer,
             item_creator=ItemDirector(ItemBuilder()))
 
         return HomeTownLevel(
@@ -102,9 +148,25 @@ class HometownLevelCreator(AbstractCreator):
             renderer=renderer,
             player_hit=HitDetection(),
             trainer=LevelStore.trainer_mediator.notify('get'),
-            data_observable=LevelStore.explore_observable
+            data_observable=LevelStore.explore_observable,
+            sight_triggers=SightTriggers(),
+            npc_scheduler=NPCScheduler(layer=ysortlayer),
+            pathfinder=Pathfinder(NavGrid.for_map(map_file, layers=['houses', 'extra'])),
+            minimap=Minimap(map_file)
         )
 
+    @classmethod
+    def preload(cls, screen, gamestate):
+        # the map, its navigation grid and its minimap are loaded once per process, a slice each,
+        # then the level itself (its sprites and challengers) is created in the last slice
+        load_map(cls.MAP_FILE)
+        yield
+        NavGrid.for_map(cls.MAP_FILE, layers=['houses', 'extra'])
+        yield
+        Minimap(cls.MAP_FILE).base
+        yield
+        return cls.create(screen, gamestate)
+
 class ChooseLevelCreator(AbstractCreator):
     @staticmethod
     def create(screen, gamestate):
@@ -118,7 +180,8 @@ class ChooseLevelCreator(AbstractCreator):
             gamestate=gamestate,
             renderer=renderer,
             data_observable=LevelStore.choose_observable,
-            fetcher=LevelStore.fetcher)
+            fetcher=LevelStore.fetcher,
+            layout=LevelStore.choose_layout)
 
 class WelcomeLevelCreator(AbstractCreator):
     @staticmethod
@@ -130,24 +193,35 @@ class WelcomeLevelCreator(AbstractCreator):
         return WelcomeLevel(screen, gamestate, renderer)
 
 class BattleLevelCreator(AbstractCreator):
+    _pool = [] # battle levels, which are reused once their battle has finished
+
     @staticmethod
     def create(screen, gamestate):
-        renderer = BattleRenderer(
-            backdrop_renderer=GameMapBackDrop,
-            backdrop_file=r'./assets/images/battle.png',
-            lose_state=OakLose)
+        # the backdrop and music are kept by the level, so a finished battle is set up again for the new challenger
+        pool = BattleLevelCreator._pool
+        level = next((level for level in pool if level.finished and level.screen is screen and level.gamestate is gamestate), None)
+        if level is None:
+            renderer = BattleRenderer(
+                backdrop_renderer=GameMapBackDrop,
+                backdrop_file=r'./assets/images/battle.png',
+                lose_state=OakLose)
+
+            level = BattleLevel(screen, gamestate, renderer, trainer_mediator=LevelStore.trainer_mediator)
+            pool.append(level)
 
-        return BattleLevel(screen, gamestate, renderer, trainer_mediator=LevelStore.trainer_mediator)
+        return level.start()
 
-# class LoadingLevelCreator(AbstractCreator):
-#     @staticmethod
-#     def create(screen, gamestate):
-#         renderer = LoadingRenderer(
-#             backdrop_renderer=GameMapBackDrop,
-#             backdrop_file=r'./assets/images/loading.jpg',
-#         )
+class LoadingLevelCreator(AbstractCreator):
+    @staticmethod
+    def create(screen, gamestate):
+        renderer = LoadingRenderer(
+            backdrop_renderer=GameMapBackDrop,
+            backdrop_file=r'./assets/images/loading.jpg',
+        )
 
-#         return LoadingLevel(screen, gamestate, renderer, fetcher=LevelStore.fetcher)
+        # the loading level stands in for a level that is being built, or leads to the choose level
+        target = gamestate.current_state if gamestate.current_state != 'loading' else 'choose'
+        return LoadingLevel(screen, gamestate, renderer, preloader=LevelStore.preloader, target=target)
 
 class ControlsLevelCreator(AbstractCreator):
     @staticmethod
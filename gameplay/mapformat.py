@@ -0,0 +1,278 @@
+""" compiled (baked) map format and the process wide map cache
+
+TMX maps are parsed with pytmx, which means an xml parse and loading and converting every
+tileset image. The compiler below turns a TMX file into one binary file which holds the gid
+arrays of the tile layers, a single tileset atlas and the object lists, so a map can be loaded
+with one read.
+
+Compile a map from the project folder with:
+    python -m gameplay.mapformat assets/hometown/hometown.tmx
+
+File layout (little endian):
+    header    magic, version, map width/height (tiles), tile width/height (px),
+              number of gids, atlas width/height, number of layers, number of objects
+    tiles     x, y, w, h of every gid's image in the atlas (w == 0 when the gid has no image)
+    layers    name, visible flag, width*height gids
+    objects   name, type, x, y, width, height, gid
+    animations  number of animated gids, then for each: gid, number of frames, (frame gid, duration ms) per frame
+    atlas     raw RGBA pixels
+"""
+import os
+import sys
+import struct
+from array import array
+from collections import namedtuple
+import pygame
+from pytmx.util_pygame import load_pygame
+
+MAGIC = b'PBMAP'
+VERSION = 2
+EXTENSION = '.pbmap'
+
+_HEADER = struct.Struct('<5sHIIHHIIIHI')
+_TILE = struct.Struct('<HHHH')
+_OBJECT = struct.Struct('<ffffI')
+_COUNT = struct.Struct('<H')
+_ANIMATION = struct.Struct('<IH')
+_FRAME = struct.Struct('<II')
+_TOTAL = struct.Struct('<I')
+
+# same fields as the animation frames of pytmx
+AnimationFrame = namedtuple('AnimationFrame', ['gid', 'duration'])
+
+ATLAS_WIDTH = 1024 # max width of the tileset atlas in pixels
+
+# filename -> parsed map, maps are only parsed once per process
+_MAPS = {}
+
+
+def baked_path(filename: str) -> str:
+    """ path of the compiled version of a tmx file"""
+    return os.path.splitext(filename)[0] + EXTENSION
+
+
+def load_map(filename: str):
+    """ load a map once per process. The compiled map is used if it exists and is at least
+    as new as the tmx file, otherwise we fall back to parsing the tmx file"""
+
+    if filename not in _MAPS:
+        baked = baked_path(filename)
+        source_time = os.path.getmtime(filename) if os.path.exists(filename) else 0
+
+        _MAPS[filename] = None
+        if os.path.exists(baked) and os.path.getmtime(baked) >= source_time:
+            try:
+                _MAPS[filename] = BakedMap.load(baked)
+            except (ValueError, struct.error, UnicodeDecodeError):
+                # compiled with an older version of the format or truncated/corrupt, use the tmx file until it is compiled again
+                pass
+        if _MAPS[filename] is None:
+            _MAPS[filename] = load_pygame(filename)
+
+    return _MAPS[filename]
+
+
+def _pack_str(text) -> bytes:
+    data = (text or '').encode('utf-8')
+    return _COUNT.pack(len(data)) + data
+
+
+def _read_str(view, offset):
+    (length,) = _COUNT.unpack_from(view, offset)
+    offset += _COUNT.size
+    return bytes(view[offset:offset + length]).decode('utf-8'), offset + length
+
+
+def _pack_atlas(images):
+    """ place every tile image in an atlas using rows (shelves) of tiles,
+    returns the atlas surface and the rect of each gid's image"""
+
+    rects = [None] * len(images)
+    x = y = shelf_h = 0
+    for gid, image in enumerate(images):
+        if image is None:
+            continue
+        w, h = image.get_size()
+        if x + w > ATLAS_WIDTH:
+            x, y, shelf_h = 0, y + shelf_h, 0
+        rects[gid] = pygame.Rect(x, y, w, h)
+        x += w
+        shelf_h = max(shelf_h, h)
+
+    atlas = pygame.Surface((ATLAS_WIDTH, max(y + shelf_h, 1)), pygame.SRCALPHA)
+    for gid, image in enumerate(images):
+        if rects[gid]:
+            atlas.blit(image, rects[gid])
+    return atlas, rects
+
+
+def compile_map(filename: str, out_file: str = None) -> str:
+    """ compile a tmx file into the binary map format, returns the output path"""
+
+    tmx = load_pygame(filename)
+    out_file = out_file or baked_path(filename)
+
+    images = list(tmx.images)
+    atlas, rects = _pack_atlas(images)
+    tile_layers = [layer for layer in tmx.layers if hasattr(layer, 'data')]
+    objects = list(tmx.objects)
+
+    chunks = [_HEADER.pack(MAGIC, VERSION, tmx.width, tmx.height, tmx.tilewidth, tmx.tileheight,
+                           len(images), *atlas.get_size(), len(tile_layers), len(objects))]
+
+    for rect in rects:
+        chunks.append(_TILE.pack(*rect) if rect else _TILE.pack(0, 0, 0, 0))
+
+    for layer in tile_layers:
+        gids = array('I', (gid for row in layer.data for gid in row))
+        if sys.byteorder == 'big':
+            gids.byteswap()
+        chunks.append(_pack_str(layer.name) + bytes([bool(layer.visible)]) + gids.tobytes())
+
+    for obj in objects:
+        chunks.append(_pack_str(obj.name) + _pack_str(obj.type) +
+                      _OBJECT.pack(obj.x, obj.y, obj.width, obj.height, obj.gid or 0))
+
+    animations = {}
+    for gid in range(len(images)):
+        frames = (tmx.get_tile_properties_by_gid(gid) or {}).get('frames')
+        if frames:
+            animations[gid] = frames
+    chunks.append(_TOTAL.pack(len(animations)))
+    for gid, frames in animations.items():
+        chunks.append(_ANIMATION.pack(gid, len(frames)) + b''.join(_FRAME.pack(frame.gid, frame.duration) for frame in frames))
+
+    chunks.append(pygame.image.tostring(atlas, 'RGBA'))
+
+    with open(out_file, 'wb') as f:
+        f.write(b''.join(chunks))
+    return out_file
+
+
+class BakedLayer:
+    """ tile layer of a compiled map, has the same interface as the pytmx tile layers used by the game"""
+
+    def __init__(self, parent, name, visible, width, height, gids):
+        self.parent = parent
+        self.name = name
+        self.visible = visible
+        self.width = width
+        self.height = height
+
+        # rows are views on the gid array, nothing is copied
+        self.data = [gids[y * width:(y + 1) * width] for y in range(height)]
+
+    def iter_data(self):
+        """ yields x, y, gid for every cell of the layer"""
+        for y, row in enumerate(self.data):
+            for x, gid in enumerate(row):
+                yield x, y, gid
+
+    def tiles(self):
+        """ yields x, y, image for every cell that has an image"""
+        images = self.parent.images
+        for x, y, gid in self.iter_data():
+            if gid and images[gid]:
+                yield x, y, images[gid]
+
+
+class BakedObject:
+    """ object of a compiled map"""
+
+    def __init__(self, name, type, x, y, width, height, gid):
+        self.name = name
+        self.type = type
+        self.x, self.y = x, y
+        self.width, self.height = width, height
+        self.gid = gid
+
+
+class BakedMap:
+    """ map loaded from the compiled format, has the same interface as the pytmx map used by the game"""
+
+    def __init__(self, width, height, tilewidth, tileheight, images, layers, objects, animations=None):
+        self.width = width
+        self.height = height
+        self.tilewidth = tilewidth
+        self.tileheight = tileheight
+        self.images = images
+        self.layers = layers
+        self.objects = objects
+        self.animations = animations or {} # gid -> list of AnimationFrame
+
+    @property
+    def visible_layers(self):
+        return [layer for layer in self.layers if layer.visible]
+
+    def get_tile_image_by_gid(self, gid):
+        return self.images[gid]
+
+    def get_tile_properties_by_gid(self, gid):
+        """ only the animation frames of the tile properties are compiled"""
+        if gid in self.animations:
+            return {'frames': self.animations[gid]}
+
+    @classmethod
+    def load(cls, filename: str) -> 'BakedMap':
+        """ load a compiled map with a single read"""
+
+        with open(filename, 'rb') as f:
+            view = memoryview(f.read())
+
+        magic, version, width, height, tilewidth, tileheight, num_gids, atlas_w, atlas_h, num_layers, num_objects = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{filename} is not a compiled map of version {VERSION}')
+        offset = _HEADER.size
+
+        rects = []
+        for _ in range(num_gids):
+            rects.append(_TILE.unpack_from(view, offset))
+            offset += _TILE.size
+
+        baked = cls(width, height, tilewidth, tileheight, [], [], [])
+
+        for _ in range(num_layers):
+            name, offset = _read_str(view, offset)
+            visible = bool(view[offset])
+            offset += 1
+
+            size = width * height * 4
+            gids = view[offset:offset + size].cast('I')
+            if sys.byteorder == 'big':
+                gids = array('I', gids)
+                gids.byteswap()
+            offset += size
+            baked.layers.append(BakedLayer(baked, name, visible, width, height, gids))
+
+        for _ in range(num_objects):
+            name, offset = _read_str(view, offset)
+            obj_type, offset = _read_str(view, offset)
+            x, y, w, h, gid = _OBJECT.unpack_from(view, offset)
+            offset += _OBJECT.size
+            baked.objects.append(BakedObject(name, obj_type, x, y, w, h, gid))
+
+        (num_animations,) = _TOTAL.unpack_from(view, offset)
+        offset += _TOTAL.size
+        for _ in range(num_animations):
+            gid, num_frames = _ANIMATION.unpack_from(view, offset)
+            offset += _ANIMATION.size
+            baked.animations[gid] = [AnimationFrame(*_FRAME.unpack_from(view, offset + i * _FRAME.size)) for i in range(num_frames)]
+            offset += num_frames * _FRAME.size
+
+        atlas = pygame.image.fromstring(bytes(view[offset:offset + atlas_w * atlas_h * 4]), (atlas_w, atlas_h), 'RGBA')
+        if pygame.display.get_surface():
+            atlas = atlas.convert_alpha()
+
+        # every gid gets one subsurface of the atlas, so equal gids share the same image
+        baked.images = [atlas.subsurface(rect) if rect[2] else None for rect in rects]
+        return baked
+
+
+if __name__ == '__main__':
+    # pytmx converts the tileset images, which needs a display
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+
+    for tmx_file in sys.argv[1:]:
+        print('compiled', tmx_file, '->', compile_map(tmx_file))
@@ -0,0 +1,83 @@
+import pygame
+from config.config import Config
+from gameplay.mapformat import load_map
+
+
+class Minimap:
+    """ small map of the explore level.
+
+    The base is a downsampled render of the static map layers, one pixel per tile coloured with the
+    average colour of the tile's image, scaled to Config.MINIMAP_SIZE. It is made once per map and
+    cached (it is only made again if the map is loaded again). Markers are drawn on a copy of the base,
+    which is only redrawn when one of the markers has moved, so drawing the minimap is a single blit"""
+
+    _bases = {} # map file -> (map, base surface)
+
+    def __init__(self, filename: str, layers: list = ('base', 'grass', 'houses', 'extra')):
+        self.filename = filename
+        self.layers = layers
+        self._markers = None
+        self._image = None
+        self._image_base = None # base the image was drawn on
+
+    @property
+    def base(self) -> pygame.Surface:
+        tmx = load_map(self.filename)
+        if self._bases.get(self.filename, (None,))[0] is not tmx:
+            self._bases[self.filename] = (tmx, self._render_base(tmx))
+        return self._bases[self.filename][1]
+
+    def _render_base(self, tmx) -> pygame.Surface:
+        """ one pixel per tile, later layers are drawn over earlier ones"""
+        colours = {} # gid -> average colour of its image
+        pixels = bytearray(tmx.width * tmx.height * 3)
+
+        for layer in tmx.visible_layers:
+            if not hasattr(layer, 'data') or layer.name not in self.layers:
+                continue
+            for y, row in enumerate(layer.data):
+                for x, gid in enumerate(row):
+                    if not gid:
+                        continue
+                    if gid not in colours:
+                        image = tmx.get_tile_image_by_gid(gid)
+                        colours[gid] = pygame.transform.average_color(image) if image else (0, 0, 0, 0)
+                    r, g, b, a = colours[gid]
+                    if a:
+                        index = (y * tmx.width + x) * 3
+                        pixels[index:index + 3] = bytes((r, g, b))
+
+        base = pygame.image.frombuffer(pixels, (tmx.width, tmx.height), 'RGB')
+        base = pygame.transform.smoothscale(base, Config.MINIMAP_SIZE)
+        pygame.draw.rect(base, Config.WHITE, base.get_rect(), 1)
+        return base
+
+    def draw(self, screen: pygame.Surface, trainer, challengers, items):
+        """ draw the minimap in the top right of the screen with markers for the trainer,
+        the challengers and the items"""
+        base = self.base
+        tmx = load_map(self.filename)
+
+        # world position -> minimap position
+        scale_x = base.get_width() / (tmx.width * Config.TILE_X_SPACING)
+        scale_y = base.get_height() / (tmx.height * Config.TILE_Y_SPACING)
+
+        def position(sprite):
+            return int(sprite.rect.centerx * scale_x), int(sprite.rect.centery * scale_y)
+
+        markers = (position(trainer),
+                   tuple(position(challenger) for challenger in challengers),
+                   tuple(position(item) for item in items))
+
+        # the markers are only drawn again when one of them has moved (or the base has been made again)
+        if markers != self._markers or self._image_base is not base:
+            self._markers = markers
+            self._image_base = base
+            self._image = base.copy()
+            for pos in markers[2]:
+                pygame.draw.rect(self._image, Config.MINIMAP_ITEM, (pos[0] - 1, pos[1] - 1, 3, 3))
+            for pos in markers[1]:
+                pygame.draw.rect(self._image, Config.MINIMAP_CHALLENGER, (pos[0] - 1, pos[1] - 1, 3, 3))
+            pygame.draw.rect(self._image, Config.MINIMAP_TRAINER, (markers[0][0] - 2, markers[0][1] - 2, 4, 4))
+
+        screen.blit(self._image, (Config.SCREEN_WIDTH - self._image.get_width() - 10, 10))
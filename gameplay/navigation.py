@@ -0,0 +1,227 @@
+""" navigation grid and path finding for npcs
+
+The grid is compiled once per map from its collidable layers, every cell with a tile in one of those
+layers is blocked. The grid is shared by every level on the map and never changes, items block their
+cells on the Pathfinder of their level until they are picked up.
+
+Paths are found with A* and cached by (start cell, goal cell). Blocking a cell drops the cached paths
+that go through it, unblocking a cell drops the whole cache (a shorter path may now exist).
+
+NPCs do not search themselves, they queue a request on the Pathfinder which works through the queue
+every frame within a time budget. A search that does not finish within the budget is resumed on the
+next frame, so many npcs can ask for paths at once without a frame taking longer.
+"""
+import time
+import heapq
+import pygame
+from collections import deque
+from config.config import Config
+from gameplay.mapformat import load_map
+from typing import List, Tuple
+
+Cell = Tuple[int, int]
+
+
+class NavGrid:
+    """ walkable cells of a map"""
+
+    _grids = {} # (map file, layers) -> grid, the grid of a map is only compiled once
+
+    def __init__(self, width: int, height: int, blocked: bytearray):
+        self.width = width
+        self.height = height
+        self.blocked = blocked
+
+    @classmethod
+    def for_map(cls, filename: str, layers: list) -> 'NavGrid':
+        """ the grid of a map compiled from its collidable layers"""
+        key = (filename, tuple(layers))
+        if key not in cls._grids:
+            cls._grids[key] = cls.compile(filename, layers)
+        return cls._grids[key]
+
+    @classmethod
+    def compile(cls, filename: str, layers: list) -> 'NavGrid':
+        tmx = load_map(filename)
+        blocked = bytearray(tmx.width * tmx.height)
+        for layer in tmx.visible_layers:
+            if hasattr(layer, 'data') and layer.name in layers:
+                for y, row in enumerate(layer.data):
+                    for x, gid in enumerate(row):
+                        if gid and tmx.get_tile_image_by_gid(gid) is not None:
+                            blocked[y * tmx.width + x] = 1
+        return cls(tmx.width, tmx.height, blocked)
+
+    @staticmethod
+    def cell_of(point) -> Cell:
+        return int(point[0] // Config.TILE_X_SPACING), int(point[1] // Config.TILE_Y_SPACING)
+
+    @staticmethod
+    def center_of(cell: Cell) -> Tuple[int, int]:
+        """ world position of the center of a cell"""
+        return cell[0] * Config.TILE_X_SPACING + Config.TILE_X_SPACING // 2, cell[1] * Config.TILE_Y_SPACING + Config.TILE_Y_SPACING // 2
+
+    def cells_of(self, rect: pygame.Rect) -> List[Cell]:
+        left, top = self.cell_of(rect.topleft)
+        right, bottom = self.cell_of((rect.right - 1, rect.bottom - 1))
+        return [(x, y) for x in range(left, right + 1) for y in range(top, bottom + 1) if self.inside((x, y))]
+
+    def inside(self, cell: Cell) -> bool:
+        return 0 <= cell[0] < self.width and 0 <= cell[1] < self.height
+
+    def walkable(self, cell: Cell) -> bool:
+        return self.inside(cell) and not self.blocked[cell[1] * self.width + cell[0]]
+
+
+class Pathfinder:
+    """ queue of path requests served within a time budget per frame, with a path cache"""
+
+    # a running search checks the time every this many expanded cells
+    EXPANSIONS_PER_CHECK = 64
+
+    # npcs only walk short distances, a search gives up after this many cells
+    # (otherwise a goal that can not be reached would search the whole map)
+    MAX_EXPANSIONS = 4096
+
+    def __init__(self, grid: NavGrid):
+        self.grid = grid
+        self._blocked = {}     # cells blocked by sprites (items), counted since several sprites can block the same cell
+        self._cache = {}       # (start, goal) -> path
+        self._through = {}     # cell -> keys of the cached paths going through it
+        self._queue = deque()  # (start, goal, callback)
+        self._search = None    # (start, goal, callbacks, generator) of the running search
+        self._deadline = 0     # time the running search must pause at
+        self.hits = self.misses = 0
+
+    def request(self, start: Cell, goal: Cell, callback):
+        """ ask for a path, callback is called with the list of cells from start to goal
+        (or None if there is no path) once it has been found"""
+        if (start, goal) in self._cache:
+            self.hits += 1
+            callback(self._cache[start, goal])
+        else:
+            self._queue.append((start, goal, callback))
+
+    def walkable(self, cell: Cell) -> bool:
+        return self.grid.walkable(cell) and cell not in self._blocked
+
+    def neighbours(self, cell: Cell, goal: Cell = None):
+        """ walkable cells next to a cell, the goal counts as walkable (an npc walks up to the trainer,
+        who may be standing on the edge of a house)"""
+        x, y = cell
+        for neighbour in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if neighbour == goal or self.walkable(neighbour):
+                yield neighbour
+
+    def block(self, rect: pygame.Rect):
+        """ block the cells covered by a sprite, dropping the cached paths through them"""
+        for cell in self.grid.cells_of(rect):
+            self._blocked[cell] = self._blocked.get(cell, 0) + 1
+            for key in self._through.pop(cell, ()):
+                self._forget(key)
+
+    def unblock(self, rect: pygame.Rect):
+        """ unblock the cells covered by a sprite (e.g. when an item is picked up)"""
+        for cell in self.grid.cells_of(rect):
+            if cell in self._blocked:
+                self._blocked[cell] -= 1
+                if not self._blocked[cell]:
+                    del self._blocked[cell]
+
+        # paths that went around the cell may now be longer than needed
+        self._cache.clear()
+        self._through.clear()
+
+    def _forget(self, key):
+        for cell in self._cache.pop(key, None) or ():
+            if cell in self._through:
+                self._through[cell].discard(key)
+
+    def process(self, budget_ms: float = Config.PATH_BUDGET_MS) -> int:
+        """ work through the requests until the budget is used up, returns the number of requests answered"""
+        end = self._deadline = time.perf_counter() + budget_ms / 1000
+        answered = 0
+
+        while time.perf_counter() < end:
+            if self._search is None:
+                if not self._queue:
+                    break
+                start, goal, callback = self._queue.popleft()
+
+                # an earlier request this frame may have found the same path
+                if (start, goal) in self._cache:
+                    self.hits += 1
+                    callback(self._cache[start, goal])
+                    answered += 1
+                    continue
+
+                self.misses += 1
+                callbacks = [callback]
+                # answer queued requests for the same path with the same search
+                for request in [request for request in self._queue if request[:2] == (start, goal)]:
+                    self._queue.remove(request)
+                    callbacks.append(request[2])
+                self._search = (start, goal, callbacks, self._astar(start, goal))
+
+            start, goal, callbacks, search = self._search
+            try:
+                next(search)
+            except StopIteration as done:
+                self._search = None
+                path = done.value
+                self._cache[start, goal] = path
+                for cell in path or ():
+                    self._through.setdefault(cell, set()).add((start, goal))
+                for callback in callbacks:
+                    callback(path)
+                answered += len(callbacks)
+            else:
+                # the search ran out of time, it is resumed on the next frame with a new deadline
+                self._search = (start, goal, callbacks, search)
+                break
+
+        return answered
+
+    def _astar(self, start: Cell, goal: Cell):
+        """ A* search as a generator, it yields when the deadline of the frame has passed and
+        returns the path (or None) when it is done"""
+        if not self.grid.inside(start) or not self.grid.inside(goal):
+            return None
+
+        def estimate(cell):
+            return abs(cell[0] - goal[0]) + abs(cell[1] - goal[1])
+
+        came_from = {start: None}
+        cost = {start: 0}
+        frontier = [(estimate(start), 0, start)]
+        expanded = 0
+
+        while frontier:
+            _, current_cost, current = heapq.heappop(frontier)
+            if current == goal:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = came_from[current]
+                return path[::-1]
+            if current_cost > cost[current]:
+                continue
+
+            for neighbour in self.neighbours(current, goal):
+                new_cost = current_cost + 1
+                if new_cost < cost.get(neighbour, new_cost + 1):
+                    cost[neighbour] = new_cost
+                    came_from[neighbour] = current
+                    heapq.heappush(frontier, (new_cost + estimate(neighbour), new_cost, neighbour))
+
+            expanded += 1
+            if expanded >= self.MAX_EXPANSIONS:
+                return None
+            if expanded % self.EXPANSIONS_PER_CHECK == 0 and time.perf_counter() > self._deadline:
+                yield
+
+        return None
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue) + (self._search is not None)
@@ -0,0 +1,94 @@
+import pygame
+from config.config import Config
+from gameplay.triggers import SpatialIndex
+from gameplay.environments import Layer
+
+
+class NPCScheduler:
+    """ decides how often each npc is updated depending on how close it is to the trainer.
+
+        - active: on screen, stepped every frame
+        - near: awake but off screen, stepped every Config.NPC_NEAR_INTERVAL frames (staggered so
+          they do not all step on the same frame)
+        - asleep: further than Config.NPC_WAKE_RADIUS cells, not stepped and not in the layer,
+          so they are not drawn, sorted or collided with either
+
+    The npcs are kept in a spatial index, so only the cells around the trainer are looked at and
+    only when the trainer changes cell. An npc is woken (npc.wake) the first time the trainer comes close,
+    which is where work that is only needed near the trainer is done (e.g. generating a challenger's pokemon)"""
+
+    def __init__(self, layer: Layer, cell_size: int = Config.NPC_CELL_SIZE, on_wake=None):
+        self.layer = layer
+        self._index = SpatialIndex(cell_size)
+        self._cell = None
+        self._order = {} # npc -> registration number, used to stagger the near npcs
+
+        # called with an npc the first time it wakes up
+        self.on_wake = on_wake
+
+        self.awake = {}  # npc -> None
+        self.woken = set() # npcs that have been woken at least once
+        self.frame = 0
+        self.steps = 0 # number of npc steps in the last frame
+        self.moved = [] # npcs that moved in the last frame
+
+    def register(self, npc):
+        """ add an npc, it sleeps until the trainer comes close"""
+        self._order[npc] = len(self._order)
+        self._index.insert(npc, npc.rect)
+        self.layer.remove(npc)
+        self._cell = None
+
+    def unregister(self, npc):
+        self._index.remove(npc)
+        self._order.pop(npc, None)
+        self.awake.pop(npc, None)
+
+    def wake(self, npc):
+        if npc not in self.woken:
+            self.woken.add(npc)
+            npc.wake()
+            if self.on_wake:
+                self.on_wake(npc)
+        if npc not in self.awake:
+            self.awake[npc] = None
+            self.layer.add(npc)
+
+    def sleep(self, npc):
+        if self.awake.pop(npc, 0) is None:
+            self.layer.remove(npc)
+
+    def update(self, focus: pygame.Rect, view: pygame.Rect, trainer=None) -> int:
+        """ wake or put to sleep the npcs around the focus if it changed cell, and step the awake npcs
+        that are due this frame. view is the world rect on screen. Returns the number of npcs stepped"""
+        self.frame += 1
+
+        cell = self._index.cell_of(focus.center)
+        if cell != self._cell:
+            self._cell = cell
+            radius = Config.NPC_WAKE_RADIUS
+            near = {}
+            for x in range(cell[0] - radius, cell[0] + radius + 1):
+                for y in range(cell[1] - radius, cell[1] + radius + 1):
+                    near.update(dict.fromkeys(self._index.at((x, y))))
+
+            for npc in [npc for npc in self.awake if npc not in near]:
+                self.sleep(npc)
+            for npc in near:
+                self.wake(npc)
+
+        self.steps = 0
+        self.moved = []
+        for npc in self.awake:
+            if view.colliderect(npc.rect) or (self.frame + self._order[npc]) % Config.NPC_NEAR_INTERVAL == 0:
+                # step returns true if the npc has moved
+                if npc.step(trainer):
+                    self.moved.append(npc)
+                self.steps += 1
+
+        for npc in self.moved:
+            self._index.insert(npc, npc.rect)
+        return self.steps
+
+    def report(self) -> dict:
+        return {'npcs': len(self._index), 'awake': len(self.awake), 'woken': len(self.woken), 'stepped': self.steps}
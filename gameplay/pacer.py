@@ -0,0 +1,72 @@
+import asyncio
+import time
+from config.config import Config
+
+
+class FramePacer:
+    """ paces the main loop on the asyncio event loop.
+
+    pygame's Clock.tick sleeps the whole thread for the rest of the frame, so no fetch, sprite download
+    or other task can run until the next frame. The pacer instead awaits the rest of the frame on the
+    event loop, so the tasks and I/O callbacks run in the idle part of every frame.
+
+    Each frame is split into:
+        - render: from the start of the frame until wait is called (events, gameplay, drawing)
+        - background: cpu time the other tasks used while the loop waited
+        - idle: the rest of the wait, the loop was sleeping
+    averages of the three are kept in milliseconds for report.
+
+    An uncapped pacer (for headless runs) does not wait for the rest of the frame, it only hands control
+    to the loop once, and every frame counts as a whole frame of game time, so the game runs as fast as
+    it can and still plays the same as at the frame rate"""
+
+    SMOOTHING = 0.1 # weight of the latest frame in the averages
+
+    def __init__(self, framerate: int = Config.FRAMERATE, uncapped: bool = False):
+        self.frame = 1 / framerate # seconds per frame
+        self.uncapped = uncapped
+        self._frame_start = time.perf_counter()
+
+        # last frame, in seconds
+        self.render = self.background = self.idle = 0.0
+
+        # averages, in milliseconds (None until the first frame)
+        self._averages = None
+
+    def remaining(self) -> float:
+        """ seconds left in the budget of the current frame"""
+        return self._frame_start + self.frame - time.perf_counter()
+
+    async def wait(self) -> float:
+        """ await the rest of the frame, returns the seconds the whole frame took (like Clock.tick in seconds)"""
+        render_end = time.perf_counter()
+        cpu = time.process_time()
+
+        # always hand control to the loop once, even when rendering used up the whole frame,
+        # otherwise the tasks would starve while the game is slow
+        await asyncio.sleep(0)
+        remaining = self.remaining()
+        if remaining > 0 and not self.uncapped:
+            await asyncio.sleep(remaining)
+
+        now = time.perf_counter()
+        waited = now - render_end
+        self.render = render_end - self._frame_start
+        # sleeping in the loop uses no cpu, so the cpu time of the wait is what the tasks used
+        self.background = min(time.process_time() - cpu, waited)
+        self.idle = waited - self.background
+
+        frame_seconds = now - self._frame_start
+        # a late frame does not make the next one shorter, the next frame gets a whole budget
+        self._frame_start = now
+
+        latest = {'render': self.render, 'background': self.background, 'idle': self.idle, 'frame': frame_seconds}
+        if self._averages is None:
+            self._averages = {key: seconds * 1000 for key, seconds in latest.items()}
+        for key, seconds in latest.items():
+            self._averages[key] += (seconds * 1000 - self._averages[key]) * self.SMOOTHING
+        return self.frame if self.uncapped else frame_seconds
+
+    def report(self) -> dict:
+        """ average milliseconds per frame spent rendering, on background tasks and idle"""
+        return {key: round(value, 2) for key, value in (self._averages or {}).items()}
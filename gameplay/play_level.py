@@ -12,6 +12,15 @@ from gameplay.render_level import LevelRenderer
 from abc import ABC, abstractmethod
 from config.fetcher import Fetcher
 from gameplay.timers import Timer
+from gameplay.clock import GameClock
+from gameplay.triggers import SightTriggers
+from gameplay.npc_scheduler import NPCScheduler
+from gameplay.navigation import Pathfinder
+from gameplay.minimap import Minimap
+from gameplay.jobs import JobScheduler
+from gameplay.preloader import LevelPreloader
+from config.resources import Resources
+from gui_builders.layout import GridLayout
 from gameplay.environments import *
 import asyncio
 
@@ -40,6 +49,11 @@ class Level(ABC):
     def play_level():
         pass
 
+    def update(self):
+        """ one fixed step of the simulation (see GameClock), called before play_level as many times as
+        the frame needs. Levels whose logic does not depend on time only need play_level"""
+        pass
+
 
 class WelcomeLevel(Level):
 
@@ -87,25 +101,38 @@ class WelcomeLevel(Level):
 class ChooseLevel(Level):
     """ class for the choose level"""
 
-    def __init__(self, screen, gamestate,renderer: GameEnvironment, data_observable: DataObservable, fetcher: Fetcher):
+    def __init__(self, screen, gamestate,renderer: GameEnvironment, data_observable: DataObservable, fetcher: Fetcher, layout: GridLayout):
         super().__init__(screen, gamestate, renderer)
         self.image, self.pos = self.renderer.render_environment()
         self.fetcher = fetcher # set up fetcher
         
         # create observable and attach delf
         self.choose_level_data = data_observable
-        self.choose_level_data.attach(self)
+        self.choose_level_data.attach(self, fields=['chosen', 'hover'])
         
-        self.cols = self.rows = 4
-        self.spacing = (Config.SCREEN_WIDTH - 
-                        (Config.SCREEN_WIDTH/self.cols-20)*self.cols)/self.cols-self.cols  # spacing calculation for space between pokemon tiles
+        # the tiles are placed in a grid, which is also used to find the tile under the mouse
+        self.layout = layout
+        self.cols, self.rows = layout.cols, layout.rows
+        self.spacing = layout.spacing # space between pokemon tiles
+        self._hover_key = None # (page, cell, chosen) the hover field was last set for
     
         self.load_count = 0
-        self.loading_image = SpriteSheet(r'./assets/spritesheets/loading-spritesheet.png', r'./assets/spritesheets/sheet_json/loading-animate.json')
+        self._tiles_job = None # job building the tiles of the current page
+        self.loading_image = Resources.sheet(r'./assets/spritesheets/loading-spritesheet.png', r'./assets/spritesheets/sheet_json/loading-animate.json')
+        self._preloading = False # the hometown is being built in the background
+
     def observe_update(self, field, data):
         """ receive updates from observable """
         self._fields[field] = data
 
+    def _preload_hometown(self):
+        # the hometown is built in the background while the trainer chooses their pokemon. Building it
+        # wakes the challengers near the start, which generate their pokemon from the fetched pages,
+        # so it only starts once a page has been fetched
+        if not self._preloading and self.fetcher.counter > 0 and not self.fetcher.IS_FETCHING:
+            self._preloading = True
+            self.gamestate.preload('explore_hometown')
+
     @property
     def fields(self):
         if hasattr(self, '_fields'):
@@ -142,6 +169,8 @@ class ChooseLevel(Level):
                 #     raise Exception()
             if self.fetcher.PROGRESS == 100:
                 self._create_current_tiles()
+                self._preload_hometown()
+                self._update_hover()
                 page = self._display_tiles_with_hover_and_click()
                 self._display_pokemon_count()
                 self._continue_to_exolore()
@@ -153,16 +182,26 @@ class ChooseLevel(Level):
             error_message.display(self.screen, (Config.CENTER[0]-error_message.surface.get_width()//2, Config.CENTER[1]-error_message.surface.get_height()//2))
 
     def _create_current_tiles(self):
-        
-        for ind, pokemon_data in enumerate(self.fetcher.fetch_local()):
+        """ build the tiles of the page that do not have one yet, a few per frame in a job,
+        the tiles are displayed as soon as they are built"""
+
+        if self._tiles_job and not self._tiles_job.done():
+            return
+
+        missing = [(ind, pokemon_data) for ind, pokemon_data in enumerate(self.fetcher.fetch_local()) if not pokemon_data.get('tile')]
+        if missing:
+            self._tiles_job = JobScheduler.submit(self._create_tiles(missing), JobScheduler.URGENT, owner=self)
+
+    def _create_tiles(self, missing):
+
+        for ind, pokemon_data in missing:
             tile = pokemon_data.get('tile')
             if not tile:
                 pokemon_tile = self.bd.create_pokemon_tile(self.cols, self.spacing, pokemon_data['front'], pokemon_data['name'])
-                pos = (ind % self.cols * (pokemon_tile.width + self.spacing) + self.spacing,
-                ind // self.rows * (pokemon_tile.height + self.spacing) + self.spacing)
                  # update the tiles bounding rect to palce the hover rect in the correct position 
-                pokemon_tile.update_rect(*pos)
+                pokemon_tile.update_rect(*self.layout.position(ind))
                 pokemon_data['tile'] = pokemon_tile
+                yield
                 # should append tile to the current tiles
                 # self.choose_level_data.set_field('current_tiles', pokemon_data)
 
@@ -206,6 +245,28 @@ class ChooseLevel(Level):
 
                     
         # print()
+    def _update_hover(self):
+        """ set the hovered tile from the latest mouse position, once per frame. The observers are only
+        notified when the tile under the mouse changes (or it is chosen or unchosen)"""
+
+        if self.fetcher.IS_FETCHING:
+            return
+
+        local_pokemon = self.fetcher.fetch_local()
+        cell = self.layout.cell_at(pygame.mouse.get_pos())
+        tile = local_pokemon[cell].get('tile') if cell is not None and cell < len(local_pokemon) else None
+
+        hover_key = (self.fetcher.page, cell if tile else None, tile in self._fields['chosen'] if tile else False)
+        if hover_key == self._hover_key:
+            return
+        self._hover_key = hover_key
+
+        # chosen tiles are not hovered
+        if tile and tile not in self._fields['chosen']:
+            self.choose_level_data.set_field('hover', tile, unique=True)
+        elif self._fields['hover']:
+            self.choose_level_data.reset_field('hover')
+
     def _display_tiles_with_hover_and_click(self):
         
         # use the fetcher page to either display the current page or the previous page when the current page is empty (while fetching)
@@ -288,7 +349,7 @@ class HomeTownLevel(Level):
     
     """ first stage where the trainer can explore the hometown"""
 
-    def __init__(self, screen, gamestate, renderer: GameMapTSX, player_hit: Hit, trainer: Trainer, data_observable: DataObservable):
+    def __init__(self, screen, gamestate, renderer: GameMapTSX, player_hit: Hit, trainer: Trainer, data_observable: DataObservable, sight_triggers: SightTriggers, npc_scheduler: NPCScheduler, pathfinder: Pathfinder, minimap: Minimap):
         super().__init__(screen, gamestate, renderer)
         
         # set games current trainer instance
@@ -298,47 +359,79 @@ class HomeTownLevel(Level):
 
         # set up the explore observable and attach itself to listen to changes in explore level data
         self.explore_level_data = data_observable
-        self.explore_level_data.attach(self)
+        self.explore_level_data.attach(self, fields=['items', 'timer', 'minimap'])
         
         # camera for focusing the player movement and ysort layer is a group of sprites as explained in environments 
         self.cam, self.ysortlayer = self.renderer.render_environment()
         
-        # set this to the initial group of sprites that the train can collide with
-        self.trainer_collide = self.ysortlayer
-
         #  then add the trainer to the group to be displayed
         self.ysortlayer.add(self.trainer)
+
+        # the trainer can walk over the whole map, and the map is loaded around the trainer
+        width, height = self.renderer.backdrop.size
+        self.trainer.bounds = pygame.Rect(0, 0, width - 10, height - 10)
+        self.renderer.update_environment(self.trainer)
         
         # set up the player hit detetction 
         self.player_hit = player_hit
-        # create a decorator for the layer to filter the layer
+        # create decorators for the layer to filter the layer
         self.positive_layer_filter = DecoratorPositiveFilter(self.ysortlayer)
+        self.negative_layer_filter = DecoratorNegativeFilter(self.ysortlayer)
+
+        # the group of sprites that the trainer can collide with, i.e. everything but the trainer.
+        # this is a live view of the layer, so picked up (killed) items leave it automatically
+        self.trainer_collide = self.negative_layer_filter.get_sprites(Trainer)
+
+        # challengers in the layer, also a live view
+        self.layer_challengers = self.positive_layer_filter.get_sprites(Challenger)
+
+        # the challengers' lines of sight are static triggers, the trainer is only checked against them when it moves
+        self.sight_triggers = sight_triggers
+
+        # challengers are updated depending on how close they are to the trainer, far ones sleep
+        # and their pokemon are only generated when they first wake up
+        self.npc_scheduler = npc_scheduler
+        self.npc_scheduler.on_wake = self._wake_challenger
+
+        # challengers find their paths with the pathfinder, which answers their requests within a budget every frame
+        self.pathfinder = pathfinder
+
+        # minimap, toggled with the 'minimap' field of the explore observable
+        self.minimap = minimap
+
+        for challenger in self.renderer.challengers:
+            self.sight_triggers.register(challenger)
+            self.npc_scheduler.register(challenger)
+
+            # the number of challengers that the trainer must face in order to detect the overall win is incremented
+            self.trainer.chal_remaining += 1
+        self.npc_scheduler.update(self.trainer.rect, self.cam.view, self.trainer)
 
         # get the items by filtering for pickup items
         for item in self.positive_layer_filter.get_sprites(PickupItem):
             self.explore_level_data.set_field('items', item)
 
+            # challengers walk around the items until they are picked up
+            self.pathfinder.block(item.rect)
+
         # control music player 
         self.music = 0 # makes sure the music is only play once
-        self.sound =  pygame.mixer.Sound(r'./assets/sounds/battle-start.ogg')
+        self.sound =  Resources.sound(r'./assets/sounds/battle-start.ogg')
 
         # a timer to control the blink screen when a battle is initiated
-        timer = Timer('delay_blink_screen', Config.FRAMERATE * 3)
+        timer = Timer('delay_blink_screen', 3)
         timer.time = -1 # set to -1 to allow the trainer to move
 
         # notify the observable and all its other observers about the timer
         self.explore_level_data.set_field('timer', timer, unique=True)
 
 
-    async def play_level(self):
-        
-        # create a negative filter for the updated ysort layer
-        self.negative_layer_filter = DecoratorNegativeFilter(self.ysortlayer)
-        
+    def update(self):
+
         self._handle_item()
 
-        # focus the camera on the trainer
-        self.cam.custom_focus(self.screen, self.trainer)
+        # the position before this step, the trainer is drawn between the last two steps
+        self.trainer.previous = self.trainer.rect.topleft
 
         # detect collisions between the trainer and all sprites in the trainer collide list
         self.player_hit.detect_hit(self.trainer, self.trainer_collide)
@@ -352,8 +445,25 @@ class HomeTownLevel(Level):
         self._handle_challengers()
         self._set_challenger()
 
-        # handle toggling the bag on or off
+    async def play_level(self):
+
+        # advance the animated tiles and load the chunks of the map around the trainer
+        AnimationClock.tick(int(GameClock.time * 1000))
+        self.renderer.update_environment(self.trainer)
+
+        # find the paths the challengers asked for, within the budget of the frame
+        self.pathfinder.process()
+
+        # focus the camera on the trainer
+        self.cam.custom_focus(self.screen, self.trainer)
+
+        # show the challengers that have noticed the trainer
+        for challenger in self.sight_triggers.inside:
+            challenger.update(self.screen, self.trainer) 
+
+        # handle toggling the bag and the minimap on or off
         self._handle_toggle_bag()
+        self._handle_minimap()
         self._battle_start()
         
 
@@ -364,7 +474,12 @@ class HomeTownLevel(Level):
             if self.music == 0:
                     self.music +=1
                     self.sound.play()
-            if (self._fields['timer'][0].time // 10) % 2 == 0: 
+
+                    # the trainer is challenged and cannot move until the battle starts, so the battle
+                    # is built in the background while the screen blinks
+                    self.gamestate.preload('battle')
+            # the screen blinks 3 times a second
+            if int(self._fields['timer'][0].time * 6) % 2 == 0: 
                 self.screen.fill(Config.BLACK)
 
         if self._fields['timer'][0].is_finished(): 
@@ -389,11 +504,12 @@ class HomeTownLevel(Level):
             self._fields = new_fields
 
     def _set_challenger(self):
-        # filter the list of challengers by the one who is actually challenging
-        current_chal = list(filter(lambda c: c.challenging, self.positive_layer_filter.get_sprites(Challenger)))
+        # filter the challengers who can see the trainer by the one who is actually challenging
+        current_chal = next((c for c in self.sight_triggers.inside if c.challenging), None)
         
         # update the trainer is challenged, this way the trainer can choose to engage in battle or not
-        self.trainer.is_challenged = current_chal[0] if current_chal else None
+        self.trainer.is_challenged = current_chal
+
     def _handle_item(self):
         """ handle siplaying the items of they are in the bag or not """
         for item in self._fields['items']:
@@ -402,28 +518,44 @@ class HomeTownLevel(Level):
             # check if any items is in the bag
             if self.trainer.bag.has_item(item.name) and item in self.ysortlayer:
                 
-                # if so remove the item from ysort layer
+                # if so remove the item from ysort layer, this also removes it from the
+                # items with which the trainer can collide
                 item.kill()
+                self.pathfinder.unblock(item.rect)
                 
-                # update the items with which the trauner can collide, i.e. remove the sprite picked up
-                self.trainer_collide = self.negative_layer_filter.get_sprites(Trainer)
                 # unset the item in the observable
                 self.explore_level_data.unset_field('items', item)
 
+    def _wake_challenger(self, challenger: Challenger):
+        # each lineup of pokemon is given a mediator to handle a potential battle with the trainer
+        challenger.pokemon.mediator = BattleMediator(self.trainer.pokemon, challenger.pokemon, self.bd)
+        challenger.pathfinder = self.pathfinder
+
     def _handle_challengers(self):
 
-        for challenger in self.renderer.challengers:
-            
-            # update the challenger based on if it is alerted by the trainer
+        # step the challengers that are due this step
+        self.npc_scheduler.update(self.trainer.rect, self.cam.view, self.trainer)
+
+        # the lines of sight of the challengers that walked move with them
+        for challenger in self.npc_scheduler.moved:
+            self.sight_triggers.register(challenger)
+
+        # the triggers only produce events when the trainer enters or leaves a challenger's line of sight
+        for event, challenger in self.sight_triggers.update(self.trainer.rect):
+            challenger.in_sight = event == 'enter'
+            if challenger.in_sight:
+                self.npc_scheduler.wake(challenger)
+
+        for challenger in self.sight_triggers.inside:
+            # update the challengers that have noticed the trainer
             challenger.update(self.screen, self.trainer) 
-            challenger.create_mask()
 
-            # each lineup of pokemon is given a mediator to handle a potential battle with the trainer
-            if not challenger.pokemon.mediator:
-                # increment the number of challengers that the trainer must face in order to detect the overall win
-                self.trainer.chal_remaining += 1
-                challenger.pokemon.mediator = BattleMediator(self.trainer.pokemon, challenger.pokemon, self.bd)
 
+    def _handle_minimap(self):
+        # the minimap shows the trainer, the challengers that have not been defeated and the items left
+        if self._fields['minimap']:
+            challengers = [challenger for challenger in self.renderer.challengers if not challenger.defeated]
+            self.minimap.draw(self.screen, self.trainer, challengers, self._fields['items'])
 
     def _handle_toggle_bag(self):
         # the bag can be toggled to show all the items collected
@@ -437,15 +569,27 @@ class HomeTownLevel(Level):
                 image = pygame.transform.scale(item.image, (w, h))
                 self.screen.blit(image, (45, index*h + h))
  
-# class LoadingLevel(Level):
-#     """ Intermediate stage of the game, to display when fetcher is loading data"""
-#     def __init__(self, screen, gamestate, renderer: GameMapBackDrop, fetcher: Fetcher):
-#         super().__init__(screen, gamestate, renderer)
-#         self.image, self.pos =  self.renderer.render_environment()
-#         self.fetcher = fetcher
-#     async def play_level(self):
-#         self.screen.blit(self.image, self.pos)
-#         self.gamestate.change_state('choose')
+class LoadingLevel(Level):
+    """ Intermediate stage of the game, displayed while the level of the target state is being built
+    in the background (see LevelPreloader). Once it is ready it takes the place of the loading level"""
+    def __init__(self, screen, gamestate, renderer: GameMapBackDrop, preloader: LevelPreloader, target: str):
+        super().__init__(screen, gamestate, renderer)
+        self.image, self.pos =  self.renderer.render_environment()
+        self.preloader = preloader
+        self.target = target
+
+    async def play_level(self):
+        self.screen.blit(self.image, self.pos)
+
+        # the jobs build the level at the end of each frame
+        if self.preloader.pending(self.target):
+            return
+
+        if self.gamestate.current_state == self.target:
+            # the loading level is standing in for the target level, which is swapped in
+            self.gamestate.gameplayer.replace_level(self.target)
+        else:
+            self.gamestate.change_state(self.target)
 
 class ControlsLevel(Level):
     """ display the controls page"""
@@ -494,32 +638,64 @@ class ControlsLevel(Level):
             fetcher_prev.display(self.screen, (0, 0))
 
 class BattleLevel(Level):
+    """ battle between the trainer and the challenger that is challenging them. The level is reused for
+    every battle (see BattleLevelCreator), start sets it up for the next one"""
 
     def __init__(self, screen, gamestate, renderer, trainer_mediator):
         super().__init__(screen, gamestate, renderer)
         self.image, self.pos =  self.renderer.render_environment()
         self.oak = ProfessorOak()
 
-        # define the trainer_mediator, and the challenger that is currently challenging the trainer
+        # define the trainer_mediator, the challenger and the mediator are set when a battle starts
         self.trainer_mediator = trainer_mediator
+        self.challenger = None
+        self.mediator = None
+        self.finished = True # true when there is no battle in progress and the level can be reused
+
+        self._music = 0 # ontrol music to play oce
+        self.sound = Resources.sound(r'./assets/sounds/battle-repeat.ogg')
+
+    def start(self):
+        """ set up the battle with the challenger that is currently challenging the trainer"""
+        self.finished = False
+        self._music = 0
+        JobScheduler.cancel(self) # fighters of the last battle that were not initialized
+
         self.challenger = self.trainer_mediator.notify('is_challenged')
         
         # set the mediator of the level and trainer pokemon so they share the same instance of the battle mediator
         self.mediator = self.challenger.pokemon.mediator 
+        self.mediator.start() # the rules of the battle start from the pokemon as they are now
 
         # set the trainer pokemon mediator to the current mediator
         self.trainer_mediator.notify_pokemon('set_mediator', self.challenger.pokemon.mediator )
         
-        # initialize the pokemon in trainer and challenger lineup
-        for pokemon in self.trainer_mediator.notify_pokemon('get_all'):
+        # the trainer's pokemon may still be loading, they are needed now
+        lineup = self.trainer_mediator.notify_pokemon('get_all')
+        JobScheduler.finish(lineup)
+
+        # initialize the pokemon in trainer and challenger lineup, the leads are needed for the first frame
+        # and the others are only sent out after a pokemon faints, so they are initialized in a job
+        fighters = [*lineup, *self.challenger.pokemon]
+        leads = [lineup.get_current(), self.challenger.pokemon.get_current()]
+        for pokemon in leads:
             pokemon.initialize_for_fight(self.bd)
-
-        for pokemon in self.challenger.pokemon:
+        JobScheduler.submit(self._initialize_fighters([pokemon for pokemon in fighters if pokemon not in leads]), JobScheduler.URGENT, owner=self)
+        return self
+       
+    def finish(self):
+        """ end the battle so the level can be reused. The pooled level outlives the battle, so it lets go of
+        the challenger and the mediator, which hold the challenger's lineup and the pokemon surfaces"""
+        self.finished = True
+        self.challenger = None
+        self.mediator = None
+        JobScheduler.cancel(self) # fighters that were never sent out
+
+    def _initialize_fighters(self, fighters):
+        for pokemon in fighters:
             pokemon.initialize_for_fight(self.bd)
+            yield
 
-        self._music = 0 # ontrol music to play oce
-        self.sound = pygame.mixer.Sound(r'./assets/sounds/battle-repeat.ogg')
-       
     async def play_level(self):
 
         self.screen.blit(self.image, self.pos)
@@ -547,6 +723,8 @@ class BattleLevel(Level):
                 self.oak.current_state = self.renderer.lose_state(self.oak)
                 self.gamestate.change_state('welcome')
 
+            self.finish()
+
 
         self._overall_win()
 
@@ -0,0 +1,43 @@
+from concurrent.futures import Future
+from gameplay.jobs import JobScheduler
+
+
+class LevelPreloader:
+    """ builds the level the player is likely to go to next in the background, so the transition only
+    has to swap it in (the hometown while the trainer chooses their pokemon, a battle while the screen blinks).
+
+    A build is a generator job (see AbstractCreator.preload) run by the JobScheduler in the time left over
+    at the end of each frame, its last slice creates the level. A level that is still being built when the
+    player gets to it is shown as the loading level until it is ready"""
+
+    def __init__(self):
+        self._builds = {} # state -> Future of the level
+
+    def request(self, state: str, build) -> Future:
+        """ build the level of the state in the background, unless it is already being built"""
+        if state not in self._builds:
+            self._builds[state] = JobScheduler.submit(build, JobScheduler.BACKGROUND, owner=self)
+        else:
+            # the build is not needed, it is only made to be run as a job
+            build.close()
+        return self._builds[state]
+
+    def pending(self, state: str) -> bool:
+        """ true while the level of the state is being built"""
+        return state in self._builds and not self._builds[state].done()
+
+    def take(self, state: str):
+        """ the built level of the state (None if it was not built or the build failed),
+        it is handed out once and the next request builds a new one"""
+        if state not in self._builds or self.pending(state):
+            return None
+        build = self._builds.pop(state)
+        if build.cancelled() or build.exception() is not None:
+            # the level is created the usual way instead
+            return None
+        return build.result()
+
+    def cancel(self):
+        """ drop every build, e.g. the levels of a game that is reset"""
+        JobScheduler.cancel(self)
+        self._builds.clear()
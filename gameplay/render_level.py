@@ -71,6 +71,10 @@ class ExploreLevelRenderer(LevelRenderer):
         self.ysortlayer = ysortlayer
         self.item_creator = item_creator
 
+    def update_environment(self, focus):
+        """ let the environment load the parts of the map around the focus (the trainer)"""
+        self.backdrop.update(focus.rect)
+
     
 class HomeTownRenderer(ExploreLevelRenderer):
     """ Render and set up Hometown level"""
@@ -105,8 +109,9 @@ class HomeTownRenderer(ExploreLevelRenderer):
         # add them to the y sort layer 
         self.hometown_ysort.add(*items, *self.challengers)
 
-        # use the cam addgroup to keep track of the groups added
+        # use the cam addgroup to keep track of the groups added, the camera can move over the whole map
         self.camera.add_group(hometown_base_grass, self.hometown_ysort)
+        self.camera.set_bounds(*hometown.size)
 
         return self.camera, self.hometown_ysort 
     
@@ -128,7 +133,13 @@ class HomeTownRenderer(ExploreLevelRenderer):
             'left': ExploreSprite.get_placement(-9, 9), 
             'right': ExploreSprite.get_placement(3, 3) 
         }
-        return Challenger.inititialize_challengers(challenger_data)
+
+        # { facing_direction: [(x, y), ...] } points the challenger patrols between, starting from its own position
+        challenger_routes = {
+            'down': [ExploreSprite.get_placement(-3, 5), ExploreSprite.get_placement(-3, 8)],
+            'right': [ExploreSprite.get_placement(3, 3), ExploreSprite.get_placement(6, 3)]
+        }
+        return Challenger.inititialize_challengers(challenger_data, challenger_routes)
 
 class LoadingRenderer(LevelRenderer):
     """ render loading backdrop"""
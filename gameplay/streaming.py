@@ -0,0 +1,225 @@
+""" streaming of large maps
+
+The map is split into square chunks of Config.CHUNK_TILES tiles. Only the chunks around the
+trainer are loaded:
+    - chunks of the y sorted layers are loaded as Tile sprites, since the trainer collides with them
+      and they are sorted with the other sprites
+    - chunks of the other (base) layers are baked, i.e. all their tiles are drawn once on a single
+      surface which is shown by one sprite
+
+Chunks that are on screen are loaded straight away, the others are queued by distance and baked
+in small steps every frame (Config.CHUNK_BAKE_BUDGET_MS), so walking never waits on a whole ring of
+chunks. Chunks further than Config.CHUNK_UNLOAD_RADIUS are unloaded and the baked surfaces are kept
+under Config.CHUNK_MEMORY_BUDGET, so the memory used does not depend on the size of the map.
+Everything is in world (map) coordinates, the camera and hit detection are not aware of chunks.
+
+Animated tiles in baked chunks are drawn again when the animation clock changes their frame, only
+those cells are drawn (with the tiles of the layers under and over them), not the whole chunk.
+"""
+import time
+import pygame
+from config.config import Config
+from sprites.sprites import Tile
+from gameplay.environments import GameEnvironment, FlyweightTileFactory, YSortLayer, Layer, AnimatedFlyweightTile, AnimationClock
+from gameplay.mapformat import load_map
+from typing import Tuple
+
+
+class ChunkSprite(pygame.sprite.Sprite):
+    """ baked surface of the base layers of a chunk"""
+
+    def __init__(self, image: pygame.Surface, pos):
+        super().__init__()
+        self.image = image
+        self.rect = image.get_rect(topleft=pos)
+
+
+class Chunk:
+    """ state of a loaded chunk, the baked sprites and/or the tiles added to the y sort layer"""
+
+    __slots__ = ('key', 'sprites', 'tiles', 'size', 'animated')
+
+    def __init__(self, key):
+        self.key = key
+        self.sprites = [] # (layer group, baked sprite), one per group of base layers
+        self.tiles = []
+        self.size = 0 # bytes of the baked surfaces
+        self.animated = [] # (baked surface, rect in the surface, flyweights of the cell from the bottom layer up) of the animated cells
+
+    def redraw(self, changed: set):
+        """ draw the animated cells whose frame has changed on the baked surfaces"""
+        for surface, rect, stack in self.animated:
+            if any(flyweight in changed for flyweight in stack):
+                surface.fill((0, 0, 0, 0), rect)
+                for flyweight in stack:
+                    surface.blit(flyweight.image, rect)
+
+
+class ChunkedWorld(GameEnvironment):
+    """ map environment that loads the chunks of a tmx (or compiled) map around a focus rect.
+    Has the same create_env interface as GameMapTSX, the layer groups passed to it are filled
+    when update is called"""
+
+    def __init__(self, filename):
+        super().__init__(filename)
+        self.flyweight_factory = FlyweightTileFactory.for_map(filename)
+        self.map = load_map(filename)
+
+        self.chunk_w = Config.CHUNK_TILES * Config.TILE_X_SPACING
+        self.chunk_h = Config.CHUNK_TILES * Config.TILE_Y_SPACING
+        self.chunks_x = -(-self.map.width // Config.CHUNK_TILES)
+        self.chunks_y = -(-self.map.height // Config.CHUNK_TILES)
+
+        # chunks this close to the focus can be on screen, so they are never left in the queue
+        self.visible = max(-(-Config.SCREEN_WIDTH // (2 * self.chunk_w)), -(-Config.SCREEN_HEIGHT // (2 * self.chunk_h)))
+
+        # (map layers, layer group) for each call of create_env
+        self._baked_layers = []
+        self._sprite_layers = []
+
+        self.loaded = {}  # (chunk x, chunk y) -> Chunk, in the order the chunks were last needed
+        self._queue = []  # chunks waiting to be baked, nearest first
+        self._center = None
+        self.memory = 0   # bytes of baked surfaces currently loaded
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """ width and height of the map in pixels"""
+        return self.map.width * Config.TILE_X_SPACING, self.map.height * Config.TILE_Y_SPACING
+
+    def create_env(self, layers: list, layer_group: Layer) -> Layer:
+        """ register the map layers to stream into a layer group, nothing is loaded until update is called"""
+        map_layers = [layer for layer in self.map.visible_layers if hasattr(layer, 'data') and layer.name in layers]
+
+        # y sorted layers keep their tiles as sprites, the rest can be baked
+        if isinstance(layer_group, YSortLayer):
+            self._sprite_layers.append((map_layers, layer_group))
+        else:
+            self._baked_layers.append((map_layers, layer_group))
+        return layer_group
+
+    def chunk_of(self, point) -> Tuple[int, int]:
+        return int(point[0] // self.chunk_w), int(point[1] // self.chunk_h)
+
+    def _chunks_around(self, center, radius):
+        cx, cy = center
+        return [(x, y) for y in range(max(cy - radius, 0), min(cy + radius + 1, self.chunks_y))
+                       for x in range(max(cx - radius, 0), min(cx + radius + 1, self.chunks_x))]
+
+    @staticmethod
+    def _distance(a, b):
+        return max(abs(a[0] - b[0]), abs(a[1] - b[1]))
+
+    def update(self, focus: pygame.Rect, budget_ms: float = Config.CHUNK_BAKE_BUDGET_MS):
+        """ load the chunks around the focus rect, unload far ones and bake queued chunks within the budget"""
+
+        center = self.chunk_of(focus.center)
+        if center != self._center:
+            self._center = center
+
+            # unload the chunks that are now too far away
+            for key in [key for key in self.loaded if self._distance(key, center) > Config.CHUNK_UNLOAD_RADIUS]:
+                self.unload(key)
+
+            # the chunks on screen must be loaded now, the rest are queued nearest first
+            wanted = sorted(self._chunks_around(center, Config.CHUNK_LOAD_RADIUS), key=lambda key: self._distance(key, center))
+            self._queue = []
+            for key in wanted:
+                if key in self.loaded:
+                    # keep the order of the loaded chunks as the order they were last needed in
+                    self.loaded[key] = self.loaded.pop(key)
+                elif self._distance(key, center) <= self.visible:
+                    self.load(key)
+                else:
+                    self._queue.append(key)
+
+        self.load_pending(budget_ms)
+
+        # draw the animated cells of the baked chunks whose frame changed on this tick
+        if AnimationClock.changed:
+            for chunk in self.loaded.values():
+                if chunk.animated:
+                    chunk.redraw(AnimationClock.changed)
+
+    def load_pending(self, budget_ms: float) -> int:
+        """ load queued chunks until the time budget is used up, returns the number of chunks loaded"""
+        end = time.perf_counter() + budget_ms / 1000
+        count = 0
+
+        # always load at least one chunk so the queue can not stall on a slow machine
+        while self._queue and (count == 0 or time.perf_counter() < end):
+            key = self._queue.pop(0)
+            if key not in self.loaded:
+                self.load(key)
+                count += 1
+        return count
+
+    def load(self, key):
+        """ load a chunk into the layer groups"""
+        chunk = Chunk(key)
+        left, top = key[0] * Config.CHUNK_TILES, key[1] * Config.CHUNK_TILES
+        right, bottom = min(left + Config.CHUNK_TILES, self.map.width), min(top + Config.CHUNK_TILES, self.map.height)
+
+        # base layers are drawn on one surface per chunk
+        for map_layers, layer_group in self._baked_layers:
+            stacks = {} # cell -> flyweights from the bottom layer up
+            for layer in map_layers:
+                for x, y, flyweight in self._cells(layer, left, top, right, bottom):
+                    stacks.setdefault((x, y), []).append(flyweight)
+
+            if stacks:
+                surface = pygame.Surface(((right - left) * Config.TILE_X_SPACING, (bottom - top) * Config.TILE_Y_SPACING), pygame.SRCALPHA)
+                for (x, y), stack in stacks.items():
+                    rect = pygame.Rect((x - left) * Config.TILE_X_SPACING, (y - top) * Config.TILE_Y_SPACING, Config.TILE_X_SPACING, Config.TILE_Y_SPACING)
+                    for flyweight in stack:
+                        surface.blit(flyweight.image, rect)
+                    if any(isinstance(flyweight, AnimatedFlyweightTile) for flyweight in stack):
+                        chunk.animated.append((surface, rect, stack))
+
+                sprite = ChunkSprite(surface, (left * Config.TILE_X_SPACING, top * Config.TILE_Y_SPACING))
+                chunk.size += surface.get_pitch() * surface.get_height()
+                layer_group.add(sprite)
+                chunk.sprites.append((layer_group, sprite))
+
+        # y sorted layers keep a tile sprite per cell
+        for map_layers, layer_group in self._sprite_layers:
+            tiles = [Tile((x * Config.TILE_X_SPACING, y * Config.TILE_Y_SPACING), flyweight)
+                     for layer in map_layers for x, y, flyweight in self._cells(layer, left, top, right, bottom)]
+            layer_group.add(*tiles)
+            chunk.tiles.append((layer_group, tiles))
+
+        self.loaded[key] = chunk
+        self.memory += chunk.size
+        self._enforce_budget()
+
+    def unload(self, key):
+        chunk = self.loaded.pop(key)
+        for layer_group, sprite in chunk.sprites:
+            layer_group.remove(sprite)
+        for layer_group, tiles in chunk.tiles:
+            layer_group.remove(*tiles)
+        self.memory -= chunk.size
+
+    def _cells(self, layer, left, top, right, bottom):
+        """ yields x, y, flyweight for the cells of a layer in a chunk"""
+        for y in range(top, bottom):
+            row = layer.data[y]
+            for x in range(left, right):
+                gid = row[x]
+                if not gid:
+                    continue
+                flyweight = self.flyweight_factory.from_map(self.map, gid)
+                if flyweight is not None:
+                    yield x, y, flyweight
+
+    def _enforce_budget(self):
+        """ unload the least recently needed chunks outside the screen until the budget is met"""
+        for key in list(self.loaded):
+            if self.memory <= Config.CHUNK_MEMORY_BUDGET:
+                break
+            if self._center is None or self._distance(key, self._center) > self.visible:
+                self.unload(key)
+
+    def report(self) -> dict:
+        """ loaded and queued chunks and the bytes of baked surfaces"""
+        return {'loaded': len(self.loaded), 'queued': len(self._queue), 'memory': self.memory}
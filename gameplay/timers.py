@@ -1,4 +1,8 @@
+import asyncio
+import heapq
+import itertools
 from abc import ABC, abstractmethod
+from gameplay.clock import GameClock
 
 
 class AbstractTimers(ABC):
@@ -24,7 +28,7 @@ class AbstractTimer(ABC):
         
     @abstractmethod
     def wait():
-        """ wait decrements the timer until it is 0"""
+        """ wait counts the timer down until it is 0"""
         pass
 
     @abstractmethod
@@ -37,29 +41,120 @@ class AbstractTimer(ABC):
         """ checks if a time is"""
         pass
 
+class TimerHandle:
+    """ a callback scheduled in the TimerScheduler"""
+    __slots__ = ('deadline', 'callback', 'order', 'cancelled')
+
+    def __init__(self, deadline, callback, order):
+        self.deadline = deadline
+        self.callback = callback
+        self.order = order # the heap entry of the handle, older entries are stale
+        self.cancelled = False
+
+    def cancel(self):
+        """ the callback will not be called"""
+        if not self.cancelled:
+            self.cancelled = True
+            TimerScheduler._stale += 1
+
+    def reschedule(self, delay: float):
+        """ move the deadline to delay seconds from now"""
+        TimerScheduler._push(self, TimerScheduler.now() + delay)
+
+    def remaining(self) -> float:
+        return max(self.deadline - TimerScheduler.now(), 0)
+
+
+class TimerScheduler:
+    """ central scheduler for the timers of the game.
+
+    Deadlines are in the simulated time of the GameClock (monotonic, it only moves forward and follows
+    the time scale). They are kept in a heap, so tick only looks at the timers that are due and a timer
+    that is waiting costs nothing per frame; scheduling, firing and rescheduling are O(log n).
+    Cancelled and rescheduled entries are left in the heap and skipped when they come up"""
+
+    _heap = [] # (deadline, order, handle)
+    _order = itertools.count()
+    _stale = 0 # entries in the heap that will be skipped
+
+    @staticmethod
+    def now() -> float:
+        return GameClock.time
+
+    @classmethod
+    def schedule(cls, delay: float, callback) -> TimerHandle:
+        """ call callback in delay seconds"""
+        handle = TimerHandle(0, callback, None)
+        cls._push(handle, cls.now() + delay)
+        return handle
+
+    @classmethod
+    def sleep(cls, delay: float) -> asyncio.Future:
+        """ awaitable that is resolved in delay seconds (of simulated time)"""
+        future = asyncio.get_running_loop().create_future()
+        cls.schedule(delay, lambda: future.done() or future.set_result(None))
+        return future
+
+    @classmethod
+    def _push(cls, handle: TimerHandle, deadline: float):
+        if handle.order is not None and not handle.cancelled:
+            cls._stale += 1 # the old entry
+        handle.deadline = deadline
+        handle.order = next(cls._order)
+        handle.cancelled = False
+        heapq.heappush(cls._heap, (deadline, handle.order, handle))
+
+    @classmethod
+    def tick(cls, now: float = None) -> int:
+        """ fire the timers that are due, returns how many fired"""
+        now = cls.now() if now is None else now
+        fired = 0
+        while cls._heap and cls._heap[0][0] <= now:
+            _, order, handle = heapq.heappop(cls._heap)
+            if handle.cancelled or handle.order != order:
+                cls._stale -= 1
+                continue
+            handle.cancelled = True # fired, cancelling it now does nothing
+            handle.callback()
+            fired += 1
+
+        # drop the stale entries when they make up most of the heap
+        if cls._stale > 64 and cls._stale * 2 > len(cls._heap):
+            cls._heap[:] = [entry for entry in cls._heap if not entry[2].cancelled and entry[2].order == entry[1]]
+            heapq.heapify(cls._heap)
+            cls._stale = 0
+        return fired
+
+    @classmethod
+    def pending(cls) -> int:
+        return len(cls._heap) - cls._stale
+
+    @classmethod
+    def clear(cls):
+        cls._heap.clear()
+        cls._stale = 0
+
+
 class Timers(AbstractTimers):
-    """ collection of timers """
+    """ collection of timers, looked up by name """
     def __init__(self):
-        self.timers = []
+        self.timers = {}
       
 
     def __getitem__(self, timer_type: str):
         """ Redefine indexing the list,similar to a dictionary but it cannot be updated"""
-        for i in self.timers:
-            if i.timer_type == timer_type:
-                return i
-        return
+        return self.timers.get(timer_type)
         
     def add(self, timer):
         """ define add method for appending to the group of timers"""
 
         assert isinstance(timer, AbstractTimer)
-        if timer not in self.timers:
-            self.timers.append(timer)
+        if timer.timer_type not in self.timers:
+            self.timers[timer.timer_type] = timer
 
     def remove(self, timer: AbstractTimer):
         """ remove timer from a group of timers"""
-        self.timers.remove(timer)
+        self.timers.pop(timer.timer_type).cancel()
 
 
 
@@ -67,27 +162,63 @@ class Timers(AbstractTimers):
 
 class Timer(AbstractTimer):
 
-    """Timer class to delay code"""
+    """Timer class to delay code, times are in seconds of simulated time.
 
-    def __init__(self, timer_type, time):
+    The timer counts down in the TimerScheduler once it is started, by start or the first wait
+    (wait can still be called every frame, it does nothing while the timer runs). time is the time left,
+    0 when finished, it can be set (e.g. to -1 to mark the timer unused) which stops the timer"""
+
+    def __init__(self, timer_type, time: float, callback=None):
         self.base_time = time
         self.timer_type = timer_type
-        self.time = time
+        self.callback = callback # called when the timer finishes
+        self._time = time
+        self._handle = None
 
     def __eq__(self, other):
         """redefine testing equality of 2 timers"""
         assert isinstance(other, Timer)
         return self.timer_type == other.timer_type
 
+    @property
+    def time(self) -> float:
+        if self._handle:
+            return self._handle.remaining()
+        return self._time
+
+    @time.setter
+    def time(self, time: float):
+        self.cancel()
+        self._time = time
+
+    def start(self):
+        """ start counting down the time left"""
+        if not self._handle and self._time > 0:
+            # when animations are skipped the delay is over at the next tick
+            delay = 0 if GameClock.skip_animations else self._time
+            self._handle = TimerScheduler.schedule(delay, self._finish)
+
     def wait(self):
-        """ wait decrements the timer until it is 0"""
-        if self.time > 0:
-            self.time -= 1
+        """ starts the timer if it is not running yet"""
+        self.start()
+
+    def _finish(self):
+        self._handle = None
+        self._time = 0
+        if self.callback:
+            self.callback()
+
+    def cancel(self):
+        """ stop the timer, the time left is kept"""
+        if self._handle:
+            self._time = self._handle.remaining()
+            self._handle.cancel()
+            self._handle = None
 
     def reset(self):
-        """reset the timer to it's original value"""
+        """reset the timer to it's original value, it starts again on start or wait"""
         self.time = self.base_time
         
     def is_finished(self):
         """ checks if a time is"""
-        return self.time == 0
\ No newline at end of file
+        return self.time == 0
@@ -0,0 +1,97 @@
+import pygame
+from config.config import Config
+
+
+class SpatialIndex:
+    """ uniform grid of cells used to find the items whose rect covers a point
+    without checking every item"""
+
+    def __init__(self, cell_size: int):
+        self.cell_size = cell_size
+        self._cells = {} # (cell x, cell y) -> {item: rect}
+        self._items = {} # item -> list of the cells it is in
+
+    def cell_of(self, point) -> tuple:
+        """ the cell containing a point"""
+        return int(point[0] // self.cell_size), int(point[1] // self.cell_size)
+
+    def _cells_for(self, rect: pygame.Rect):
+        left, top = self.cell_of(rect.topleft)
+        right, bottom = self.cell_of((rect.right - 1, rect.bottom - 1))
+        return [(x, y) for x in range(left, right + 1) for y in range(top, bottom + 1)]
+
+    def insert(self, item, rect: pygame.Rect):
+        """ add an item to every cell covered by its rect"""
+        if item in self._items:
+            self.remove(item)
+        cells = self._cells_for(rect)
+        for cell in cells:
+            self._cells.setdefault(cell, {})[item] = rect
+        self._items[item] = cells
+
+    def remove(self, item):
+        for cell in self._items.pop(item, ()):
+            del self._cells[cell][item]
+
+    def at(self, cell) -> dict:
+        """ items and their rects in a cell"""
+        return self._cells.get(cell, {})
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+
+class SightTriggers:
+    """ challengers' lines of sight as static trigger rects in a spatial index.
+
+    The triggers are only evaluated when the trainer's rect has changed. The cell of the trainer
+    decides which triggers are candidates (they are only looked up again when the trainer changes cell)
+    and only those are tested. Entering and leaving a trigger produce 'enter' and 'leave' events,
+    so while the trainer stands still the cost does not depend on the number of challengers."""
+
+    def __init__(self, cell_size: int = Config.TRIGGER_CELL_SIZE):
+        self._index = SpatialIndex(cell_size)
+        self._last_rect = None
+        self._cell = None
+        self._candidates = {}
+
+        # challengers whose trigger currently contains the trainer
+        self.inside = {}
+
+    def register(self, challenger):
+        """ add (or move) the trigger of a challenger"""
+        self._index.insert(challenger, challenger.sight_rect())
+
+        # force the triggers to be evaluated again on the next update
+        self._last_rect = self._cell = None
+
+    def unregister(self, challenger):
+        self._index.remove(challenger)
+        self._last_rect = self._cell = None
+
+    def update(self, rect: pygame.Rect) -> list:
+        """ evaluate the triggers for the trainer's rect, returns a list of (event, challenger) tuples"""
+
+        if rect == self._last_rect:
+            return []
+        self._last_rect = pygame.Rect(rect)
+
+        # the trainer is in the line of sight if its center is in the trigger
+        point = rect.center
+        cell = self._index.cell_of(point)
+        if cell != self._cell:
+            self._cell = cell
+            self._candidates = self._index.at(cell)
+
+        inside = {challenger: None for challenger, trigger in self._candidates.items() if trigger.collidepoint(point)}
+
+        events = [('leave', challenger) for challenger in self.inside if challenger not in inside]
+        events += [('enter', challenger) for challenger in inside if challenger not in self.inside]
+        self.inside = inside
+        return events
+
+    def __len__(self):
+        return len(self._index)
@@ -71,8 +71,8 @@ class GUIBuilder:
     def add_text(self,  text="", font='default', font_size='med', bold=False, font_color = Config.BLACK, offset=(0, 0)):
         """ adding text using the correct font as defined in config"""
         font = Config.make_fonts(font)[font_size]
-        if bold: 
-            font.set_bold(True)
+        # the fonts are shared, so bold is set for every text
+        font.set_bold(bold)
         text_surface = font.render(text, True, font_color)
         place_at = (self.surface.get_rect().centerx - offset[0],self.surface.get_rect().centery - offset[1] )
         text_rect = text_surface.get_rect(center=place_at)
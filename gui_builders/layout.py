@@ -0,0 +1,44 @@
+import pygame
+from config.config import Config
+
+
+class GridLayout:
+    """ fixed grid of equally sized cells with the same spacing around each cell.
+
+    The cell under a point is found with arithmetic instead of testing the rect of every cell,
+    cells are numbered row by row from the top left"""
+
+    def __init__(self, cols: int, rows: int, cell_width: int, cell_height: int, spacing: float):
+        self.cols = cols
+        self.rows = rows
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.spacing = spacing
+
+    @classmethod
+    def for_tiles(cls, cols: int, rows: int):
+        """ grid of the pokemon tiles on the choose screen, the tiles are as big as the screen allows
+        (see GUIDirector.create_pokemon_tile)"""
+        spacing = (Config.SCREEN_WIDTH - (Config.SCREEN_WIDTH / cols - 20) * cols) / cols - cols
+        cell_width = int(Config.SCREEN_WIDTH / cols - spacing - 5)
+        cell_height = int(Config.SCREEN_HEIGHT / rows - spacing - 5)
+        return cls(cols, rows, cell_width, cell_height, spacing)
+
+    def position(self, index: int) -> tuple:
+        """ top left of the cell"""
+        return (index % self.cols * (self.cell_width + self.spacing) + self.spacing,
+                index // self.cols * (self.cell_height + self.spacing) + self.spacing)
+
+    def rect(self, index: int) -> pygame.Rect:
+        return pygame.Rect(*self.position(index), self.cell_width, self.cell_height)
+
+    def cell_at(self, pos) -> int:
+        """ index of the cell under pos, None if pos is between cells or outside the grid"""
+        col = int((pos[0] - self.spacing) // (self.cell_width + self.spacing))
+        row = int((pos[1] - self.spacing) // (self.cell_height + self.spacing))
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return None
+
+        index = row * self.cols + col
+        # the spacing is not a whole number of pixels, so the one candidate is checked against its rect
+        return index if self.rect(index).collidepoint(pos) else None
@@ -2,6 +2,7 @@
 from config.config import Config
 import pygame
 from sprites.sprites import ExploreSprite
+from config.resources import Resources
 
 
 class PickupItem(ExploreSprite):
@@ -10,8 +11,7 @@ class PickupItem(ExploreSprite):
         super().__init__()
         
         self.name = name
-        self.image = pygame.image.load(image_path)
-        self.image = pygame.transform.scale(self.image, scale)
+        self.image = pygame.transform.scale(Resources.image(image_path, alpha=False), scale)
         self.rect = self.image.get_rect(center=(pos))
 
 class ItemBuilder:
@@ -12,6 +12,10 @@ if not Config.IS_WEB:
 from config.gamestate import GameState, GamePlayer
 from gameplay.levels import LevelStore , HandlerCreator
 from gui_builders.gui import GUIBuilder, GUIDirector
+from gameplay.clock import GameClock
+from gameplay.pacer import FramePacer
+from gameplay.jobs import JobScheduler
+from gameplay.timers import TimerScheduler
 
 
 # Top level imports for pygbag version
@@ -35,77 +39,152 @@ import platform
 
 # warnings.filterwarnings("ignore") #suppress libpng warning
 class MainGameLoop:
-
-    # starts pygame and initiates all subparts, like rendering images, playing sound
-    pygame.init()
-
-
-    # create display surface, set window size
-    __screen = pygame.display.set_mode((Config.SCREEN_WIDTH, Config.SCREEN_HEIGHT))
-
-    icon = pygame.image.load(r'./assets/images/poke-icon.png')
-    pygame.display.set_icon(icon)
-    
-
-    # set the title of the winow
-    pygame.display.set_caption('Pokemon Battle Arena!')
-
-    __clock = pygame.time.Clock() # responsible for handling framerate of the game
-    
-    # instantiate the GAME STATE Singleton which is used to maintain state of the game
-    # throughout all the stages of the game
-    _GAME_STATE = GameState()
-    _GAME_STATE.screen = __screen # give gamestate access to the screen variable
-    _GAME_PLAY = GamePlayer(_GAME_STATE)
-
-    _GAME_PLAY.render_level() # render the current level (gamestate initial stte is always set to the welcome page)
-
-    # create an instance of the trainer
-    LevelStore.trainer_mediator.notify_set(LevelStore)
-
-    # set up the event handlers
-    event_handler = HandlerCreator.create_handlers(_GAME_STATE, _GAME_PLAY)
-    _AUDIO_ERROR = False
-
-    try:
-        pygame.mixer.init()
-    except Exception as e:
-        _AUDIO_ERROR = True
-    _error_builder = GUIDirector(GUIBuilder())
-
-    async def play(cls):
-        while cls._GAME_STATE._running:
-            for event in pygame.event.get():
-                
-                # check if the the x is in top corner is clicked or if if the escape button is pressed only if on pc
-                if not Config.IS_WEB:
-                    if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE): 
-                        
-                        # then we close the game using the game state manager
-                        cls._GAME_STATE._running = False
-
-                # check each handler for every game state. using the chain off res
-                # only the corresponding handler will handle key events for the given the state
-                for state in cls._GAME_STATE._states:
-                   cls.event_handler.handle(state, event)
+    """ sets up pygame and the game (setup) and runs the main loop (play)"""
+
+    _set_up = False
+
+    @classmethod
+    def setup(cls):
+        """ start pygame and the game, in headless mode (Config.HEADLESS) SDL's dummy video and audio
+        drivers are used, so no window is opened and no sound is played but every level works the same"""
+        if cls._set_up:
+            return
+        cls._set_up = True
+
+        if Config.HEADLESS:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+        # starts pygame and initiates all subparts, like rendering images, playing sound
+        pygame.init()
+
+
+        # create display surface, set window size
+        cls.__screen = pygame.display.set_mode((Config.SCREEN_WIDTH, Config.SCREEN_HEIGHT))
+
+        cls.icon = pygame.image.load(r'./assets/images/poke-icon.png')
+        pygame.display.set_icon(cls.icon)
+        
+
+        # set the title of the winow
+        pygame.display.set_caption('Pokemon Battle Arena!')
+
+        # responsible for handling framerate of the game, waits on the event loop (unless it is uncapped)
+        cls.__pacer = FramePacer(Config.FRAMERATE, uncapped=Config.UNCAPPED)
+        
+        # instantiate the GAME STATE Singleton which is used to maintain state of the game
+        # throughout all the stages of the game
+        cls._GAME_STATE = GameState()
+        cls._GAME_STATE.screen = cls.__screen # give gamestate access to the screen variable
+        cls._GAME_PLAY = GamePlayer(cls._GAME_STATE)
+
+        cls._GAME_PLAY.render_level() # render the current level (gamestate initial stte is always set to the welcome page)
+
+        # create an instance of the trainer
+        LevelStore.trainer_mediator.notify_set(LevelStore)
+
+        # set up the event handlers, pygame only queues the events they handle
+        cls.event_handler = HandlerCreator.create_handlers(cls._GAME_STATE, cls._GAME_PLAY)
+        cls.event_handler.allow_events(pygame.QUIT)
+        cls._AUDIO_ERROR = False
+
+        try:
+            pygame.mixer.init()
+        except Exception as e:
+            cls._AUDIO_ERROR = True
+        cls._error_builder = GUIDirector(GUIBuilder())
+        cls._stats_font = Config.make_fonts()['small']
+
+    @classmethod
+    def run(cls, frames: int = None, until=None) -> int:
+        """ set up the game and play it, see play"""
+        cls.setup()
+        return asyncio.run(cls().play(frames, until))
+
+    async def play(cls, frames: int = None, until=None) -> int:
+        """ play until the game is closed, or for a number of frames or until the condition until()
+        is true (e.g. for headless runs), returns the number of frames played"""
+        played = 0
+        frame_seconds = 0 # real time of the last frame
+        while cls._GAME_STATE._running and (frames is None or played < frames) and not (until and until()):
+            # the observers of the level data are notified once per changed field at the end of the frame
+            with LevelStore.batch_notifications():
+                await cls.run_frame(frame_seconds)
+
+            if Config.SHOW_FRAME_STATS:
+                cls.show_frame_stats()
+
+            # update the screen for all animations and changes, there is no screen to update when headless
+            if not Config.HEADLESS:
+                pygame.display.update()
+
+            # limit while loop to run no more than 60 times per second, fetches and other tasks run while waiting
+            frame_seconds = await cls.__pacer.wait()
+            played += 1
+        return played
+
+    async def run_frame(cls, frame_seconds):
+        """ handle the events, step the simulation and play the current level for one frame"""
+        for event in cls.event_handler.coalesce(pygame.event.get()):
             
-            if not cls._AUDIO_ERROR:
-                # run the actual gameplay for the corresponding level
-                # await asyncio.gather(cls.async_wrapper(cls._GAME_PLAY.play_level()))
-                await cls._GAME_PLAY.play_level()
-
-
-            else:
-                audio_err = cls._error_builder.create_error('Audio Error - Try Using Headphones', ' If not plug in and unplug headphones ')
-                w, h = audio_err.surface.get_size()
-                audio_err.display(cls.__screen, ((Config.SCREEN_WIDTH - w)/2, Config.CENTER[1] - h//2) )
-
-            # update the screen for all animations and changes
-            pygame.display.update()
-
-            cls.__clock.tick(Config.FRAMERATE) # limit while loop to run no more than 60 times per second
-            await asyncio.sleep(0)
-
-# if __name__ == '__main__':
-#     # play the game
-asyncio.run(MainGameLoop().play())
\ No newline at end of file
+            # check if the the x is in top corner is clicked or if if the escape button is pressed only if on pc
+            if not Config.IS_WEB:
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE): 
+                    
+                    # then we close the game using the game state manager
+                    cls._GAME_STATE._running = False
+
+            # only the handlers registered for the current state and the event's type handle it
+            cls.event_handler.dispatch(event)
+        
+        if not cls._AUDIO_ERROR:
+            # step the simulation as many fixed steps as the last frame took, then draw the level
+            for _ in range(GameClock.advance(frame_seconds)):
+                cls._GAME_PLAY.update_level()
+
+            # fire the timers that are due at the new time
+            TimerScheduler.tick()
+
+            # run the actual gameplay for the corresponding level
+            # await asyncio.gather(cls.async_wrapper(cls._GAME_PLAY.play_level()))
+            await cls._GAME_PLAY.play_level()
+
+
+        else:
+            audio_err = cls._error_builder.create_error('Audio Error - Try Using Headphones', ' If not plug in and unplug headphones ')
+            w, h = audio_err.surface.get_size()
+            audio_err.display(cls.__screen, ((Config.SCREEN_WIDTH - w)/2, Config.CENTER[1] - h//2) )
+
+        # heavy work of the levels runs in what is left of the frame
+        JobScheduler.run(cls.__pacer.remaining() - Config.JOB_MARGIN_MS / 1000)
+
+    @classmethod
+    def frame_stats(cls) -> dict:
+        """ average milliseconds per frame spent rendering, on background tasks and idle (see FramePacer)"""
+        return cls.__pacer.report()
+
+    @classmethod
+    def show_frame_stats(cls):
+        """ draw the average time per frame spent rendering, on background tasks and idle"""
+        report = cls.frame_stats()
+        text = '  '.join(f'{key} {value:.1f}ms' for key, value in report.items())
+        stats = cls._stats_font.render(text, True, Config.WHITE, Config.BLACK)
+        cls.__screen.blit(stats, (0, Config.SCREEN_HEIGHT - stats.get_height()))
+
+if __name__ == '__main__':
+    # play the game, on pc the settings of headless runs can also be given on the command line
+    frames = None
+    if not Config.IS_WEB:
+        import argparse
+        parser = argparse.ArgumentParser(description='Pokemon Battle Arena')
+        parser.add_argument('--headless', action='store_true', help='no window and no sound')
+        parser.add_argument('--uncapped', action='store_true', help='do not limit the frame rate')
+        parser.add_argument('--frames', type=int, help='quit after this many frames')
+        args = parser.parse_args()
+        Config.HEADLESS = Config.HEADLESS or args.headless
+        Config.UNCAPPED = Config.UNCAPPED or args.uncapped
+        frames = args.frames
+
+    played = MainGameLoop.run(frames)
+    if Config.HEADLESS:
+        print(f'{played} frames, {MainGameLoop.frame_stats()}')
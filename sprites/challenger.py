@@ -1,38 +1,49 @@
 import pygame
 from config.config import Config
+from config.resources import Resources
 from sprites.sprites import ExploreSprite
 from sprites.trainer import Trainer
 from sprites.pokemon import OtherPokemon
 from sprites.spritesheets import SpriteSheet
 from gameplay.battle import Lineup
 from config.fetcher import FetchPokemon
+from gameplay.clock import GameClock
+from gameplay.navigation import NavGrid
 import random
 from typing import Dict
                                  
 class Challenger(ExploreSprite):
     """ Challeger sprites are sprites that can potentially have battle with the player"""
+
+    # the sheet and exclamation images are shared by all challengers, they are only loaded once
+    _sheet = None
+    _exclamations = {} # size -> scaled exclamation image
     
     def __init__(self, direction, pos):
         super().__init__()
 
         # setup the sprites' images
-        self.sheet = SpriteSheet(image_file=r"assets/spritesheets/challenger-spritesheet.png", 
+        if Challenger._sheet is None:
+            Challenger._sheet = Resources.sheet(image_file=r"assets/spritesheets/challenger-spritesheet.png", 
                         json_file=r"assets/spritesheets/sheet_json/challenger-spritesheet.json")
+        self.sheet = Challenger._sheet
         self.direction = direction
         self.image = self.sheet.parse_sheet(f"challenger-{self.direction}", format=(28, 32))
         self.rect = self.image.get_rect(center=pos)
         self.image.set_colorkey(Config.BLACK)
 
-        self.__exclamation = pygame.image.load(r'./assets/images/exclaim2.png').convert_alpha()
-        
         # resize the exclamation and get the rect to display the excalmation 
         wratio = 28/pos[0] # 28 from testing
         hratio =28/pos[1] 
-        self.__exclamation = pygame.transform.scale(self.__exclamation, Config.scaler(wratio * self.rect.midtop[0], hratio *self.rect.midtop[1]))
+        size = Config.scaler(wratio * self.rect.midtop[0], hratio *self.rect.midtop[1])
+        if size not in Challenger._exclamations:
+            exclamation = Resources.image(r'./assets/images/exclaim2.png')
+            Challenger._exclamations[size] = pygame.transform.scale(exclamation, size)
+        self.__exclamation = Challenger._exclamations[size]
         self._rect = self.__exclamation.get_rect(center=self.rect.midtop)
 
-        # flag if the challenger is challenging the trainer
-        self.challenging = False
+        # flag if the trainer is in the challenger's line of sight, this is set by the sight triggers
+        self.in_sight = False
 
         # how far the challenger can 'see', meaning how many pixels the 
         # trainer must be from the challenger in the relevant direction before the trainer is noticed
@@ -41,19 +52,118 @@ class Challenger(ExploreSprite):
         # flag if the trainer has been defeated
         self.defeated = False
 
-        # lineup of other pokemon objects
-        self.pokemon = self._gen_pokemon() 
+        # walking: the pathfinder is given by the level when the challenger wakes up,
+        # without one the challenger stands still. route is a list of cells to patrol
+        self.pathfinder = None
+        self.route = []
+        self._route_index = 0
+        self.path = []
+        self._goal = None
+        self.distance = 0.0 # part of a pixel walked but not yet moved
+
+        # lineup of other pokemon objects, it is only generated when it is first needed
+        # (when the npc scheduler wakes the challenger), see the pokemon property
+        self._pokemon = None
+
+    @property
+    def pokemon(self) -> Lineup:
+        if self._pokemon is None:
+            self._pokemon = self._gen_pokemon()
+        return self._pokemon
+
+    @pokemon.setter
+    def pokemon(self, lineup: Lineup):
+        self._pokemon = lineup
+
+    def wake(self):
+        """ called by the npc scheduler when the trainer first comes close"""
+        return self.pokemon
+
+    def step(self, trainer: Trainer) -> bool:
+        """ behaviour of the challenger, called by the npc scheduler every frame when the challenger
+        is on screen and less often when it is close but off screen. Once it has noticed the trainer the challenger
+        walks up to it, otherwise it patrols its route if it has one. Returns true if the challenger moved"""
+        if self.pathfinder is None:
+            return False
+
+        cell = self.pathfinder.grid.cell_of(self.rect.center)
+        if self.challenging:
+            goal = self.pathfinder.grid.cell_of(trainer.rect.center)
+        elif self.route and not self.in_sight:
+            goal = self.route[self._route_index]
+            if cell == goal and not self.path:
+                self._route_index = (self._route_index + 1) % len(self.route)
+                goal = self.route[self._route_index]
+        else:
+            goal = None
+
+        # ask for a new path when the goal changes, the path is given to the challenger when it is found
+        if goal != self._goal:
+            self._goal = goal
+            self.path = []
+            if goal is not None and goal != cell:
+                self.pathfinder.request(cell, goal, lambda path, goal=goal: self._set_path(path, goal))
+
+        # when walking up to the trainer, stop in the cell next to it
+        if not self.path or (self.challenging and len(self.path) == 1):
+            return False
+        return self._walk()
+
+    def _set_path(self, path, goal):
+        # the goal may have changed while the path was being found
+        if goal != self._goal:
+            return
+        if path:
+            self.path = path[1:]
+        elif self.route and goal == self.route[self._route_index]:
+            # a point of the route can not be reached (e.g. an item is in the way), patrol to the next one
+            self._route_index = (self._route_index + 1) % len(self.route)
+            self._goal = None
+
+    def _walk(self) -> bool:
+        """ walk towards the center of the next cell of the path, called once per simulation step"""
+        target_x, target_y = self.pathfinder.grid.center_of(self.path[0])
+        dx, dy = target_x - self.rect.centerx, target_y - self.rect.centery
+        if not dx and not dy:
+            self.path.pop(0)
+            return False
+
+        # speed is per second, the rect moves in whole pixels and the rest is kept for the next step
+        self.distance += Config.NPC_SPEED * GameClock.delta
+        speed = int(self.distance)
+        self.distance -= speed
+
+        if dx:
+            self.rect.centerx += max(-speed, min(speed, dx))
+            direction = 'right' if dx > 0 else 'left'
+        else:
+            self.rect.centery += max(-speed, min(speed, dy))
+            direction = 'down' if dy > 0 else 'up'
+
+        # face the direction the challenger is walking in, a challenger walking up to the trainer
+        # keeps facing it so the trainer stays in its line of sight
+        if direction != self.direction and not self.challenging:
+            self.direction = direction
+            self.image = self.sheet.parse_sheet(f"challenger-{self.direction}", format=(28, 32))
+            self.image.set_colorkey(Config.BLACK)
+
+        if self.rect.center == (target_x, target_y):
+            self.path.pop(0)
+        return True
 
     @staticmethod
-    def inititialize_challengers(data: Dict[str, tuple]):
+    def inititialize_challengers(data: Dict[str, tuple], routes: Dict[str, list] = None):
 
         """ set up challengers based on data provided
         data: is in the form {direction: pos} and pos is a tuple of x and y cooridinates to place the challenger on a map
+        routes: is in the form {direction: [pos, ...]}, the points on the map the challenger patrols between
         """
         
+        routes = routes or {}
         challengers = []
         for direction, position in data.items():
             chal = Challenger(direction, position)
+            chal.route = [NavGrid.cell_of(point) for point in routes.get(direction, [])]
             challengers.append(chal)
         return challengers
         
@@ -76,58 +186,64 @@ class Challenger(ExploreSprite):
 
         return lineup
 
-    def notice(self, trainer: Trainer):
+    def sight_rect(self) -> pygame.Rect:
 
-        """ this function serves to detect whether the player is in the challengers view port 
-        if this function returns true, the player can potentially battle the challeger"""
-        
+        """ the area the challenger can see, the trainer is noticed when its center is in this rect.
+        It only depends on the challenger's position and direction, so it is used as a static trigger"""
         
         # if the challenger is looking up the notice conditions are:
         # 1) the trainers center x value is between the challengers left and right
         # 2) the trainers y value is less (higher on the screen) than the challengers y value 
         # 3) the trainers y value is greater (lower on the screen) than the challengers y value and view distance
         if self.direction == 'up':
-            if self.rect.left< trainer.rect.centerx < self.rect.right and (self.rect.bottom - (self.image.get_height() + self.view_distance)) <= trainer.rect.centery <= self.rect.top: # adjust chall up to accountn for ysort 
-                return True
+            top = self.rect.bottom - (self.image.get_height() + self.view_distance) # adjust chall up to accountn for ysort 
+            return pygame.Rect(self.rect.left + 1, top, self.rect.width - 1, self.rect.top - top + 1)
 
          # if the challenger is looking down the notice conditions are:
         # 1) the trainers center x value is between the challengers left and right
         # 2) the trainers y value is greater (lower on the screen) than the challengers y value 
         # 3) the trainers y value is less (higher on the screen) than the challengers y value and view distance
         elif self.direction == 'down':
-            if self.rect.left< trainer.rect.centerx < self.rect.right and (self.rect.bottom + self.view_distance) >= trainer.rect.centery >= self.rect.bottom:
-                return True
+            return pygame.Rect(self.rect.left + 1, self.rect.bottom, self.rect.width - 1, self.view_distance + 1)
 
         # if the challenger is looking left the notice conditions are:
         # 1) the trainers center y value is between the challengers top and bottom
         # 2) the trainers x value is less (more left on the screen) than the challengers left value 
         # 3) the trainers x value is greater (more right on the screen) than the challengers left value and view distance
         elif self.direction == 'left':
-            if self.rect.top <= trainer.rect.centery <= self.rect.bottom and (self.rect.left - self.view_distance) <= trainer.rect.centerx <= self.rect.centerx:
-                return True
+            left = self.rect.left - self.view_distance
+            return pygame.Rect(left, self.rect.top, self.rect.centerx - left + 1, self.rect.height + 1)
 
         # if the challenger is looking right the notice conditions are:
         # 1) the trainers center y value is between the challengers top and bottom
         # 2) the trainers x value is more (more right on the screen) than the challengers right value 
         # 3) the trainers x value is less (more left on the screen) than the challengers right value and view distance
         elif self.direction == 'right':
-            if self.rect.top <= trainer.rect.centery <= self.rect.bottom and (self.rect.right + self.view_distance) >= trainer.rect.centerx >= self.rect.centerx:    
-                return True
-        else:
-            return False
+            return pygame.Rect(self.rect.centerx, self.rect.top, self.rect.right + self.view_distance - self.rect.centerx + 1, self.rect.height + 1)
+
+        return pygame.Rect(self.rect.center, (0, 0))
+
+    def notice(self, trainer: Trainer) -> bool:
+
+        """ this function serves to detect whether the player is in the challengers view port 
+        if this function returns true, the player can potentially battle the challeger"""
+        return self.sight_rect().collidepoint(trainer.rect.center)
+
+    @property
+    def challenging(self) -> bool:
+        """ the challenger is challenging the trainer if it has seen the trainer and still has pokemon
+        (if the challenger has no pokemon, it has been defeated and cannot notice the trainer)"""
+        return self.in_sight and not self.defeated and len(self.pokemon) > 0
     
     def animate(self, screen: pygame.Surface): 
-        # set the challenging to true to let the trainer know he can battle the current challenger
-        self.challenging = True
-
-        # exclamation indication on the screen
-        screen.blit(self.__exclamation, (self.left, self.top-30))
+        # exclamation indication on the screen, to let the trainer know he can battle the current challenger
+        # the outline values are in world coordinates, the exclamation is drawn where the camera drew the challenger
+        self.create_mask()
+        offset_x, offset_y = self.offset
+        screen.blit(self.__exclamation, (self.left - self.rect.x + offset_x, self.top - self.rect.y + offset_y - 30))
 
     def update(self, screen: pygame.Surface, trainer: Trainer):
-        # updating the challenger means checking if it has noticed the trainer
-        # if the challenger still has pokemon (if the challenger has no pokemon, it has been defeated and coannot notcie the trainer)
-        
-        if len(self.pokemon) > 0 and not self.defeated and  self.notice(trainer):
+        # updating the challenger means showing that it has noticed the trainer,
+        # noticing itself is handled by the sight triggers which set in_sight
+        if self.challenging:
             self.animate(screen)
-        else:
-            self.challenging = False
\ No newline at end of file
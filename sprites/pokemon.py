@@ -5,6 +5,7 @@ import pygame
 import random
 import io     
 from config.config import Config 
+from gameplay.clock import GameClock
 from abc import ABC, abstractmethod
 from PIL import Image
 
@@ -43,6 +44,8 @@ class Pokemon(GameSprite, ABC):
         self.float_in_pos = None# default position to float in when challenging a pokemon # make sure to set this in the child class
         self.off_screen_pos = None# default position of the screen to float in from or float out to if defeated # make sure to set this in the child class
         self.gui_elements = [] # this will be all the elements to rendered for a poekmon when battling
+        self._hud_hp = None # hp the health bar in the gui elements was made for
+        self.drift = 0.0 # part of a pixel the pokemon has floated but not yet been drawn at
 
         # pokemon state flags
         self.states = {
@@ -76,17 +79,27 @@ class Pokemon(GameSprite, ABC):
 
     def float_in_out(self, direction, speed, out):
 
-        """ handles floating the pokemon on and off the screen and updates their internal state accordingly"""
+        """ handles floating the pokemon on and off the screen and updates their internal state accordingly,
+        speed is in pixels per second and this is called once per frame"""
         if self.gui_elements:
 
+            # the rect moves in whole pixels, the rest is kept for the next frame
+            self.drift += speed * GameClock.frame_time
+            step = int(self.drift)
+            self.drift -= step
+
             # float the pokemon in or out based on the out flag, and update it's fainted or ready state
             pos = self.off_screen_pos[0] if out else self.float_in_pos
             poke_state = 'fainted' if out else 'ready'
 
+            # when animations are skipped the pokemon gets there in one frame
+            if GameClock.skip_animations:
+                step = abs(pos - self.rect.centerx)
+
             # handle floating left and right and updating the the state flags value once done
             if direction == 'right':
                 if self.rect.centerx < pos:
-                    self.rect.centerx += speed
+                    self.rect.centerx += step
                     self.states[poke_state] = False
 
                 else:
@@ -95,7 +108,7 @@ class Pokemon(GameSprite, ABC):
             elif direction == 'left':
               
                 if self.rect.centerx > pos:
-                    self.rect.centerx -= speed
+                    self.rect.centerx -= step
                     self.states[poke_state] = False
 
                 else:
@@ -108,15 +121,16 @@ class Pokemon(GameSprite, ABC):
         """ shows gui element associated with  the pokemon, moves, name level health."""
         if self.gui_elements:
             if not self.states['ready']:
-                self.float_in_out(direction, 5, False)
+                self.float_in_out(direction, Config.POKEMON_FLOAT_IN_SPEED, False)
             else:
-                self.float_in_out(direction, 10, out)
+                self.float_in_out(direction, Config.POKEMON_FLOAT_OUT_SPEED, out)
 
             if self.states['ready']:
                 
-                # updates the health bar based on a pokemons current health
-                health_bar = bd.create_pokemon_health_bar(self.hp)[1]
-                self.gui_elements[-1][0] = health_bar
+                # updates the health bar based on a pokemons current health, only when it has changed
+                if self._hud_hp != self.hp:
+                    self._hud_hp = self.hp
+                    self.gui_elements[-1][0] = bd.create_pokemon_health_bar(self.hp)[1]
                 
                 for e in self.gui_elements:
                     e[0].display(screen, e[1])
@@ -159,6 +173,12 @@ class TrainerPokemon(Pokemon, AbstractPokemon):
             'attack':False
         }
         self.rect = self.image.get_rect(midbottom=(self.off_screen_pos))
+        self.drift = 0.0
+
+        # the gui elements are the same in every fight so they are only made for the first one,
+        # the health bar is made again when the hp changes (see show_elements)
+        if self.gui_elements:
+            return
 
         # define and place all elements on the screen accordingling and 
         # add them to the gui elements to ensure they are displayed in the right order (z value)
@@ -182,6 +202,7 @@ class TrainerPokemon(Pokemon, AbstractPokemon):
         self.gui_elements.append([info_layer, info_layer_pos])
         self.gui_elements.append([health_bar[0], bar_outline_pos])
         self.gui_elements.append([health_bar[1], bar_hp_pos])  # added list last so we know the index of the health bar so it can be updated
+        self._hud_hp = self.hp
 
     def attack(self, mediator, control):
         """ send an attack to the relevant mediator"""
@@ -220,6 +241,9 @@ class OtherPokemon(Pokemon, AbstractPokemon):
 
     def initialize_for_fight(self, bd):
         """ create the gui elements for the challenger pokemon"""
+        if self.gui_elements:
+            return # made for an earlier fight
+
         info_layer = bd.create_pokemon_info_tile('Lv. 100', self.name)
         self.gui_elements.append([info_layer, (0, 0)])
 
@@ -230,6 +254,7 @@ class OtherPokemon(Pokemon, AbstractPokemon):
 
         self.gui_elements.append([health_bar[0], bar_outline_pos])
         self.gui_elements.append([health_bar[1], bar_hp_pos])
+        self._hud_hp = self.hp
 
     def attack(self, mediator):
         """ choose a random move and send the attack to the mediator"""
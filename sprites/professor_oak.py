@@ -1,6 +1,7 @@
 from gui_builders.gui import GUIDirector, Element
 from sprites.sprites import GameSprite
 from config.config import Config
+from config.resources import Resources
 from sprites.spritesheets import SpriteSheet
 from abc import ABC, abstractmethod
 
@@ -12,7 +13,7 @@ class OakState(ABC):
         self.oak = oak
         
         # all states use the same spritesheet
-        self.sheet = SpriteSheet(image_file=r"./assets/spritesheets/oak-spritesheet.png",
+        self.sheet = Resources.sheet(image_file=r"./assets/spritesheets/oak-spritesheet.png",
                                  json_file=r"./assets/spritesheets/sheet_json/oak-spritesheet.json")
 
         # initial speech psotion is set to 0
@@ -1,4 +1,5 @@
 import pygame
+import weakref
 from config.config import Config
 
 class GameSprite(pygame.sprite.Sprite):
@@ -15,6 +16,38 @@ class GameSprite(pygame.sprite.Sprite):
         
         self.image = pygame.transform.scale(self.image, Config.scaler(image_width, image_height))
 
+class FrameMask:
+    """ mask and local outline extents of a single animation frame.
+    Frames are shared between sprites (see SpriteSheet.parse_sheet), so the mask and
+    the outline values are only computed once per unique frame surface"""
+
+    # frame surface -> FrameMask, entries disappear with the frame
+    _cache = weakref.WeakKeyDictionary()
+
+    def __init__(self, surface: pygame.Surface):
+        self.colorkey = surface.get_colorkey()
+        self.mask = pygame.mask.from_surface(surface)
+
+        # we get the outline of the sprite
+        outline = self.mask.outline()
+        self.has_outline = bool(outline)
+
+        if outline:
+            # right/left are the max/min x, bottom/top are the max/min y
+            xs = [x for x, _ in outline]
+            ys = [y for _, y in outline]
+            self.right, self.left = max(xs), min(xs)
+            self.bottom, self.top = max(ys), min(ys)
+
+    @classmethod
+    def of(cls, surface: pygame.Surface) -> 'FrameMask':
+        """ get the cached mask of a frame, it is rebuilt if the colorkey of the frame has changed """
+        frame = cls._cache.get(surface)
+        if frame is None or frame.colorkey != surface.get_colorkey():
+            frame = cls._cache[surface] = cls(surface)
+        return frame
+
+
 class ExploreSprite(GameSprite):
 
     """ base class for sprites on the explore level"""
@@ -22,39 +55,38 @@ class ExploreSprite(GameSprite):
         super().__init__()
 
         # offset is used to display the sprite on the screen
-        # relative to a specific target for camera
+        # relative to a specific target for camera, it is only used for drawing
         self.offset = (0, 0)
 
 
     def create_mask(self):
         """ creates a mask and outline values of the sprite of the sprite to get a rough outline of the sprite for collisions """
-        
-        self.mask = pygame.mask.from_surface(self.image)
-        
-        # we get the outline of the spreite
-        outline = self.mask.outline()        
-        
 
-        if outline:
-            # configure the out line values ot be updated according to the offest
-            self.new_outline = [(x + self.offset[0], y + self.offset[1]) for x, y in self.mask.outline()]
+        # the mask and local outline values only depend on the current frame, so they are looked up
+        # from the frame cache and only the position is applied here
+        if self.image is getattr(self, '_mask_image', None) and self.rect.topleft == self._mask_position:
+            # nothing has changed since the last call
+            return
 
-            # sort all posits by y value to max and min y values
-            sorty = sorted(self.new_outline, key=lambda x: x[1])
-            # sort all posits by x value to max and min  xvalues
-            sortx = sorted(self.new_outline, key=lambda x: x[0])
-            
-            # right value is the max x
-            self.right = sortx[-1][0]
+        frame = FrameMask.of(self.image)
+        self.mask = frame.mask
+        self._mask_image = self.image
+        self._mask_position = self.rect.topleft
+        self._set_extents(frame)
 
-            # bottom is the max y
-            self.bottom = sorty[-1][1]
+    def _set_extents(self, frame: FrameMask):
+        """ set the outline values of the sprite from the frame's local values and its position in the world.
+        They are used by the simulation (hit detection), which steps the world positions, whereas the
+        offset is set by the camera once per drawn frame at an interpolated position"""
 
-            # left is the min x
-            self.left = sortx[0][0]
+        if frame.has_outline:
+            # configure the out line values to be updated according to the position
+            offset_x, offset_y = self.rect.topleft
 
-            # top is the min y
-            self.top = sorty[0][1]
+            self.right = frame.right + offset_x
+            self.bottom = frame.bottom + offset_y
+            self.left = frame.left + offset_x
+            self.top = frame.top + offset_y
 
             # calculating center points
             self.centery = (self.top + self.bottom )/2
@@ -83,12 +115,28 @@ class ExploreSprite(GameSprite):
     
 
 class Tile(ExploreSprite):
-    """class for tiles rendered from pytmx"""
-    
-    def __init__(self, pos, image):
+    """class for tiles rendered from pytmx
+    the image and mask belong to the tile's flyweight (shared by every tile with the same gid),
+    a tile only stores its position"""
+
+    __slots__ = ('pos', 'flyweight', 'rect', 'left', 'right', 'top', 'bottom', 'centerx', 'centery')
+
+    def __init__(self, pos, flyweight):
         super().__init__()
         self.pos = pos # position to palce the tile
-        self.image = image.convert_alpha()
-        self.image = pygame.transform.scale(self.image, (Config.TILE_WIDTH, Config.TILE_HEIGHT))
+        self.flyweight = flyweight
         # use for collision detection and camera placement 
-        self.rect = self.image.get_rect(topleft=pos)
\ No newline at end of file
+        self.rect = pygame.Rect(pos, flyweight.image.get_size())
+
+    @property
+    def image(self) -> pygame.Surface:
+        return self.flyweight.image
+
+    @property
+    def mask(self) -> pygame.mask.Mask:
+        # tiles never change frame, so collide_mask uses the shared mask instead of rebuilding it
+        return self.flyweight.frame.mask
+
+    def create_mask(self):
+        """ update the outline values of the tile from its flyweight's frame"""
+        self._set_extents(self.flyweight.frame)
@@ -13,6 +13,10 @@ class SpriteSheet:
         with open(json_file) as f:
             # load the json with the coordinates of each animation
             self.animations = json.load(f)
+
+        # parsed frames, keyed by name and scale. Frames are shared by every sprite using this sheet
+        # so they should be treated as read only (this also lets their masks be cached, see FrameMask)
+        self._frames = {}
     
     def get_sprite(self, x, y, w, h, scale) -> pygame.Surface:
         
@@ -32,8 +36,12 @@ class SpriteSheet:
     def parse_sheet(self, name, scale=Config.SPRITE_SCALE, format=None) -> pygame.Surface:
         
         """ gets the sprites coordinates from the json file and returns
-        the sprite on a new surface"""
-        
+        the sprite on a new surface, the surface is only created on the first call"""
+
+        key = (name, tuple(scale), format)
+        if key in self._frames:
+            return self._frames[key]
+
         coords = self.animations['frames'][name]['frame']
 
         if format:
@@ -41,4 +49,5 @@ class SpriteSheet:
             hratio = format[1]/coords['h']
             scale = (wratio * Config.SPRITE_SCALE[0], hratio * Config.SPRITE_SCALE[1])
             
-        return self.get_sprite(coords['x'], coords['y'], coords['w'], coords['h'], scale)
\ No newline at end of file
+        frame = self._frames[key] = self.get_sprite(coords['x'], coords['y'], coords['w'], coords['h'], scale)
+        return frame
\ No newline at end of file
@@ -1,5 +1,6 @@
 import pygame
 from config.config import Config
+from config.resources import Resources
 from sprites.sprites import ExploreSprite, GameSprite
 from sprites.spritesheets import SpriteSheet
 from gameplay.battle import Lineup
@@ -7,6 +8,8 @@ import math
 from gui_builders.gui import GUIBuilder, GUIDirector
 from gui_builders.pickup import PickupItem 
 from sprites.pokemon import TrainerPokemon
+from gameplay.clock import GameClock
+from gameplay.jobs import JobScheduler
 from abc import ABC
 from enum import StrEnum 
 
@@ -27,7 +30,7 @@ class TrainerDirections(StrEnum):
 class SpeedAnimation:
 
     def __init__(self, spritesheet: SpriteSheet, speed: int, animations: list[str]):
-        """ speed is the speed of the animation and animations is a list of the names of animations for the trainer defined in json file"""
+        """ speed is the speed of the animation (pixels per second) and animations is a list of the names of animations for the trainer defined in json file"""
         self.speed = speed
         self.animations =[ spritesheet.parse_sheet(name=animation) for animation in animations ]
 
@@ -37,7 +40,7 @@ class Trainer(ExploreSprite):
     def __init__(self):
         super().__init__()
 
-        self.sheet = SpriteSheet(image_file="./assets/spritesheets/poke-trainersheet.png",
+        self.sheet = Resources.sheet(image_file="./assets/spritesheets/poke-trainersheet.png",
                                  json_file="./assets/spritesheets/sheet_json/trainer-moves.json"
                                 )
         
@@ -47,9 +50,18 @@ class Trainer(ExploreSprite):
         # threshold for the user to press, once this value exceeds the threshold, then the user can move
         self.move = 0
 
+        # part of a pixel the trainer has moved but not yet been drawn at, since speeds are per second
+        self.distance = 0.0
+
+        # position at the previous simulation step, used to interpolate the trainer when it is drawn
+        self.previous = None
+
         # used to check if the bike state should be activated or not
         self.toggle_bike = False
 
+        # walkable area, set by the explore level to the size of its map
+        self.bounds = Config.MAP_RECT
+
         # initial state of the trainer
         self.current_state = WalkingState(self)
 
@@ -75,6 +87,7 @@ class Trainer(ExploreSprite):
         self.current_state = state 
 
     def update(self):
+        """ one simulation step of the trainer"""
         self.direction = self.current_state.direction
         self.current_state.animate()
 
@@ -87,7 +100,8 @@ class TrainerState(ABC):
 
     """ base class for all states of the trainer, these will control animations and speed of the trainer"""
     MOVE_THRESHOLD = 1.2
-    def __init__(self, trainer: Trainer, animation_swap_speed: int):
+    def __init__(self, trainer: Trainer, animation_swap_speed: float):
+        """ animation_swap_speed is how fast the walking animation changes, per second"""
         
         #  initialize the trainer as an instance variable
         self.trainer = trainer
@@ -117,31 +131,37 @@ class TrainerState(ABC):
         """ this function check if the player is within the borders of the map"""
         match direction:
             case TrainerDirections.UP:
-                return self.trainer.rect.top > Config.MAP_RECT.top
+                return self.trainer.rect.top > self.trainer.bounds.top
             case TrainerDirections.DOWN:
-                return self.trainer.rect.bottom < Config.MAP_RECT.bottom
+                return self.trainer.rect.bottom < self.trainer.bounds.bottom
             case TrainerDirections.LEFT:
-                return self.trainer.rect.left > Config.MAP_RECT.left
+                return self.trainer.rect.left > self.trainer.bounds.left
             case TrainerDirections.RIGHT:
-                return self.trainer.rect.right < Config.MAP_RECT.right
+                return self.trainer.rect.right < self.trainer.bounds.right
             
     def movement(self, animation_swap_speed):
 
-        self.trainer.move += animation_swap_speed
+        # movement is called once per simulation step, speeds are per second
+        self.trainer.move += animation_swap_speed * GameClock.delta
         num_animations = len(self.trainer.current_state.animations[self.direction].animations)
         if self.trainer.move > self.MOVE_THRESHOLD:
             self.trainer.image = self.animations[self.direction].animations[math.floor(self.trainer.move % num_animations)]
             
             if self.can_move(self.direction):
+                # the rect moves in whole pixels, the rest is kept for the next step
+                self.trainer.distance += self.animations[self.direction].speed * GameClock.delta
+                pixels = int(self.trainer.distance)
+                self.trainer.distance -= pixels
+
                 match self.direction:
                     case TrainerDirections.UP:
-                        self.trainer.rect.y -= self.animations[self.direction].speed
+                        self.trainer.rect.y -= pixels
                     case TrainerDirections.DOWN:
-                        self.trainer.rect.y += self.animations[self.direction].speed
+                        self.trainer.rect.y += pixels
                     case TrainerDirections.LEFT:
-                        self.trainer.rect.x -= self.animations[self.direction].speed
+                        self.trainer.rect.x -= pixels
                     case TrainerDirections.RIGHT:
-                        self.trainer.rect.x += self.animations[self.direction].speed
+                        self.trainer.rect.x += pixels
             
             # reset the move threshold to avoid extreme values
             if self.trainer.move > self.MOVE_THRESHOLD * num_animations :
@@ -154,10 +174,10 @@ class TrainerState(ABC):
 class WalkingState(TrainerState):
     """ handle trianter's walking state """
     def __init__(self, trainer):
-        super().__init__(trainer, 0.1)
+        super().__init__(trainer, 6)
 
         self.direction = trainer.direction
-        self.speed = 1
+        self.speed = Config.WALK_SPEED
 
         self.animations = {
             TrainerDirections.LEFT:SpeedAnimation(self.trainer.sheet,self.speed, ['player-face-left', 'player-walk-left1', 'player-walk-left2']),
@@ -185,10 +205,10 @@ class WalkingState(TrainerState):
 class RunningState(TrainerState):
     """ handle trainer's running state"""
     def __init__(self, trainer):
-        super().__init__(trainer, 0.1)
+        super().__init__(trainer, 6)
 
         self.direction = trainer.direction
-        self.speed = 2
+        self.speed = Config.RUN_SPEED
         self.animations = {
             TrainerDirections.LEFT:SpeedAnimation(self.trainer.sheet, self.speed, ['player-face-left', 'player-run-left1', 'player-run-left2']),
             TrainerDirections.UP: SpeedAnimation(self.trainer.sheet, self.speed, ['player-face-up', 'player-walk-up1', 'player-walk-up2']),
@@ -210,14 +230,14 @@ class RunningState(TrainerState):
 class BikeState(TrainerState):
     """ handle trainer's biking state"""
     def __init__(self, trainer):
-        super().__init__(trainer, 0.15)
+        super().__init__(trainer, 9)
         self.direction = trainer.direction
-        self.speed = 3
+        self.speed = Config.BIKE_SPEED
         self.animations = {
-            TrainerDirections.LEFT:SpeedAnimation(self.trainer.sheet,3, ['bike-left1', 'bike-left2', 'bike-left3']),
-            TrainerDirections.UP: SpeedAnimation(self.trainer.sheet,3, ['bike-up2', 'bike-up2', 'bike-up3']),
-            TrainerDirections.DOWN: SpeedAnimation(self.trainer.sheet,3, ['bike-down1', 'bike-down2', 'bike-down3']),
-            TrainerDirections.RIGHT: SpeedAnimation(self.trainer.sheet,3, ['bike-right1', 'bike-right2', 'bike-right3'])
+            TrainerDirections.LEFT:SpeedAnimation(self.trainer.sheet,self.speed, ['bike-left1', 'bike-left2', 'bike-left3']),
+            TrainerDirections.UP: SpeedAnimation(self.trainer.sheet,self.speed, ['bike-up2', 'bike-up2', 'bike-up3']),
+            TrainerDirections.DOWN: SpeedAnimation(self.trainer.sheet,self.speed, ['bike-down1', 'bike-down2', 'bike-down3']),
+            TrainerDirections.RIGHT: SpeedAnimation(self.trainer.sheet,self.speed, ['bike-right1', 'bike-right2', 'bike-right3'])
         }
 
         self.trainer.image = self.animations[self.direction].animations[0]
@@ -326,12 +346,17 @@ class TrainerMediator:
             # add an item to the trainers bag
             return self.__trainer.bag.add_item(data)
         
+    def _add_pokemon(self, data):
+        yield
+        self.__trainer.pokemon.add(TrainerPokemon(data))
+
     def notify_pokemon(self, message, data=None):
         """ trainer pokemoon accessors and setters"""
 
         if message == 'add_pokemon':
-            # add a pokemon to the traineers lineup
-            self.__trainer.pokemon.add(TrainerPokemon(data))
+            # add a pokemon to the traineers lineup, processing its sprite is slow so the pokemon are
+            # added one per frame in a job (in the order they were chosen), the future is returned
+            return JobScheduler.submit(self._add_pokemon(data), JobScheduler.NORMAL, owner=self.__trainer.pokemon)
 
         elif message == 'get_single':
             #  get one pokemn, the lead of the lineup